@@ -0,0 +1,162 @@
+"""Admission control in front of the API: per-client rate limits and global load shedding."""
+
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from . import pool_metrics
+from .services.exceptions import InvalidTokenException
+from .services.tokens import token_issuer
+
+# Monitoring routes stay reachable under load so the overload can be observed.
+EXEMPT_PATH_PREFIXES = ("/internal/pool", "/internal/caches", "/docs", "/redoc", "/openapi.json")
+
+
+class TokenBuckets:
+    """Token buckets for any number of clients, all sharing one refill rate and burst size.
+
+    Only clients whose bucket is not full are stored: a full bucket is the same as no
+    bucket. Buckets are kept in the order they were last used, so the ones that have had
+    time to refill completely are all at the front and are dropped lazily as later calls
+    pass them, keeping the state proportional to the clients active in the last
+    `burst / rate` seconds.
+    """
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str) -> float:
+        """
+        Take a token from a client's bucket.
+
+        Args:
+            key: The client the bucket belongs to.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one will be available.
+        """
+        now = self._clock()
+        refill_time = self.burst / self.rate
+        # Any bucket last used a full refill ago is full again.
+        while self._buckets:
+            _, updated_at = next(iter(self._buckets.values()))
+            if now - updated_at < refill_time:
+                break
+            self._buckets.popitem(last=False)
+
+        tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+        self._buckets[key] = (tokens - 1, now)
+        return 0.0
+
+
+def parse_route_limits(spec: str) -> dict[str, tuple[float, float]]:
+    """
+    Parse per-route rate limits from a setting like `/user/login=1:5,/user/create=0.2:3`.
+
+    Args:
+        spec: Comma separated `path=rate:burst` entries, with the rate in requests per second.
+
+    Returns:
+        dict[str, tuple[float, float]]: The rate and burst of each path.
+    """
+    limits = {}
+    for entry in spec.split(","):
+        if entry.strip() == "":
+            continue
+        path, limit = entry.strip().split("=")
+        rate, burst = limit.split(":")
+        limits[path] = (float(rate), float(burst))
+    return limits
+
+
+def _max_pool_wait() -> float:
+    return max((metrics.recent_wait for metrics in pool_metrics.registry), default=0.0)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware admitting each request only while its client and the server have room for it.
+
+    Every client gets a token bucket per rate-limited route, and one for all other routes,
+    and is answered with a 429 once it runs dry. A client is the subject of a valid bearer
+    token, else the peer address. The server as a whole sheds
+    requests with a 503 while `max_in_flight` requests are already being served, or while the
+    recent wait for a database connection exceeds `max_pool_wait` seconds. The wait is only
+    acted on while other requests are in flight, so once shedding has drained the server the
+    next request is admitted and refreshes it.
+    """
+
+    def __init__(self,
+                 app,
+                 rate: float,
+                 burst: float,
+                 route_limits: dict[str, tuple[float, float]],
+                 max_in_flight: int,
+                 max_pool_wait: float,
+                 pool_wait: Callable[[], float] = _max_pool_wait,
+                 clock: Callable[[], float] = time.monotonic):
+        self.app = app
+        self.max_in_flight = max_in_flight
+        self.max_pool_wait = max_pool_wait
+        self._pool_wait = pool_wait
+        self._default_buckets = TokenBuckets(rate, burst, clock)
+        self._route_buckets = {path: TokenBuckets(route_rate, route_burst, clock)
+                               for path, (route_rate, route_burst) in route_limits.items()}
+        self._in_flight = 0
+
+    def _client(self, scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                try:
+                    return token_issuer.verify(value[7:].decode("latin-1"))
+                except InvalidTokenException:
+                    break
+        # Otherwise the peer address: the key parameter is unauthenticated, so a new key must not buy a new bucket.
+        client = scope.get("client")
+        return client[0] if client else ""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        if self._in_flight >= self.max_in_flight or (self._in_flight > 0
+                                                    and self._pool_wait() > self.max_pool_wait):
+            await _reject(send, 503, "Service temporarily overloaded. Please retry.", 1)
+            return
+
+        # Routes without a limit of their own share one bucket per client.
+        buckets = self._route_buckets.get(scope["path"], self._default_buckets)
+        retry_after = buckets.take(self._client(scope))
+        if retry_after > 0:
+            await _reject(send, 429, "Too many requests. Please retry later.", retry_after)
+            return
+
+        self._in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+
+
+async def _reject(send, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, math.ceil(retry_after))).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,169 @@
+"""Async API routes for the user module, served when the application runs in async mode."""
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Header, Response
+
+from .conditional import not_modified, tag_version
+from .rendering import render
+from ..models.user import User, UserProfile, SignedInUser
+from ..models.token import TokenPair
+from ..services.user import AsyncUserService
+from ..services.exceptions import (InvalidCredentialsUserException,
+                                   DuplicateUserException,
+                                   UserNotFoundException,
+                                   InvalidTokenException)
+
+api = APIRouter(prefix="/user")
+openapi_tags = {
+    "name":"User",
+    "description":"Routes to interact with User API functionality."   
+}
+
+@api.post("/create", tags=["User"])
+async def create_user(user: User,
+                      user_service: AsyncUserService = Depends(),
+                      ) -> SignedInUser:
+    """
+    Creates a new user in the database
+    
+    Args:
+        first name: The new users first name.
+        last name: The new users last name.
+        email: The new users email.
+
+    Returns:
+        SignedInUser: The new user, with its API key and the tokens to authenticate plant requests with.
+
+    Raises: 
+        400: If the input credentials are improperly formatted or invalid.
+        409: If the user is already in the database.
+    """
+
+    try:
+        return render(await user_service.create_user(user=user), SignedInUser)
+    except InvalidCredentialsUserException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DuplicateUserException as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+@api.post('/login', tags=["User"])
+async def login(email: str,
+                password: str,
+                user_service: AsyncUserService = Depends(),
+                ) -> SignedInUser:
+    """
+    Login a user.
+
+    Args:
+        email: The email of the user to be logged in.
+        password: The password of the user to be logged in.
+
+    Returns:
+        SignedInUser: The user to be logged in, with the tokens to authenticate plant requests with.
+
+    Raises:
+        404: If the user is not found.
+    """
+
+    try:
+        return render(await user_service.sign_in(email=email, password=password), SignedInUser)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@api.post("/refresh", tags=["User"])
+async def refresh_tokens(refresh_token: str = Body(embed=True),
+                         user_service: AsyncUserService = Depends(),
+                         ) -> TokenPair:
+    """
+    Exchange a refresh token for a new pair of tokens.
+
+    Args:
+        refresh_token: The refresh token of an earlier login or refresh.
+
+    Returns:
+        TokenPair: The new access and refresh tokens.
+
+    Raises:
+        401: If the refresh token is invalid or expired, or its user no longer exists.
+    """
+
+    try:
+        return render(await user_service.refresh_tokens(refresh_token=refresh_token), TokenPair)
+    except (InvalidTokenException, UserNotFoundException) as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
+# TODO: Remove this before launching to production. 
+@api.get("/get/{key}", tags=["User"])
+async def get_user(key: str, 
+                   response: Response,
+                   if_none_match: str | None = Header(default=None),
+                   user_service: AsyncUserService = Depends(),) -> UserProfile:
+    """
+    Get the user model with a specified key.
+    
+    Args:
+        key: The key for the user.
+        if_none_match: The ETag of an earlier response; answered with a 304 while the user is unchanged.
+        
+    Returns:
+        UserProfile: The user in the database with the specified key.
+        
+    Raises: 
+        404: if the user is not found.
+    """
+    
+    try:
+        user, version = await user_service.get_user(key=key)
+        unchanged = not_modified(version, if_none_match)
+        if unchanged is not None:
+            return unchanged
+        tag_version(response, version)
+        return render(user, UserProfile, response)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@api.put("/update", tags=["User"])
+async def update_user(key: str,
+                      user: User, 
+                      user_service: AsyncUserService = Depends(),) -> UserProfile:
+    """
+    Updates the user model with a specified key.
+    
+    Args:
+        key: The key for the user to be updated.
+        user: The user object which has the updated properties. An empty password keeps the current password.
+        
+    Returns:
+        UserProfile: The user in the database with the specified key.
+    
+    Raises:
+        404: If the user is not found.
+        409: If the new email is already used for another user.
+    """
+    
+    try:
+        return render(await user_service.update_user(key=key, user=user), UserProfile)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DuplicateUserException as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@api.delete("/delete", tags=["User"])
+async def delete_user(key: str, 
+                      user_service: AsyncUserService = Depends(),) -> UserProfile:
+    """
+    Deletes the user with a specified key.
+    
+    Args:
+        key: The key for the user.
+        
+    Returns:
+        UserProfile: The user that was deleted from the database.
+    
+    Raises:
+        404: If the user is not found.
+    """
+    
+    try:
+        return render(await user_service.delete_user(key=key), UserProfile)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,82 @@
+"""Authentication of plant requests by the access tokens users sign in with."""
+
+from typing import Annotated
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from ..models.plant import Plant
+from ..services.exceptions import InvalidTokenException
+from ..services.tokens import token_issuer
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+def token_key(credentials: HTTPAuthorizationCredentials | None = Depends(_bearer)) -> str | None:
+    """
+    Verify the request's bearer token, if it has one, without a database round trip.
+
+    Returns:
+        str | None: The key of the user the token was issued to, or None without a token.
+
+    Raises:
+        401: If the token is invalid, expired or revoked.
+    """
+
+    if credentials is None:
+        return None
+    try:
+        return token_issuer.verify(credentials.credentials)
+    except InvalidTokenException as e:
+        raise _unauthorized(str(e))
+
+
+def owner_key(key: str | None = None, subject: str | None = Depends(token_key)) -> str:
+    """
+    Resolve the user a plant request is for: the subject of its bearer token, or the `key`
+    query parameter of clients that do not send one yet.
+
+    Returns:
+        str: The key of the user.
+
+    Raises:
+        401: If the request has neither a token nor a key.
+        403: If the key is not the token's subject.
+    """
+
+    if subject is None:
+        if key is None:
+            raise _unauthorized("Not authenticated.")
+        return key
+    if key is not None and key != subject:
+        raise HTTPException(status_code=403, detail="The key does not belong to the token's user.")
+    return subject
+
+
+# A route parameter holding the key of the user the request is for.
+OwnerKey = Annotated[str, Depends(owner_key)]
+
+
+def claim_plants(subject: str | None, plants: list[Plant]) -> None:
+    """
+    Assign plants sent in a request body to the token's user, for routes whose plants carry
+    their owner key.
+
+    Plants sent without an owner key are given the token's subject. Requests without a
+    token keep the owner keys they sent.
+
+    Raises:
+        403: If a plant names another owner than the token's subject.
+    """
+
+    if subject is None:
+        return
+    for plant in plants:
+        if plant.owner_key == "":
+            plant.owner_key = subject
+        elif plant.owner_key != subject:
+            raise HTTPException(status_code=403, detail="The plant does not belong to the token's user.")
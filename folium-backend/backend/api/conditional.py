@@ -0,0 +1,47 @@
+"""Conditional GET support for reads tagged with the version of the user they belong to."""
+
+from fastapi import Response
+
+
+def version_etag(version: int) -> str:
+    """Render a user's version as the weak ETag of their reads."""
+    return f'W/"{version}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Compare an If-None-Match header against an ETag with the weak comparison GET uses."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque_tag for candidate in if_none_match.split(","))
+
+
+def not_modified(version: int, if_none_match: str | None) -> Response | None:
+    """
+    Answer a conditional read with a 304 if the client already has the current version.
+
+    Args:
+        version: The current version of the user.
+        if_none_match: The request's If-None-Match header, if it has one.
+
+    Returns:
+        Response | None: The 304 response to return instead of reading, if the client already
+            has this version, or None if the data has to be read.
+    """
+
+    etag = version_etag(version)
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def tag_version(response: Response, version: int) -> None:
+    """
+    Tag a read with the ETag of the user version it reflects.
+
+    Args:
+        response: The response the route's return value is sent in.
+        version: The version of the user, read in the same statement as the data the response holds.
+    """
+
+    response.headers["ETag"] = version_etag(version)
@@ -0,0 +1,92 @@
+"""API routes for internal operational endpoints."""
+
+import hmac
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from ..models.pool import PoolStatus
+from ..models.cache import CacheStatus
+from ..models.plant import PlantPage
+from ..services.user_cache import user_cache
+from ..services.plant import PlantService
+from ..services.exceptions import InvalidCursorException
+from ..env import getenv
+from .. import pool_metrics
+
+api = APIRouter(prefix="/internal")
+openapi_tags = {
+    "name":"Internal",
+    "description":"Operational routes for monitoring the API. Not meant for clients."   
+}
+
+_bearer = HTTPBearer(auto_error=False)
+
+# Shared secret of the workers allowed to read data across users, such as the reminder worker.
+_WORKER_TOKEN = getenv("INTERNAL_API_TOKEN")
+
+
+def worker(credentials: HTTPAuthorizationCredentials | None = Depends(_bearer)) -> None:
+    """
+    Admit only requests bearing the worker token.
+
+    Raises:
+        401: If the request does not carry the worker token.
+    """
+
+    if credentials is None or not hmac.compare_digest(credentials.credentials.encode(), _WORKER_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Not authenticated.", headers={"WWW-Authenticate": "Bearer"})
+
+
+@api.get("/pool", tags=["Internal"])
+def get_pool_status() -> list[PoolStatus]:
+    """
+    Get the live status of every database connection pool.
+
+    Returns:
+        list[PoolStatus]: Checked-out and overflow gauges plus checkout wait and failure counters for each pool.
+    """
+
+    return [metrics.snapshot() for metrics in pool_metrics.registry]
+
+
+@api.get("/caches", tags=["Internal"])
+def get_cache_status() -> list[CacheStatus]:
+    """
+    Get the live status of every in-process cache.
+
+    Returns:
+        list[CacheStatus]: Size plus hit, miss, eviction, expiration and invalidation counters for each cache.
+    """
+
+    return [user_cache.status()]
+
+
+@api.get("/due_plants", tags=["Internal"], dependencies=[Depends(worker)], response_model_exclude_unset=True)
+def get_due_plants(before: datetime | None = None,
+                   limit: int = Query(default=500, ge=1, le=5000),
+                   cursor: str | None = None,
+                   plant_service: PlantService = Depends()) -> PlantPage:
+    """
+    Get one page of every user's plants that are due for water, for the watering reminder worker.
+    Requires the worker token as a bearer token. The plants' owner keys are left out, since a
+    key is enough to act as its user.
+
+    Args:
+        before: Return plants due at or before this time. Defaults to now; times without a time zone are UTC.
+        limit: The maximum number of plants on the page.
+        cursor: The next_cursor of the previous page. Omit to get the first page.
+
+    Returns:
+        PlantPage: The due plants on the page, soonest due first, and the cursor for the next page.
+
+    Raises:
+        401: If the request does not carry the worker token.
+        422: If the cursor is invalid.
+    """
+
+    try:
+        return plant_service.get_all_due_plants(limit=limit, before=before, cursor=cursor)
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=422, detail=str(e))
@@ -1,14 +1,25 @@
 """API routes for the plant module."""
 
-from fastapi import Depends, HTTPException, APIRouter
+from datetime import datetime
 
+from fastapi import Depends, HTTPException, APIRouter, Query, Body, Header, Response
+from fastapi.responses import StreamingResponse
+
+from .auth import OwnerKey, token_key, claim_plants
+from .conditional import not_modified, tag_version
+from .rendering import render
 from ..services.plant import PlantService
 from ..services.exceptions import (UserBlankKeyException,
                                    UserNotFoundException,
                                    PlantBlankIdException,
-                                   PlantNotFoundException,)
+                                   PlantNotFoundException,
+                                   InvalidCursorException,
+                                   InvalidFieldsException,
+                                   EmptyPatchException,
+                                   BulkLimitException,)
 
-from ..models.plant import Plant
+from ..models.plant import Plant, PlantFilter, PlantPage, BulkPlantResult, HealthScore
+from ..models.health import GardenHealth
 
 api = APIRouter(prefix="/plant")
 openapi_tags = {
@@ -16,25 +27,228 @@ openapi_tags = {
     "description":"Routes to interact with Plant API functionality."   
 }
 
-@api.get("/get_user_plants", tags=["Plant"])
-def get_user_plants(key: str, 
+@api.get("/get_user_plants", tags=["Plant"], response_model_exclude_unset=True)
+def get_user_plants(key: OwnerKey, 
+                    response: Response,
+                    fields: str | None = None,
+                    filters: PlantFilter = Depends(),
+                    if_none_match: str | None = Header(default=None),
                     plant_service: PlantService = Depends()) -> list[Plant]:
     """
     Get all of the plants that belong to a user.
     
     Args:
         key: The key of the user to retrieve plants for.
+        fields: Comma separated plant fields to return, e.g. `id,common_name,last_watering`. Defaults to every field.
+        filters: Only plants matching every given filter are returned: `type`, `cycle`, `sunlight`,
+            `pet_poison`, `human_poison` and the inclusive `watered_after`/`watered_before` range.
+        if_none_match: The ETag of an earlier response; answered with a 304 while the user's plants are unchanged.
+        
+    Returns:
+        list[Plant]: A list of the plants that belong to the user, with only the requested fields.
+
+    Raises:
+        401: If the request has neither a valid bearer token nor a key.
+        404: If the key does not match a user in the database.
+        422: If the input key is an empty string or fields names an unknown field.
+    """
+
+    try:
+        # Only a conditional read checks the version first; otherwise it is read with the plants.
+        if if_none_match is not None:
+            unchanged = not_modified(plant_service.get_version(key=key), if_none_match)
+            if unchanged is not None:
+                return unchanged
+        plants, version = plant_service.get_all_user_plants(key=key, fields=fields, filters=filters)
+        tag_version(response, version)
+        return render(plants, list[Plant], response, exclude_unset=True)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (UserBlankKeyException, InvalidFieldsException) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+@api.get("/get_user_plants_page", tags=["Plant"], response_model_exclude_unset=True)
+def get_user_plants_page(key: OwnerKey,
+                         response: Response,
+                         limit: int = Query(default=100, ge=1, le=1000),
+                         cursor: str | None = None,
+                         fields: str | None = None,
+                         filters: PlantFilter = Depends(),
+                         if_none_match: str | None = Header(default=None),
+                         plant_service: PlantService = Depends()) -> PlantPage:
+    """
+    Get one page of the plants that belong to a user, for accounts too large to fetch at once.
+    
+    Args:
+        key: The key of the user to retrieve plants for.
+        limit: The maximum number of plants on the page.
+        cursor: The next_cursor of the previous page. Omit to get the first page.
+        fields: Comma separated plant fields to return. Defaults to every field.
+        filters: Only plants matching every given filter are returned: `type`, `cycle`, `sunlight`,
+            `pet_poison`, `human_poison` and the inclusive `watered_after`/`watered_before` range.
+        if_none_match: The ETag of an earlier response; answered with a 304 while the user's plants are unchanged.
         
     Returns:
-        list[Plant]: A list of the plants that belong to the user.
+        PlantPage: The plants on the page, ordered by id, and the cursor for the next page.
 
     Raises:
+        401: If the request has neither a valid bearer token nor a key.
+        404: If the key does not match a user in the database.
+        422: If the input key is an empty string, the cursor is invalid or fields names an unknown field.
+    """
+
+    try:
+        if if_none_match is not None:
+            unchanged = not_modified(plant_service.get_version(key=key), if_none_match)
+            if unchanged is not None:
+                return unchanged
+        page, version = plant_service.get_user_plants_page(key=key, limit=limit, cursor=cursor, fields=fields, filters=filters)
+        tag_version(response, version)
+        return render(page, PlantPage, response, exclude_unset=True)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (UserBlankKeyException, InvalidCursorException, InvalidFieldsException) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+@api.get("/search", tags=["Plant"], response_model_exclude_unset=True)
+def search_plants(key: OwnerKey,
+                  response: Response,
+                  q: str = Query(min_length=1, max_length=200),
+                  limit: int = Query(default=20, ge=1, le=100),
+                  cursor: str | None = None,
+                  fields: str | None = None,
+                  filters: PlantFilter = Depends(),
+                  if_none_match: str | None = Header(default=None),
+                  plant_service: PlantService = Depends()) -> PlantPage:
+    """
+    Search the plants that belong to a user by name and description, best match first.
+    
+    Args:
+        key: The key of the user whose plants to search.
+        q: The search, e.g. `monstera`, `"snake plant"` or `fern -boston`. Misspelled names still match.
+        limit: The maximum number of plants on the page.
+        cursor: The next_cursor of the previous page. Omit to get the first page.
+        fields: Comma separated plant fields to return. Defaults to every field.
+        filters: Only plants matching every given filter are returned: `type`, `cycle`, `sunlight`,
+            `pet_poison`, `human_poison` and the inclusive `watered_after`/`watered_before` range.
+        if_none_match: The ETag of an earlier response; answered with a 304 while the user's plants are unchanged.
+        
+    Returns:
+        PlantPage: The matching plants on the page, best match first, and the cursor for the next page.
+
+    Raises:
+        401: If the request has neither a valid bearer token nor a key.
+        404: If the key does not match a user in the database.
+        422: If the input key is an empty string, the cursor is invalid or fields names an unknown field.
+    """
+
+    try:
+        if if_none_match is not None:
+            unchanged = not_modified(plant_service.get_version(key=key), if_none_match)
+            if unchanged is not None:
+                return unchanged
+        page, version = plant_service.search_plants(key=key, text=q, limit=limit, cursor=cursor, fields=fields, filters=filters)
+        tag_version(response, version)
+        return render(page, PlantPage, response, exclude_unset=True)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (UserBlankKeyException, InvalidCursorException, InvalidFieldsException) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+@api.get("/get_due_plants", tags=["Plant"], response_model_exclude_unset=True)
+def get_due_plants(key: OwnerKey,
+                   before: datetime | None = None,
+                   fields: str | None = None,
+                   plant_service: PlantService = Depends()) -> list[Plant]:
+    """
+    Get the plants that belong to a user and are due for water, for polling clients.
+    
+    Args:
+        key: The key of the user to retrieve plants for.
+        before: Return plants due at or before this time. Defaults to now; times without a time zone are UTC.
+        fields: Comma separated plant fields to return. Defaults to every field.
+        
+    Returns:
+        list[Plant]: The user's due plants, soonest due first.
+
+    Raises:
+        401: If the request has neither a valid bearer token nor a key.
+        404: If the key does not match a user in the database.
+        422: If the input key is an empty string or fields names an unknown field.
+    """
+
+    try:
+        plants = plant_service.get_due_plants(key=key, before=before, fields=fields)
+        return render(plants, list[Plant], exclude_unset=True)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (UserBlankKeyException, InvalidFieldsException) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+@api.get("/export_user_plants", tags=["Plant"])
+def export_user_plants(key: OwnerKey,
+                       fields: str | None = None,
+                       filters: PlantFilter = Depends(),
+                       plant_service: PlantService = Depends()) -> StreamingResponse:
+    """
+    Stream all of the plants that belong to a user as newline-delimited JSON, for full-garden syncs.
+    
+    Args:
+        key: The key of the user to export plants for.
+        fields: Comma separated plant fields to export. Defaults to every field.
+        filters: Only plants matching every given filter are returned: `type`, `cycle`, `sunlight`,
+            `pet_poison`, `human_poison` and the inclusive `watered_after`/`watered_before` range.
+        
+    Returns:
+        StreamingResponse: One JSON encoded plant per line, in id order.
+
+    Raises:
+        401: If the request has neither a valid bearer token nor a key.
+        404: If the key does not match a user in the database.
+        422: If the input key is an empty string or fields names an unknown field.
+    """
+
+    try:
+        plants = plant_service.stream_user_plants(key=key, fields=fields, filters=filters)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (UserBlankKeyException, InvalidFieldsException) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    lines = (plant.model_dump_json(exclude_unset=True) + "\n" for plant in plants)
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+    
+@api.get("/health_analytics", tags=["Plant"])
+def health_analytics(key: OwnerKey,
+                     response: Response,
+                     window: int = Query(default=7, ge=2, le=1000),
+                     if_none_match: str | None = Header(default=None),
+                     plant_service: PlantService = Depends()) -> GardenHealth:
+    """
+    Get the health trends of all of the plants that belong to a user.
+    
+    Args:
+        key: The key of the user to analyze plants for.
+        window: The number of most recent health scores each statistic covers.
+        if_none_match: The ETag of an earlier response; answered with a 304 while the user's plants are unchanged.
+        
+    Returns:
+        GardenHealth: Each plant's rolling average, trend slope, volatility and declining flag.
+
+    Raises:
+        401: If the request has neither a valid bearer token nor a key.
         404: If the key does not match a user in the database.
         422: If the input key is an empty string.
     """
 
     try:
-        return plant_service.get_all_user_plants(key=key)
+        if if_none_match is not None:
+            unchanged = not_modified(plant_service.get_version(key=key), if_none_match)
+            if unchanged is not None:
+                return unchanged
+        health, version = plant_service.get_health_analytics(key=key, window=window)
+        tag_version(response, version)
+        return render(health, GardenHealth, response)
     except UserNotFoundException as e:
         raise HTTPException(status_code=404, detail=str(e))
     except UserBlankKeyException as e:
@@ -42,6 +256,7 @@ def get_user_plants(key: str,
     
 @api.post("/create_plant", tags=["Plant"])
 def create_plant(plant: Plant,
+                 subject: str | None = Depends(token_key),
                  plant_service: PlantService = Depends(),) -> Plant:
     """
     Create a new plant for a user in the database.
@@ -53,19 +268,46 @@ def create_plant(plant: Plant,
         Plant: The newly created plant object.
         
     Raises:
+        403: If a plant belongs to another user than the bearer token's.
         404: If the key does not match a user in the database.
         422: If the input key is an empty string.
     """
 
+    claim_plants(subject, [plant])
     try:
-        return plant_service.create_plant(plant=plant)
+        return render(plant_service.create_plant(plant=plant), Plant)
     except UserNotFoundException as e:
         raise HTTPException(status_code=404, detail=str(e))
     except UserBlankKeyException as e:
         raise HTTPException(status_code=422, detail=str(e))
     
+@api.post("/bulk_create", tags=["Plant"])
+def bulk_create_plants(plants: list[Plant],
+                       subject: str | None = Depends(token_key),
+                       plant_service: PlantService = Depends()) -> BulkPlantResult:
+    """
+    Create many new plants in one transaction, e.g. when onboarding a nursery.
+    
+    Args:
+        plants: The plant objects to be added to the database.
+        
+    Returns:
+        BulkPlantResult: The newly created plants and, by position in the request, the plants that could not be created and why.
+        
+    Raises:
+        403: If a plant belongs to another user than the bearer token's.
+        422: If the request holds more plants than one bulk request may.
+    """
+
+    claim_plants(subject, plants)
+    try:
+        return render(plant_service.bulk_create_plants(plants=plants), BulkPlantResult)
+    except BulkLimitException as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
 @api.put(path="/update_plant", tags=["Plant"])
 def update_plant(plant: Plant,
+                 subject: str | None = Depends(token_key),
                  plant_service: PlantService = Depends()) -> Plant:
     """
     Updates and returns a plant that is already in the database.
@@ -77,19 +319,109 @@ def update_plant(plant: Plant,
         Plant: The updated plant.
         
     Raises:
+        403: If a plant belongs to another user than the bearer token's.
         404: If the key does not match a user in the database or the plant is not found in the database.
         422: If the input key or plant id is an empty string.
     """
 
+    claim_plants(subject, [plant])
     try:
-        return plant_service.update_Plant(plant=plant)
+        return render(plant_service.update_Plant(plant=plant), Plant)
     except (UserNotFoundException, PlantNotFoundException) as e:
         raise HTTPException(status_code=404, detail=str(e))
     except (UserBlankKeyException, PlantBlankIdException) as e:
         raise HTTPException(status_code=422, detail=str(e))
     
+@api.patch(path="/patch_plant", tags=["Plant"])
+def patch_plant(key: OwnerKey,
+                id: int,
+                changes: Plant,
+                plant_service: PlantService = Depends()) -> Plant:
+    """
+    Updates only the fields of a plant that are sent, e.g. `{"last_watering": "2024-05-01 08:00:00"}`,
+    and returns the whole plant.
+
+    Args:
+        key: The key of the user who owns the plant.
+        id: The id of the plant.
+        changes: The plant fields to update. Its id, owner key and next watering time are ignored.
+        
+    Returns:
+        Plant: The updated plant.
+        
+    Raises:
+        401: If the request has neither a valid bearer token nor a key.
+        404: If the key does not match a user in the database or the plant is not found in the database.
+        422: If the input key is an empty string or no field that can be updated is sent.
+    """
+
+    try:
+        return render(plant_service.patch_plant(key=key, plant_id=id, changes=changes), Plant)
+    except (UserNotFoundException, PlantNotFoundException) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (UserBlankKeyException, EmptyPatchException) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+@api.post(path="/record_health", tags=["Plant"])
+def record_health(key: OwnerKey,
+                  id: int,
+                  score: int = Query(ge=1, le=10),
+                  plant_service: PlantService = Depends()) -> HealthScore:
+    """
+    Records a daily health score for a plant without sending the plant's whole health history.
+    The plant keeps its 1000 most recent scores, as many as the largest health analytics window covers.
+
+    Args:
+        key: The key of the user who owns the plant.
+        id: The id of the plant.
+        score: The plant's health, from 1 to 10.
+        
+    Returns:
+        HealthScore: The recorded score and the new length of the plant's health history.
+        
+    Raises:
+        401: If the request has neither a valid bearer token nor a key.
+        404: If the key does not match a user in the database or the plant is not found in the database.
+        422: If the input key is an empty string or the score is not between 1 and 10.
+    """
+
+    try:
+        return render(plant_service.record_health_score(key=key, plant_id=id, score=score), HealthScore)
+    except (UserNotFoundException, PlantNotFoundException) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UserBlankKeyException as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+@api.put(path="/bulk_update", tags=["Plant"])
+def bulk_update_plants(key: OwnerKey,
+                       plants: list[Plant],
+                       plant_service: PlantService = Depends()) -> BulkPlantResult:
+    """
+    Updates many of a user's plants in one transaction, e.g. when watering every plant in a zone.
+
+    Args:
+        key: The key of the user who owns the plants.
+        plants: The updated versions of the plants. The plants' owner keys are not used.
+        
+    Returns:
+        BulkPlantResult: The updated plants and, by position in the request, the plants that could not be updated and why.
+        
+    Raises:
+        401: If the request has neither a valid bearer token nor a key.
+        404: If the key does not match a user in the database.
+        422: If the input key is an empty string or the request holds more plants than one bulk request may.
+    """
+
+    try:
+        return render(plant_service.bulk_update_plants(key=key, plants=plants), BulkPlantResult)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (UserBlankKeyException, BulkLimitException) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
 @api.delete(path="/delete_plant", tags=["Plant"])
 def delete_plant(plant: Plant,
+                 subject: str | None = Depends(token_key),
                  plant_service: PlantService = Depends()) -> Plant:
     """
     Removes a plant from the database.
@@ -101,12 +433,41 @@ def delete_plant(plant: Plant,
         Plant: The plant that was successfully deleted from the database.
 
     Raises:
+        403: If a plant belongs to another user than the bearer token's.
 
     """
 
+    claim_plants(subject, [plant])
     try:
-        return plant_service.remove_plant(plant=plant)
+        return render(plant_service.remove_plant(plant=plant), Plant)
     except (UserNotFoundException, PlantNotFoundException) as e:
         raise HTTPException(status_code=404, detail=str(e))
     except (UserBlankKeyException, PlantBlankIdException) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+@api.delete(path="/bulk_delete", tags=["Plant"])
+def bulk_delete_plants(key: OwnerKey,
+                       ids: list[int] = Body(),
+                       plant_service: PlantService = Depends()) -> BulkPlantResult:
+    """
+    Removes many of a user's plants in one transaction, e.g. when clearing dead plants.
+    
+    Args:
+        key: The key of the user who owns the plants.
+        ids: The ids of the plants to delete from the database.
+        
+    Returns:
+        BulkPlantResult: The deleted plants and, by position in the request, the ids that could not be deleted and why.
+
+    Raises:
+        401: If the request has neither a valid bearer token nor a key.
+        404: If the key does not match a user in the database.
+        422: If the input key is an empty string or the request holds more ids than one bulk request may.
+    """
+
+    try:
+        return render(plant_service.bulk_remove_plants(key=key, ids=ids), BulkPlantResult)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (UserBlankKeyException, BulkLimitException) as e:
         raise HTTPException(status_code=422, detail=str(e))
\ No newline at end of file
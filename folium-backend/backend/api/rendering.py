@@ -0,0 +1,59 @@
+"""Opt-in rendering of route results straight to JSON bytes.
+
+By default a route's models go through FastAPI's response model: they are dumped, validated
+again as the response model and then encoded. The models the services return are already
+valid, so setting RESPONSE_MODE=fast renders them once instead, with the Rust serializer of
+a TypeAdapter cached per response type, and hands FastAPI a finished Response to send as-is.
+"""
+
+import functools
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from ..env import getenv
+
+# Whether routes render their results themselves rather than through their response model.
+FAST_RESPONSES = getenv("RESPONSE_MODE", "validated") == "fast"
+
+
+@functools.cache
+def _adapter(response_type: type) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def render_json(content, response_type: type, exclude_unset: bool = False) -> bytes:
+    """
+    Serialize a route result to the JSON its response model would have produced.
+
+    Args:
+        content: The route result, already of `response_type`.
+        response_type: The route's response type, e.g. `list[Plant]`.
+        exclude_unset: Leave out fields that were never set, like `response_model_exclude_unset`.
+
+    Returns:
+        bytes: The JSON encoded result.
+    """
+    return _adapter(response_type).dump_json(content, exclude_unset=exclude_unset)
+
+
+def render(content, response_type: type, response: Response | None = None, exclude_unset: bool = False):
+    """
+    Render a route result with the fast path when it is enabled.
+
+    Args:
+        content: The route result, already of `response_type`.
+        response_type: The route's response type, e.g. `list[Plant]`.
+        response: The response the route set headers on, such as its ETag, if any.
+        exclude_unset: Leave out fields that were never set, like `response_model_exclude_unset`.
+
+    Returns:
+        The result unchanged, for FastAPI to validate and encode, or a Response holding the
+        encoded result and the headers set on `response` when RESPONSE_MODE=fast.
+    """
+    if not FAST_RESPONSES:
+        return content
+    rendered = Response(content=render_json(content, response_type, exclude_unset), media_type="application/json")
+    if response is not None:
+        rendered.headers.raw.extend(response.headers.raw)
+    return rendered
@@ -1,12 +1,16 @@
 """API routes for the user module."""
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Header, Response
 
-from ..models.user import User
+from .conditional import not_modified, tag_version
+from .rendering import render
+from ..models.user import User, UserProfile, SignedInUser
+from ..models.token import TokenPair
 from ..services.user import UserService
 from ..services.exceptions import (InvalidCredentialsUserException,
                                    DuplicateUserException,
-                                   UserNotFoundException)
+                                   UserNotFoundException,
+                                   InvalidTokenException)
 
 api = APIRouter(prefix="/user")
 openapi_tags = {
@@ -17,7 +21,7 @@ openapi_tags = {
 @api.post("/create", tags=["User"])
 def create_user(user: User,
                 user_service: UserService = Depends(),
-                ) -> User:
+                ) -> SignedInUser:
     """
     Creates a new user in the database
     
@@ -27,7 +31,7 @@ def create_user(user: User,
         email: The new users email.
 
     Returns:
-        key: The API key for the new user.
+        SignedInUser: The new user, with its API key and the tokens to authenticate plant requests with.
 
     Raises: 
         400: If the input credentials are improperly formatted or invalid.
@@ -35,7 +39,7 @@ def create_user(user: User,
     """
 
     try:
-        return user_service.create_user(user=user)
+        return render(user_service.create_user(user=user), SignedInUser)
     except InvalidCredentialsUserException as e:
         raise HTTPException(status_code=400, detail=str(e))
     except DuplicateUserException as e:
@@ -45,7 +49,7 @@ def create_user(user: User,
 def login(email: str,
           password: str,
           user_service: UserService = Depends(),
-        ) -> User:
+        ) -> SignedInUser:
     """
     Login a user.
 
@@ -54,66 +58,98 @@ def login(email: str,
         password: The password of the user to be logged in.
 
     Returns:
-        User: The user to be logged in.
+        SignedInUser: The user to be logged in, with the tokens to authenticate plant requests with.
 
     Raises:
         404: If the user is not found.
     """
 
     try:
-        return user_service.sign_in(email=email, password=password)
+        return render(user_service.sign_in(email=email, password=password), SignedInUser)
     except UserNotFoundException as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@api.post("/refresh", tags=["User"])
+def refresh_tokens(refresh_token: str = Body(embed=True),
+                   user_service: UserService = Depends(),
+                   ) -> TokenPair:
+    """
+    Exchange a refresh token for a new pair of tokens.
+
+    Args:
+        refresh_token: The refresh token of an earlier login or refresh.
+
+    Returns:
+        TokenPair: The new access and refresh tokens.
+
+    Raises:
+        401: If the refresh token is invalid or expired, or its user no longer exists.
+    """
+
+    try:
+        return render(user_service.refresh_tokens(refresh_token=refresh_token), TokenPair)
+    except (InvalidTokenException, UserNotFoundException) as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
 # TODO: Remove this before launching to production. 
 @api.get("/get/{key}", tags=["User"])
 def get_user(key: str, 
-             user_service: UserService = Depends(),) -> User:
+             response: Response,
+             if_none_match: str | None = Header(default=None),
+             user_service: UserService = Depends(),) -> UserProfile:
     """
     Get the user model with a specified key.
     
     Args:
         key: The key for the user.
+        if_none_match: The ETag of an earlier response; answered with a 304 while the user is unchanged.
         
     Returns:
-        User: The user in the database with the specified key.
+        UserProfile: The user in the database with the specified key.
         
     Raises: 
         404: if the user is not found.
     """
     
     try:
-        user: User = user_service.get_user(key=key)
-        return user
+        user, version = user_service.get_user(key=key)
+        unchanged = not_modified(version, if_none_match)
+        if unchanged is not None:
+            return unchanged
+        tag_version(response, version)
+        return render(user, UserProfile, response)
     except UserNotFoundException as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @api.put("/update", tags=["User"])
 def get_user(key: str,
              user: User, 
-             user_service: UserService = Depends(),) -> User:
+             user_service: UserService = Depends(),) -> UserProfile:
     """
     Updates the user model with a specified key.
     
     Args:
         key: The key for the user to be updated.
-        user: The user object which has the updated properties
+        user: The user object which has the updated properties. An empty password keeps the current password.
         
     Returns:
-        User: The user in the database with the specified key.
+        UserProfile: The user in the database with the specified key.
     
     Raises:
         404: If the user is not found.
+        409: If the new email is already used for another user.
     """
     
     try:
-        return user_service.update_user(key=key, user=user)
+        return render(user_service.update_user(key=key, user=user), UserProfile)
     except UserNotFoundException as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except DuplicateUserException as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @api.delete("/delete", tags=["User"])
 def get_user(key: str, 
-             user_service: UserService = Depends(),) -> User:
+             user_service: UserService = Depends(),) -> UserProfile:
     """
     Get the user model with a specified key.
     
@@ -121,14 +157,14 @@ def get_user(key: str,
         key: The key for the user.
         
     Returns:
-        User: The user in the database with the specified key.
+        UserProfile: The user in the database with the specified key.
     
     Raises:
         404: If the user is not found.
     """
     
     try:
-        return user_service.delete_user(key=key)
+        return render(user_service.delete_user(key=key), UserProfile)
     except UserNotFoundException as e:
         raise HTTPException(status_code=404, detail=str(e))
 
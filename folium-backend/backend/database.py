@@ -1,26 +1,241 @@
 """SQLAlchemy DB Engine and Session niceties for FastAPI dependency injection."""
 
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
 import sqlalchemy
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from .env import getenv
+from .pool_metrics import instrumented_pool_class
 
-def _engine_str(database=getenv("POSTGRES_DATABASE")) -> str:
+def _engine_str(database=getenv("POSTGRES_DATABASE"),
+                dialect: str = "postgresql+psycopg2",
+                host: str | None = None,
+                port: str | None = None) -> str:
     """Helper function for reading settings from environment variables to produce connection string."""
-    dialect = "postgresql+psycopg2"
     user = getenv("POSTGRES_USER")
     password = getenv("POSTGRES_PASSWORD")
-    host = getenv("POSTGRES_HOST")
-    port = getenv("POSTGRES_PORT")
+    host = host or getenv("POSTGRES_HOST")
+    port = port or getenv("POSTGRES_PORT")
     return f"{dialect}://{user}:{password}@{host}:{port}/{database}"
 
-engine = sqlalchemy.create_engine(_engine_str(), echo=True)
+def _replica_settings() -> list[tuple[str, str, str]]:
+    """Helper function for reading read replica locations from the environment.
+
+    POSTGRES_REPLICAS is a comma separated list of `host:port/database` entries. The port and
+    database fall back to the primary's when omitted; an unset variable means no replicas.
+    """
+    replicas = []
+    for entry in getenv("POSTGRES_REPLICAS", "").split(","):
+        entry = entry.strip()
+        if entry == "":
+            continue
+        address, _, database = entry.partition("/")
+        host, _, port = address.partition(":")
+        replicas.append((host, port or getenv("POSTGRES_PORT"), database or getenv("POSTGRES_DATABASE")))
+    return replicas
+
+def _pool_settings() -> dict:
+    """Helper function for reading connection pool settings from environment variables.
+
+    The checkout timeout defaults to a couple of seconds so that an exhausted pool fails
+    requests fast with a 503 instead of queueing them for SQLAlchemy's default 30 seconds.
+    """
+    return {
+        "pool_size": int(getenv("POSTGRES_POOL_SIZE", "5")),
+        "max_overflow": int(getenv("POSTGRES_POOL_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(getenv("POSTGRES_POOL_TIMEOUT", "2")),
+        "pool_recycle": int(getenv("POSTGRES_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": getenv("POSTGRES_POOL_PRE_PING", "true").lower() == "true",
+    }
+
+_pool_class, engine_metrics = instrumented_pool_class(QueuePool, "primary")
+engine = sqlalchemy.create_engine(_engine_str(), echo=True, poolclass=_pool_class, **_pool_settings())
 """Application-level SQLAlchemy database engine."""
+engine_metrics.bind(engine)
+
+_async_pool_class, async_engine_metrics = instrumented_pool_class(AsyncAdaptedQueuePool, "primary_async")
+async_engine = create_async_engine(_engine_str(dialect="postgresql+asyncpg"), echo=True,
+                                   poolclass=_async_pool_class, **_pool_settings())
+"""Application-level SQLAlchemy database engine for the async request path."""
+async_engine_metrics.bind(async_engine.sync_engine)
+
+replica_engines: list[sqlalchemy.Engine] = []
+"""Engines for the read replicas that serve read-only service calls."""
+async_replica_engines: list[AsyncEngine] = []
+"""Engines for the read replicas that serve read-only service calls on the async request path."""
+for index, (host, port, database) in enumerate(_replica_settings()):
+    _replica_pool_class, _replica_metrics = instrumented_pool_class(QueuePool, f"replica_{index}")
+    replica_engines.append(sqlalchemy.create_engine(_engine_str(database, host=host, port=port), echo=True,
+                                                    poolclass=_replica_pool_class, **_pool_settings()))
+    _replica_metrics.bind(replica_engines[-1])
+
+    _replica_pool_class, _replica_metrics = instrumented_pool_class(AsyncAdaptedQueuePool, f"replica_{index}_async")
+    async_replica_engines.append(create_async_engine(_engine_str(database, "postgresql+asyncpg", host, port), echo=True,
+                                                     poolclass=_replica_pool_class, **_pool_settings()))
+    _replica_metrics.bind(async_replica_engines[-1].sync_engine)
+
+
+class RecentWriters:
+    """Tracks users who wrote recently so their reads are pinned to the primary.
+
+    Replicas lag the primary, so a user reading right after a write could miss it. Every
+    write marks the writer's key and, for the configured window, reads for that key skip
+    the replicas. Expired keys are dropped lazily, keeping the state O(recent writers).
+    The tracking is per process, so deployments with several workers rely on the window
+    being longer than replica lag rather than on the pin following the user between workers.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._lock = threading.Lock()
+        self._writes: dict[str, float] = {}
+
+    def mark(self, key: str) -> None:
+        """
+        Pin a user's reads to the primary for the next `window` seconds.
+
+        Args:
+            key: The key of the user who wrote.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._writes.pop(key, None)
+            self._writes[key] = now
+            # Keys are kept in write order, so expired keys are always at the front.
+            for oldest in list(itertools.islice(self._writes, 16)):
+                if now - self._writes[oldest] < self.window:
+                    break
+                del self._writes[oldest]
+
+    def is_pinned(self, key: str) -> bool:
+        """
+        Check whether a user wrote within the window.
+
+        Args:
+            key: The key of the user who is reading.
+
+        Returns:
+            bool: True if the user's reads must go to the primary.
+        """
+        with self._lock:
+            written_at = self._writes.get(key)
+        return written_at is not None and time.monotonic() - written_at < self.window
+
+    def clear(self) -> None:
+        """Forget every recent write."""
+        with self._lock:
+            self._writes.clear()
+
+
+recent_writers = RecentWriters(window=float(getenv("READ_YOUR_WRITES_SECONDS", "5")))
+"""Application-level tracker of users whose reads are pinned to the primary."""
+
+
+class ReplicaSelector:
+    """Hands out the read replicas in turn to the sessions that read from them.
+
+    One selector is shared by every session of the process, so consecutive sessions (and
+    so consecutive requests) start on different replicas instead of all on the first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._turn = 0
+
+    def pick(self, replicas: list[sqlalchemy.Engine]) -> sqlalchemy.Engine:
+        """
+        Pick the replica whose turn it is.
+
+        Args:
+            replicas: The replicas to pick from.
+
+        Returns:
+            sqlalchemy.Engine: The replica to read from.
+        """
+        with self._lock:
+            turn = self._turn
+            self._turn += 1
+        return replicas[turn % len(replicas)]
+
+
+replica_selector = ReplicaSelector()
+"""Application-level selector spreading sessions across the read replicas."""
+
+
+class RoutingSession(Session):
+    """Session that sends statements to the primary unless a read is marked replica-safe.
+
+    A session reads from a single replica, picked on its first replica-safe read, so all
+    of its reads see the same point in the replica's replay of the primary.
+    """
+
+    def __init__(self,
+                 primary: sqlalchemy.Engine,
+                 replicas: list[sqlalchemy.Engine] | None = None,
+                 **kwargs):
+        # AsyncSession passes its own (unset) bind through to the sync session class.
+        kwargs.pop("bind", None)
+        super().__init__(bind=primary, **kwargs)
+        self._primary = primary
+        self._replicas = replicas or []
+        self._replica: sqlalchemy.Engine | None = None
+        self._use_replica = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        # Writes always flush to the primary, even inside a replica-safe block.
+        if self._use_replica and len(self._replicas) > 0 and not self._flushing:
+            if self._replica is None:
+                self._replica = replica_selector.pick(self._replicas)
+            return self._replica
+        return self._primary
+
+
+@contextmanager
+def replica_reads(session: Session | AsyncSession, key: str):
+    """
+    Context manager routing the reads made inside it to a read replica.
+
+    Reads stay on the primary when the user wrote within the read-your-writes window, or
+    when the session does not route (e.g. a plain `Session` bound to a single engine).
+
+    Args:
+        session: The session the reads are made with.
+        key: The key of the user the reads are made for.
+    """
+    routing_session = getattr(session, "sync_session", session)
+    if not isinstance(routing_session, RoutingSession) or recent_writers.is_pinned(key):
+        yield
+        return
+
+    previous = routing_session._use_replica
+    routing_session._use_replica = True
+    try:
+        yield
+    finally:
+        routing_session._use_replica = previous
 
 
 def db_session():
     """Generator function offering dependency injection of SQLAlchemy Sessions."""
-    session = Session(engine)
+    session = RoutingSession(engine, replica_engines)
     try:
         yield session
     finally:
         session.close()
+
+
+async def async_db_session():
+    """Async generator function offering dependency injection of SQLAlchemy AsyncSessions."""
+    session = AsyncSession(sync_session_class=RoutingSession,
+                           primary=async_engine.sync_engine,
+                           replicas=[replica.sync_engine for replica in async_replica_engines],
+                           expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        await session.close()
@@ -2,52 +2,195 @@
 
 from .entity_base import EntityBase
 
+from .species_entity import SpeciesEntity, SPECIES_FIELDS, species_id
+
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer, String, ARRAY, Boolean
+from sqlalchemy import (Integer, String, ARRAY, Boolean, DateTime, Interval, Numeric, Uuid, ForeignKey, Index, Computed,
+                        DDL, Column, ColumnElement, FromClause, Row, case, event, func, literal, literal_column, text)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from ..models.plant import Plant
+from ..watering import next_watering_time, parse_watering_interval
+from ..text_columns import split_number, join_number, split_timestamp, join_timestamp
+from datetime import datetime, timedelta
+from decimal import Decimal
 from typing import Self
+import uuid
+
+# Plant fields stored in a typed column, mapped to the column keeping input the typed value
+# cannot reproduce and the function rebuilding the field from the two.
+_TYPED_FIELDS = {
+    "watering_benchmark_value": ("watering_benchmark_value_text", join_number),
+    "last_watering": ("last_watering_text", join_timestamp),
+}
+
+# Fields of the Plant model, in the order reads set them.
+_MODEL_FIELDS = list(Plant.model_fields)
+
+# Plant fields the watering interval is parsed from.
+INTERVAL_FIELDS = ("watering_benchmark_value", "watering_benchmark_unit")
+
+# Next watering times from this one on cannot be represented in Python, like those past `datetime.max`.
+_END_OF_TIME = literal_column("TIMESTAMP '10000-01-01'")
+
+# Full-text document of a plant; its species has a document of its own.
+SEARCH_DOCUMENT = "setweight(to_tsvector('english', coalesce(common_name, '')), 'A')"
 
 class PlantEntity(EntityBase):
     """Serves as the database model schema defining the shape of the 'plant' table."""
 
     # The name of the table in the database.
     __tablename__ = "plant"
+    # Owner lookups and keyset pagination both walk the (owner_key, id) index. The
+    # watering indexes serve "due before" scans for one owner and across all owners.
+    # The search index holds the owner (via btree_gin), the full-text document and
+    # trigrams of the common name. The remaining indexes serve filtered reads: the
+    # partial poison indexes hold only the poisonous plants of each owner, in id order,
+    # and species filters are matched against each owner's species ids.
+    __table_args__ = (
+        Index("ix_plant_owner_key_id", "owner_key", "id"),
+        Index("ix_plant_owner_key_next_watering_at", "owner_key", "next_watering_at"),
+        Index("ix_plant_next_watering_at_id", "next_watering_at", "id",
+              postgresql_where=text("next_watering_at IS NOT NULL")),
+        Index("ix_plant_search", "owner_key", "search_vector", "common_name",
+              postgresql_using="gin", postgresql_ops={"common_name": "gin_trgm_ops"}),
+        Index("ix_plant_owner_key_id_pet_poison", "owner_key", "id", postgresql_where=text("pet_poison")),
+        Index("ix_plant_owner_key_id_human_poison", "owner_key", "id", postgresql_where=text("human_poison")),
+        Index("ix_plant_owner_key_species_id", "owner_key", "species_id"),
+        Index("ix_plant_owner_key_last_watering", "owner_key", "last_watering"),
+    )
     
     # Id of the plant.
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     # Common name for the plant.
     common_name: Mapped[str] = mapped_column(String)
-    # Scientific name for the plant.
-    scientific_name: Mapped[str] = mapped_column(String)
-    # Type of plant.
-    type: Mapped[str] = mapped_column(String)
-    # The plants cycle.
-    cycle: Mapped[str] = mapped_column(String)
-    # The frequency that that the plant should be watered.
-    watering: Mapped[str] = mapped_column(String)
+    # The species of the plant, holding the reference data plants of a species share.
+    species_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("species.id"))
     # The time of day that the plant should be watered.
     watering_period: Mapped[str] = mapped_column(String)
-    # The amount of time that should pass between the plant being watered.
-    watering_benchmark_value: Mapped[str] = mapped_column(String)
+    # The amount of time that should pass between the plant being watered (the lower bound of a range).
+    watering_benchmark_value: Mapped[Decimal | None] = mapped_column(Numeric, nullable=True)
+    # The watering benchmark value as it was sent, when the number does not render back to it.
+    watering_benchmark_value_text: Mapped[str | None] = mapped_column(String, nullable=True)
     # The unit for the watering benchmark value.
     watering_benchmark_unit: Mapped[str] = mapped_column(String)
-    # The amount of sunlight that the plant should get.
-    sunlight: Mapped[str] = mapped_column(String)
     # true/false poisonous to pets.
     pet_poison: Mapped[bool] = mapped_column(Boolean)
     # True/false poisonous to humans.
     human_poison: Mapped[bool] = mapped_column(Boolean)
-    # Description of the plant.
-    description: Mapped[str] = mapped_column(String)
-    # Url for an image of the plant.
-    image_url: Mapped[str] = mapped_column(String)
     # The key for the owner of the plant.
     owner_key: Mapped[str] = mapped_column(String, nullable=False)
     # Date last watered.
-    last_watering: Mapped[str] = mapped_column(String)
+    last_watering: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Date last watered as it was sent, when the timestamp does not render back to it.
+    last_watering_text: Mapped[str | None] = mapped_column(String, nullable=True)
     # Health history, where each index is a ranking of the plants health from 1-10.
     health_history: Mapped[list[int]] = mapped_column(ARRAY(Integer))
+    # The time between waterings, parsed from the watering benchmark value and unit.
+    watering_interval: Mapped[timedelta | None] = mapped_column(Interval, nullable=True)
+    # When the plant next needs water, computed from the watering fields on every write.
+    next_watering_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Full-text search document generated by the database; only loaded when asked for.
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, Computed(SEARCH_DOCUMENT, persisted=True), deferred=True)
+
+    @classmethod
+    def column_values(cls, plant: Plant) -> dict:
+        """
+        Map a Plant model onto the values of the plant table's columns, excluding the id.
+        Species fields are replaced by the id of their species, typed fields are split into
+        their typed and text columns, and the watering interval and next watering time are
+        computed from the plant's watering fields.
+
+        Args:
+            plant: plant model
+
+        Returns:
+            dict: column name to value, usable in insert and update statements.
+        """
+
+        watering_benchmark_value, watering_benchmark_value_text = split_number(plant.watering_benchmark_value)
+        last_watering, last_watering_text = split_timestamp(plant.last_watering)
+
+        return {
+            "common_name": plant.common_name,
+            "species_id": species_id(plant),
+            "watering_period": plant.watering_period,
+            "watering_benchmark_unit": plant.watering_benchmark_unit,
+            "watering_benchmark_value": watering_benchmark_value,
+            "watering_benchmark_value_text": watering_benchmark_value_text,
+            "pet_poison": plant.pet_poison,
+            "human_poison": plant.human_poison,
+            "owner_key": plant.owner_key,
+            "last_watering": last_watering,
+            "last_watering_text": last_watering_text,
+            "health_history": plant.health_history,
+            "watering_interval": parse_watering_interval(plant.watering_benchmark_value,
+                                                         plant.watering_benchmark_unit),
+            "next_watering_at": next_watering_time(plant.last_watering,
+                                                   plant.watering_benchmark_value,
+                                                   plant.watering_benchmark_unit),
+        }
+
+    @classmethod
+    def patch_values(cls, plant: Plant, fields: list[str]) -> dict:
+        """
+        Map some fields of a Plant model onto the values of only the plant table's columns they
+        are stored in, so an update leaves every other column alone.
+
+        A species field sets the species id, which needs every species field of the model,
+        and a watering benchmark field sets the watering interval, which needs both of them.
+        The next watering time is recomputed in SQL from the last watering and watering
+        interval, taking whichever of them is not set from the row being updated.
+
+        Args:
+            plant: plant model holding the fields, and the fields they are stored together with.
+            fields: Names of fields of the Plant model, other than the id and owner key.
+
+        Returns:
+            dict: column name to value or SQL expression, usable in update statements.
+        """
+
+        all_values = cls.column_values(plant)
+        values = {}
+        for field in fields:
+            if field in SPECIES_FIELDS:
+                values["species_id"] = all_values["species_id"]
+            elif field != "next_watering_at":
+                values[field] = all_values[field]
+                if field in _TYPED_FIELDS:
+                    values[_TYPED_FIELDS[field][0]] = all_values[_TYPED_FIELDS[field][0]]
+                if field in INTERVAL_FIELDS:
+                    values["watering_interval"] = all_values["watering_interval"]
+
+        if "last_watering" in values or "watering_interval" in values:
+            columns = cls.__table__.c
+            last_watering = (literal(values["last_watering"], type_=columns.last_watering.type)
+                             if "last_watering" in values else columns.last_watering)
+            watering_interval = (literal(values["watering_interval"], type_=columns.watering_interval.type)
+                                 if "watering_interval" in values else columns.watering_interval)
+            values["next_watering_at"] = cls.next_watering_expression(last_watering, watering_interval)
+        return values
+
+    @staticmethod
+    def next_watering_expression(last_watering: ColumnElement, watering_interval: ColumnElement) -> ColumnElement:
+        """
+        Compute the next watering time in SQL, the way `next_watering_time` does in Python.
+
+        The interval is added in UTC, so a day is always 24 hours whatever the session's time
+        zone, and times past year 9999 are NULL rather than an error.
+
+        Args:
+            last_watering: The time the plant was last watered.
+            watering_interval: The time that should pass between waterings.
+
+        Returns:
+            ColumnElement: The time the plant is due, or NULL if either argument is NULL.
+        """
+
+        watered_at = func.timezone("UTC", last_watering, type_=DateTime())
+        return case((watering_interval < _END_OF_TIME - watered_at,
+                     func.timezone("UTC", watered_at + watering_interval, type_=DateTime(timezone=True))),
+                    else_=None)
 
     @classmethod
     def from_model(cls, plant: Plant) -> Self:
@@ -61,28 +204,85 @@ class PlantEntity(EntityBase):
             self
         """
         
-        return cls(
-            common_name = plant.common_name,
-            scientific_name = plant.scientific_name,
-            type = plant.type,
-            cycle = plant.cycle,
-            watering = plant.watering,
-            watering_period = plant.watering_period,
-            watering_benchmark_unit = plant.watering_benchmark_unit,
-            watering_benchmark_value = plant.watering_benchmark_value,
-            sunlight = plant.sunlight,
-            pet_poison = plant.pet_poison,
-            human_poison = plant.human_poison,
-            description = plant.description,
-            image_url = plant.image_url,
-            owner_key = plant.owner_key,
-            last_watering = plant.last_watering,
-            health_history = plant.health_history,
-        )
-    
-    def to_model(self) -> Plant:
+        return cls(**cls.column_values(plant))
+
+    @classmethod
+    def read_columns(cls, fields: list[str] | None = None) -> list[Column]:
+        """
+        Map plant fields onto the Core columns of the plant and species tables that hold them.
+
+        Reads select these columns rather than the entity, and `model_from_row` turns each
+        row into a model, so no entity is built, tracked and then copied for each plant.
+
+        Args:
+            fields: Names of fields of the Plant model. Defaults to every field.
+
+        Returns:
+            list[Column]: The columns holding the fields, always including the plant's id and
+                the text columns of typed fields. Species fields need `join_species`.
+        """
+
+        plant, species = cls.__table__, SpeciesEntity.__table__
+        columns = [plant.c.id]
+        for field in fields if fields is not None else _MODEL_FIELDS:
+            if field in SPECIES_FIELDS:
+                columns.append(species.c[field])
+            elif field != "id":
+                columns.append(plant.c[field])
+                if field in _TYPED_FIELDS:
+                    columns.append(plant.c[_TYPED_FIELDS[field][0]])
+        return columns
+
+    @classmethod
+    def join_species(cls, plants: FromClause, fields: list[str] | None = None) -> FromClause:
+        """
+        Outer join the species of the plants to a FROM clause, if any of the fields is a species field.
+
+        Args:
+            plants: A FROM clause holding the plant table.
+            fields: Names of fields of the Plant model. Defaults to every field.
+
+        Returns:
+            FromClause: The FROM clause to select the `read_columns` of the fields from.
+        """
+
+        if fields is not None and not any(field in SPECIES_FIELDS for field in fields):
+            return plants
+        species = SpeciesEntity.__table__
+        return plants.outerjoin(species, species.c.id == cls.__table__.c.species_id)
+
+    @staticmethod
+    def model_from_row(row: Row, fields: list[str] | None = None) -> Plant:
+        """
+        Build a plant model from a row holding the `read_columns` of the fields.
+
+        Args:
+            row: A result row, whose plant id is not NULL.
+            fields: Only set these fields, leaving the rest unset on the model. Defaults to every field.
+
+        Returns:
+            Plant: The plant the row holds.
+        """
+
+        values = row._mapping
+        model_values = {}
+        for field in fields if fields is not None else _MODEL_FIELDS:
+            if field in _TYPED_FIELDS:
+                text_column, join = _TYPED_FIELDS[field]
+                model_values[field] = join(values[field], values[text_column])
+            else:
+                model_values[field] = values[field]
+        return Plant(**model_values)
+
+    def to_model(self, species: SpeciesEntity) -> Plant:
         """
         Convert plant entity to plant model.
+
+        Entities are only built for the plants that INSERT, UPDATE or DELETE return; reads
+        use `read_columns` and `model_from_row` instead.
+
+        Args:
+            species: The plant's species, which writes pass as they wrote or returned it.
             
         Returns:
             Plant: model representation of self.
@@ -91,21 +291,22 @@ class PlantEntity(EntityBase):
         return Plant(
             id = self.id,
             common_name = self.common_name,
-            scientific_name = self.scientific_name,
-            type = self.type,
-            cycle = self.cycle,
-            watering = self.watering,
+            scientific_name = species.scientific_name,
+            type = species.type,
+            cycle = species.cycle,
+            watering = species.watering,
             watering_period = self.watering_period,
             watering_benchmark_unit = self.watering_benchmark_unit,
-            watering_benchmark_value = self.watering_benchmark_value,
-            sunlight = self.sunlight,
+            watering_benchmark_value = join_number(self.watering_benchmark_value, self.watering_benchmark_value_text),
+            sunlight = species.sunlight,
             pet_poison = self.pet_poison,
             human_poison = self.human_poison,
-            description = self.description,
-            image_url = self.image_url,
+            description = species.description,
+            image_url = species.image_url,
             owner_key = self.owner_key,
-            last_watering = self.last_watering,
+            last_watering = join_timestamp(self.last_watering, self.last_watering_text),
             health_history = self.health_history,
+            next_watering_at = self.next_watering_at,
         )
     
     def update(self, plant: Plant) -> None:
@@ -116,18 +317,13 @@ class PlantEntity(EntityBase):
             plant: the plant model to update with.
         """
 
-        self.common_name = plant.common_name
-        self.scientific_name = plant.scientific_name
-        self.type = plant.type
-        self.cycle = plant.cycle
-        self.watering = plant.watering
-        self.watering_period = plant.watering_period
-        self.watering_benchmark_value = plant.watering_benchmark_value
-        self.watering_benchmark_unit = plant.watering_benchmark_unit
-        self.sunlight = plant.sunlight
-        self.pet_poison = plant.pet_poison
-        self.human_poison = plant.human_poison
-        self.description = plant.description
-        self.image_url = plant.image_url
-        self.last_watering = plant.last_watering
-        self.health_history = plant.health_history
\ No newline at end of file
+        for name, value in self.column_values(plant).items():
+            # The owner of a plant does not change.
+            if name != "owner_key":
+                setattr(self, name, value)
+
+
+# The search indexes need trigram operator classes and GIN support for the owner key.
+for extension in ("pg_trgm", "btree_gin"):
+    event.listen(EntityBase.metadata, "before_create",
+                 DDL(f"CREATE EXTENSION IF NOT EXISTS {extension}").execute_if(dialect="postgresql"))
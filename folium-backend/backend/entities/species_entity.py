@@ -0,0 +1,99 @@
+"""Definition of SQLAlchemy backend table to store the species catalog shared by plants"""
+
+import json
+import uuid
+
+from .entity_base import EntityBase
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Uuid, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from ..models.plant import Plant
+from typing import Self
+
+# Plant fields that describe the species rather than the individual plant.
+SPECIES_FIELDS = ("scientific_name", "type", "cycle", "watering", "sunlight", "description", "image_url")
+
+# Namespace of the name-based UUIDs that identify species by their fields.
+SPECIES_NAMESPACE = uuid.UUID("6f1c2b2e-4f55-4d2a-9a39-3c1b1f0e7d52")
+
+# Full-text document of a species: its name weighs as much as a plant's common name.
+SEARCH_DOCUMENT = ("setweight(to_tsvector('english', coalesce(scientific_name, '')), 'A') || "
+                   "setweight(to_tsvector('english', coalesce(description, '')), 'B')")
+
+def species_id(plant: Plant) -> uuid.UUID:
+    """
+    Identify the species of a plant by its species fields.
+
+    Species rows are never updated: a plant whose species fields change points at the
+    species with the new fields. The id is a name-based UUID of the fields, so every
+    writer derives the same id for the same species without reading the table first.
+
+    Args:
+        plant: plant model
+
+    Returns:
+        uuid.UUID: The id of the plant's species.
+    """
+
+    return uuid.uuid5(SPECIES_NAMESPACE, json.dumps([getattr(plant, field) for field in SPECIES_FIELDS]))
+
+class SpeciesEntity(EntityBase):
+    """Serves as the database model schema defining the shape of the 'species' table."""
+
+    # The name of the table in the database.
+    __tablename__ = "species"
+    # Search matches a species once and then the plants of that species.
+    __table_args__ = (
+        Index("ix_species_search", "search_vector", postgresql_using="gin"),
+        Index("ix_species_scientific_name_trgm", "scientific_name",
+              postgresql_using="gin", postgresql_ops={"scientific_name": "gin_trgm_ops"}),
+    )
+
+    # Id of the species, derived from its fields by `species_id`.
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True)
+    # Scientific name for the species.
+    scientific_name: Mapped[str] = mapped_column(String)
+    # Type of plant.
+    type: Mapped[str] = mapped_column(String)
+    # The species cycle.
+    cycle: Mapped[str] = mapped_column(String)
+    # The frequency that that the species should be watered.
+    watering: Mapped[str] = mapped_column(String)
+    # The amount of sunlight that the species should get.
+    sunlight: Mapped[str] = mapped_column(String)
+    # Description of the species.
+    description: Mapped[str] = mapped_column(String)
+    # Url for an image of the species.
+    image_url: Mapped[str] = mapped_column(String)
+    # Full-text search document generated by the database; only loaded when asked for.
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, Computed(SEARCH_DOCUMENT, persisted=True), deferred=True)
+
+    @classmethod
+    def column_values(cls, plant: Plant) -> dict:
+        """
+        Map the species fields of a Plant model onto the values of the species table's columns.
+
+        Args:
+            plant: plant model
+
+        Returns:
+            dict: column name to value, including the id, usable in insert statements.
+        """
+
+        return {"id": species_id(plant), **{field: getattr(plant, field) for field in SPECIES_FIELDS}}
+
+    @classmethod
+    def from_model(cls, plant: Plant) -> Self:
+        """
+        Convert the species fields of a Plant model to a Species entity
+
+        Args:
+            plant: plant model
+
+        Returns:
+            self
+        """
+
+        return cls(**cls.column_values(plant))
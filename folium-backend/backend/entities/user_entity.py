@@ -1,10 +1,12 @@
 """Definition of SQLAlchemy backend table entity to represent users."""
 
 from .entity_base import EntityBase
-from ..models.user import User
+from ..models.user import User, UserProfile
+from ..text_columns import split_timestamp, join_timestamp
+from datetime import datetime
 from typing import Self
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer, String
+from sqlalchemy import Integer, String, DateTime, Column, Row
 
 class UserEntity(EntityBase):
     """Serves as the database model schema defining the shape of the `User` table"""
@@ -19,13 +21,17 @@ class UserEntity(EntityBase):
     # Column to store the users last name
     last_name: Mapped[String] = mapped_column(String, nullable=False)
     # Column to store the users email 
-    email: Mapped[String] = mapped_column(String, nullable=False)
+    email: Mapped[String] = mapped_column(String, nullable=False, unique=True, index=True)
     # Column to store the users password
     password: Mapped[String] = mapped_column(String, nullable=False)
     # Column to store when the user was created
-    created_at: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Column to store when the user was created as it was sent, when the timestamp does not render back to it
+    created_at_text: Mapped[str | None] = mapped_column(String, nullable=True)
     # key for the user to access their own information
-    key: Mapped[str] = mapped_column(String, nullable=False)
+    key: Mapped[str] = mapped_column(String, nullable=False, unique=True, index=True)
+    # Counter bumped by every write to the user or their plants, identifying the version of their reads
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     @classmethod
     def from_model(cls, user: User) -> Self:
@@ -38,41 +44,76 @@ class UserEntity(EntityBase):
         Returns:
             Self: the not yet persisted entity.
         """
+        created_at, created_at_text = split_timestamp(user.created_at)
         return cls(
             id = user.id,
             first_name = user.first_name,
             last_name = user.last_name,
             email = user.email,
             password = user.password,
-            created_at = user.created_at,
+            created_at = created_at,
+            created_at_text = created_at_text,
             key = user.key,
         )
 
-    def to_model(self) -> User:
+    @classmethod
+    def read_columns(cls) -> list[Column]:
+        """
+        Lists the table columns a read selects to build a user model without an entity.
+
+        The password hash is not among them: it is only read to sign a user in.
+
+        Returns:
+            list[Column]: the columns `model_from_row` reads.
+        """
+        user = cls.__table__
+        return [user.c.id, user.c.first_name, user.c.last_name, user.c.email,
+                user.c.created_at, user.c.created_at_text, user.c.key]
+
+    @staticmethod
+    def model_from_row(row: Row) -> UserProfile:
+        """
+        Builds a user model straight from a row of `read_columns`.
+
+        Args:
+            row: the row to build the model from.
+
+        Returns:
+            UserProfile: instance of a user model, without the password.
+        """
+        return UserProfile(
+            id=row.id,
+            first_name=row.first_name,
+            last_name=row.last_name,
+            email=row.email,
+            created_at=join_timestamp(row.created_at, row.created_at_text),
+            key=row.key,
+        )
+
+    def to_model(self) -> UserProfile:
         """
         Converts Self to an instance of a user model.
 
         Returns:
-            User: instance of a user model.
+            UserProfile: instance of a user model, without the password.
         """
-        return User(
+        return UserProfile(
             id=self.id,
             first_name=self.first_name,
             last_name=self.last_name,
             email=self.email,
-            password=self.password,
-            created_at=self.created_at,
+            created_at=join_timestamp(self.created_at, self.created_at_text),
             key = self.key,
         )
 
     def update(self, user: User) -> None:
         """
-        Updates self using the provided user model.
+        Updates self using the provided user model, except for the password, which is
+        stored hashed by the user service.
 
         Returns:
             None
         """
         self.first_name = user.first_name
         self.last_name = user.last_name
-        self.email = user.email
-        self.password = user.password
\ No newline at end of file
+        self.email = user.email
\ No newline at end of file
@@ -7,15 +7,20 @@ import dotenv
 dotenv.load_dotenv(verbose=True)
 
 
-def getenv(variable: str) -> str:
+def getenv(variable: str, default: str | None = None) -> str:
     """Get value of environment variable or raise an error if undefined.
 
     Unlike `os.getenv`, our application expects all environment variables it needs to be defined
     and we intentionally fast error out with a diagnostic message to avoid scenarios of running
     the application when expected environment variables are not set.
+
+    Optional tuning settings may pass a `default`, which is returned instead of raising when the
+    variable is not set.
     """
     value = os.getenv(variable)
     if value is not None:
         return value
+    elif default is not None:
+        return default
     else:
         raise NameError(f"Error: {variable} Environment Variable not Defined")
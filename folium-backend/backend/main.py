@@ -4,12 +4,19 @@
 from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from .api import (
     user,
-    plant
+    plant,
+    async_user,
+    async_plant,
+    internal,
 )
 
+from .admission import AdmissionMiddleware, parse_route_limits
 from .database import _engine_str
+from .env import getenv
+from .services.exceptions import PasswordHasherBusyException
 
 description = """
 Welcome to the Folium RESTful application programming interface
@@ -23,14 +30,57 @@ app = FastAPI(
     openapi_tags=[
         user.openapi_tags,
         plant.openapi_tags,
+        internal.openapi_tags,
     ],
 )
 
-# Plugging in each of the router APIs
-feature_apis = [
-    user,
-    plant,
-]
+# Plugging in each of the router APIs. Setting API_MODE=async serves the same routes
+# through the AsyncEngine/AsyncSession stack instead of the threadpool-bound sync stack.
+if getenv("API_MODE", "sync") == "async":
+    feature_apis = [
+        async_user,
+        async_plant,
+    ]
+else:
+    feature_apis = [
+        user,
+        plant,
+    ]
 
 for feature_api in feature_apis:
-    app.include_router(feature_api.api)
\ No newline at end of file
+    app.include_router(feature_api.api)
+
+app.include_router(internal.api)
+
+# Admission control in front of every route: token bucket rate limits per client, with
+# tighter limits on the routes that are expensive to serve, and load shedding once too
+# many requests are in flight or database connections are slow to come by.
+app.add_middleware(
+    AdmissionMiddleware,
+    rate=float(getenv("RATE_LIMIT_PER_SECOND", "20")),
+    burst=float(getenv("RATE_LIMIT_BURST", "40")),
+    route_limits=parse_route_limits(getenv("RATE_LIMIT_ROUTES",
+                                           "/user/create=0.2:3,/user/login=1:5,/plant/export_user_plants=0.1:2")),
+    max_in_flight=int(getenv("MAX_IN_FLIGHT_REQUESTS", "100")),
+    max_pool_wait=float(getenv("LOAD_SHED_POOL_WAIT_SECONDS", "0.5")),
+)
+
+
+@app.exception_handler(PoolTimeoutError)
+def pool_exhausted_handler(request: Request, e: PoolTimeoutError) -> JSONResponse:
+    """Fail fast with a 503 when no database connection could be checked out in time."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily overloaded. Please retry."},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(PasswordHasherBusyException)
+def password_hasher_busy_handler(request: Request, e: PasswordHasherBusyException) -> JSONResponse:
+    """Shed sign ups and logins with a 503 when the password hashing pool is saturated."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(e)},
+        headers={"Retry-After": "1"},
+    )
@@ -0,0 +1,55 @@
+"""Alembic migration environment for the Folium database schema."""
+
+from logging.config import fileConfig
+
+from sqlalchemy import create_engine, pool
+
+from alembic import context
+
+from backend.database import _engine_str
+from backend.entities.entity_base import EntityBase
+from backend.entities import user_entity, plant_entity  # noqa: F401 - registers the tables on the metadata.
+
+config = context.config
+
+# Set up loggers from the ini file when running through the alembic CLI.
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# Metadata of the entities, used by `alembic revision --autogenerate`.
+target_metadata = EntityBase.metadata
+
+
+def _url() -> str:
+    """Use an explicitly configured url (e.g. from the benchmark script) or the application's database."""
+    return config.get_main_option("sqlalchemy.url") or _engine_str()
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL to stdout instead of running it against a database."""
+    context.configure(
+        url=_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run the migrations against the configured database."""
+    connectable = create_engine(_url(), poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,58 @@
+"""Initial schema
+
+The user and plant tables as they were created by `metadata.create_all` before the
+schema was managed by Alembic. Databases created that way already match this
+revision and should be marked with `alembic stamp 0001` before upgrading.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 18:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("first_name", sa.String(), nullable=False),
+        sa.Column("last_name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("password", sa.String(), nullable=False),
+        sa.Column("created_at", sa.String(), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+    )
+    op.create_table(
+        "plant",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("common_name", sa.String(), nullable=False),
+        sa.Column("scientific_name", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("cycle", sa.String(), nullable=False),
+        sa.Column("watering", sa.String(), nullable=False),
+        sa.Column("watering_period", sa.String(), nullable=False),
+        sa.Column("watering_benchmark_value", sa.String(), nullable=False),
+        sa.Column("watering_benchmark_unit", sa.String(), nullable=False),
+        sa.Column("sunlight", sa.String(), nullable=False),
+        sa.Column("pet_poison", sa.Boolean(), nullable=False),
+        sa.Column("human_poison", sa.Boolean(), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("image_url", sa.String(), nullable=False),
+        sa.Column("owner_key", sa.String(), nullable=False),
+        sa.Column("last_watering", sa.String(), nullable=False),
+        sa.Column("health_history", sa.ARRAY(sa.Integer()), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("plant")
+    op.drop_table("user")
@@ -0,0 +1,39 @@
+"""Indexes on user.key, user.email and plant.owner_key
+
+Every request filters on one of these columns. The indexes are built with
+CREATE INDEX CONCURRENTLY so the upgrade can run against a live database without
+blocking writes. A concurrent build cannot run inside a transaction, hence the
+autocommit block; if it fails (e.g. duplicate emails) Postgres leaves an INVALID
+index behind that must be dropped before retrying.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 18:31:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_user_key", "user", ["key"], unique=True,
+                        postgresql_concurrently=True)
+        op.create_index("ix_user_email", "user", ["email"], unique=True,
+                        postgresql_concurrently=True)
+        op.create_index("ix_plant_owner_key", "plant", ["owner_key"],
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_plant_owner_key", "plant", postgresql_concurrently=True)
+        op.drop_index("ix_user_email", "user", postgresql_concurrently=True)
+        op.drop_index("ix_user_key", "user", postgresql_concurrently=True)
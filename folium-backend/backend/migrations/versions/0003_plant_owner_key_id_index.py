@@ -0,0 +1,33 @@
+"""Composite (owner_key, id) index for keyset pagination of a user's plants
+
+Replaces the single column owner_key index: the composite index serves the same
+owner lookups and also lets a page of plants be read in id order from the index.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 19:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_plant_owner_key_id", "plant", ["owner_key", "id"],
+                        postgresql_concurrently=True)
+        op.drop_index("ix_plant_owner_key", "plant", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_plant_owner_key", "plant", ["owner_key"],
+                        postgresql_concurrently=True)
+        op.drop_index("ix_plant_owner_key_id", "plant", postgresql_concurrently=True)
@@ -0,0 +1,77 @@
+"""Computed plant.next_watering_at column and the indexes behind "plants due" queries
+
+The column is backfilled from the free-form watering fields of existing plants in
+batches, each its own statement, before the indexes are built concurrently. Plants
+whose fields cannot be parsed are left NULL and the partial index skips them.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 19:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.watering import next_watering_time
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# Number of plants read and updated per backfill batch.
+BACKFILL_BATCH_SIZE = 5000
+
+plant = sa.table(
+    "plant",
+    sa.column("id", sa.Integer),
+    sa.column("last_watering", sa.String),
+    sa.column("watering_benchmark_value", sa.String),
+    sa.column("watering_benchmark_unit", sa.String),
+    sa.column("next_watering_at", sa.DateTime(timezone=True)),
+)
+
+
+def backfill() -> None:
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(plant.c.id, plant.c.last_watering, plant.c.watering_benchmark_value, plant.c.watering_benchmark_unit)
+            .where(plant.c.id > last_id)
+            .order_by(plant.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if len(rows) == 0:
+            return
+        due = [{"plant_id": row.id, "due": next_watering_time(row.last_watering,
+                                                              row.watering_benchmark_value,
+                                                              row.watering_benchmark_unit)}
+               for row in rows]
+        due = [values for values in due if values["due"] is not None]
+        if len(due) > 0:
+            connection.execute(
+                plant.update().where(plant.c.id == sa.bindparam("plant_id")).values(next_watering_at=sa.bindparam("due")),
+                due,
+            )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column("plant", sa.Column("next_watering_at", sa.DateTime(timezone=True), nullable=True))
+    backfill()
+    with op.get_context().autocommit_block():
+        op.create_index("ix_plant_owner_key_next_watering_at", "plant", ["owner_key", "next_watering_at"],
+                        postgresql_concurrently=True)
+        op.create_index("ix_plant_next_watering_at_id", "plant", ["next_watering_at", "id"],
+                        postgresql_where=sa.text("next_watering_at IS NOT NULL"),
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_plant_next_watering_at_id", "plant", postgresql_concurrently=True)
+        op.drop_index("ix_plant_owner_key_next_watering_at", "plant", postgresql_concurrently=True)
+    op.drop_column("plant", "next_watering_at")
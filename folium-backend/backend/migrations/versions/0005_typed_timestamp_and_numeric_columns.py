@@ -0,0 +1,89 @@
+"""Typed columns for plant.last_watering, plant.watering_benchmark_value and user.created_at
+
+Each string column is renamed to `<column>_text` and a TIMESTAMPTZ or NUMERIC column is
+added under the original name, so no input is dropped. The backfill then parses every
+row in id batches: the typed column gets the parsed value and the text column is cleared
+wherever the typed value renders back to the original string, so it only keeps input
+the typed column cannot reproduce (e.g. a range like "7-10" or an unparseable date).
+The renames hold an exclusive lock on both tables until the backfill commits, so run
+the upgrade while the API is stopped; the old API cannot read the typed columns anyway.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 20:25:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.text_columns import split_number, split_timestamp
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# Number of rows read and updated per backfill batch.
+BACKFILL_BATCH_SIZE = 5000
+
+# Typed columns by table: the column name, its type, how to split the original text and,
+# for the downgrade, the SQL rendering the typed value back into the API's text format.
+TYPED_COLUMNS = {
+    "plant": [
+        ("watering_benchmark_value", sa.Numeric(), split_number,
+         "watering_benchmark_value::text"),
+        ("last_watering", sa.DateTime(timezone=True), split_timestamp,
+         "to_char(last_watering AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS')"),
+    ],
+    "user": [
+        ("created_at", sa.DateTime(timezone=True), split_timestamp,
+         "to_char(created_at AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS')"),
+    ],
+}
+
+
+def backfill(table_name: str, columns: list) -> None:
+    table = sa.table(table_name, sa.column("id", sa.Integer),
+                     *[sa.column(name, type_) for name, type_, _, _ in columns],
+                     *[sa.column(f"{name}_text", sa.String) for name, _, _, _ in columns])
+    connection = op.get_bind()
+    statement = (table.update()
+                 .where(table.c.id == sa.bindparam("row_id"))
+                 .values({name: sa.bindparam(f"new_{name}") for name, _, _, _ in columns}
+                         | {f"{name}_text": sa.bindparam(f"new_{name}_text") for name, _, _, _ in columns}))
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, *[table.c[f"{name}_text"] for name, _, _, _ in columns])
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if len(rows) == 0:
+            return
+        updates = []
+        for row in rows:
+            values = {"row_id": row.id}
+            for name, _, split, _ in columns:
+                values[f"new_{name}"], values[f"new_{name}_text"] = split(row._mapping[f"{name}_text"])
+            updates.append(values)
+        connection.execute(statement, updates)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    for table_name, columns in TYPED_COLUMNS.items():
+        for name, type_, _, _ in columns:
+            op.alter_column(table_name, name, new_column_name=f"{name}_text", nullable=True)
+            op.add_column(table_name, sa.Column(name, type_, nullable=True))
+        backfill(table_name, columns)
+
+
+def downgrade() -> None:
+    for table_name, columns in TYPED_COLUMNS.items():
+        for name, _, _, render in columns:
+            op.execute(f'UPDATE "{table_name}" SET {name}_text = COALESCE({name}_text, {render}, \'\')')
+            op.drop_column(table_name, name)
+            op.alter_column(table_name, f"{name}_text", new_column_name=name, nullable=False)
@@ -0,0 +1,46 @@
+"""Generated full-text search column on plant and the owner-scoped search index
+
+Adds `plant.search_vector`, a stored generated tsvector over the plant's names and
+description, and one GIN index over (owner_key, search_vector, trigrams of
+common_name and scientific_name). The owner key needs btree_gin to live in a GIN
+index and the trigram operator classes need pg_trgm; both are trusted extensions, so
+the database owner can create them. Adding a stored generated column rewrites the
+table under an exclusive lock; the index is then built concurrently. The downgrade
+leaves the extensions installed, since other objects may have come to depend on them.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 21:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+SEARCH_DOCUMENT = ("setweight(to_tsvector('english', coalesce(common_name, '')), 'A') || "
+                   "setweight(to_tsvector('english', coalesce(scientific_name, '')), 'A') || "
+                   "setweight(to_tsvector('english', coalesce(description, '')), 'B')")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.add_column("plant", sa.Column("search_vector", TSVECTOR(), sa.Computed(SEARCH_DOCUMENT, persisted=True)))
+    with op.get_context().autocommit_block():
+        op.create_index("ix_plant_search", "plant", ["owner_key", "search_vector", "common_name", "scientific_name"],
+                        postgresql_using="gin",
+                        postgresql_ops={"common_name": "gin_trgm_ops", "scientific_name": "gin_trgm_ops"},
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_plant_search", "plant", postgresql_concurrently=True)
+    op.drop_column("plant", "search_vector")
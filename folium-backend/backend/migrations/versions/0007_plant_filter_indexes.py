@@ -0,0 +1,41 @@
+"""Owner-keyed indexes behind filtered plant reads
+
+Partial (owner_key, id) indexes hold only the plants poisonous to pets or to humans,
+so "show me the pet-toxic plants" reads just those rows in page order. A composite
+(owner_key, type, cycle, sunlight) index serves the category filters and an
+(owner_key, last_watering) index serves watering ranges. All are built concurrently.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_plant_owner_key_id_pet_poison", "plant", ["owner_key", "id"],
+                        postgresql_where=sa.text("pet_poison"), postgresql_concurrently=True)
+        op.create_index("ix_plant_owner_key_id_human_poison", "plant", ["owner_key", "id"],
+                        postgresql_where=sa.text("human_poison"), postgresql_concurrently=True)
+        op.create_index("ix_plant_owner_key_type_cycle_sunlight", "plant", ["owner_key", "type", "cycle", "sunlight"],
+                        postgresql_concurrently=True)
+        op.create_index("ix_plant_owner_key_last_watering", "plant", ["owner_key", "last_watering"],
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_plant_owner_key_last_watering", "plant", postgresql_concurrently=True)
+        op.drop_index("ix_plant_owner_key_type_cycle_sunlight", "plant", postgresql_concurrently=True)
+        op.drop_index("ix_plant_owner_key_id_human_poison", "plant", postgresql_concurrently=True)
+        op.drop_index("ix_plant_owner_key_id_pet_poison", "plant", postgresql_concurrently=True)
@@ -0,0 +1,140 @@
+"""Species catalog shared by plants
+
+Moves the seven species fields (scientific name, type, cycle, watering, sunlight,
+description and image url) out of `plant` into a `species` table that plants reference
+by `plant.species_id`. A species is identified by a name-based UUID of its fields, so
+the backfill derives each plant's species id from its own row: plants are read in id
+batches, their species inserted (skipping ones already present) and their species ids
+set. The species columns are then dropped along with the indexes and the generated
+search column that read them; the search column is regenerated over the common name
+alone and the species get a search document of their own. Dropping and regenerating the
+columns rewrites `plant` under an exclusive lock, so run the upgrade while the API is
+stopped. The new indexes are then built concurrently.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 23:10:00.000000
+
+"""
+import json
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR, insert
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+# Number of plants read and updated per backfill batch.
+BACKFILL_BATCH_SIZE = 5000
+
+# The species fields, in the order their values are hashed into the species id.
+SPECIES_FIELDS = ("scientific_name", "type", "cycle", "watering", "sunlight", "description", "image_url")
+
+# Namespace of the name-based UUIDs that identify species by their fields.
+SPECIES_NAMESPACE = uuid.UUID("6f1c2b2e-4f55-4d2a-9a39-3c1b1f0e7d52")
+
+SPECIES_SEARCH_DOCUMENT = ("setweight(to_tsvector('english', coalesce(scientific_name, '')), 'A') || "
+                           "setweight(to_tsvector('english', coalesce(description, '')), 'B')")
+
+PLANT_SEARCH_DOCUMENT = "setweight(to_tsvector('english', coalesce(common_name, '')), 'A')"
+
+# The plant search document before the species fields moved out, restored by the downgrade.
+PREVIOUS_PLANT_SEARCH_DOCUMENT = ("setweight(to_tsvector('english', coalesce(common_name, '')), 'A') || "
+                                  "setweight(to_tsvector('english', coalesce(scientific_name, '')), 'A') || "
+                                  "setweight(to_tsvector('english', coalesce(description, '')), 'B')")
+
+
+def backfill() -> None:
+    plant = sa.table("plant", sa.column("id", sa.Integer), sa.column("species_id", sa.Uuid),
+                     *[sa.column(field, sa.String) for field in SPECIES_FIELDS])
+    species = sa.table("species", sa.column("id", sa.Uuid), *[sa.column(field, sa.String) for field in SPECIES_FIELDS])
+    connection = op.get_bind()
+    statement = (plant.update()
+                 .where(plant.c.id == sa.bindparam("row_id"))
+                 .values(species_id=sa.bindparam("new_species_id")))
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(plant.c.id, *[plant.c[field] for field in SPECIES_FIELDS])
+            .where(plant.c.id > last_id)
+            .order_by(plant.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if len(rows) == 0:
+            return
+        batch_species = {}
+        updates = []
+        for row in rows:
+            values = [row._mapping[field] for field in SPECIES_FIELDS]
+            species_id = uuid.uuid5(SPECIES_NAMESPACE, json.dumps(values))
+            batch_species[species_id] = dict(zip(SPECIES_FIELDS, values), id=species_id)
+            updates.append({"row_id": row.id, "new_species_id": species_id})
+        connection.execute(insert(species).values(list(batch_species.values())).on_conflict_do_nothing())
+        connection.execute(statement, updates)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.create_table(
+        "species",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        *[sa.Column(field, sa.String(), nullable=False) for field in SPECIES_FIELDS],
+        sa.Column("search_vector", TSVECTOR(), sa.Computed(SPECIES_SEARCH_DOCUMENT, persisted=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.add_column("plant", sa.Column("species_id", sa.Uuid(), nullable=True))
+    backfill()
+    op.alter_column("plant", "species_id", nullable=False)
+    op.create_foreign_key("plant_species_id_fkey", "plant", "species", ["species_id"], ["id"])
+
+    op.drop_index("ix_plant_search", "plant")
+    op.drop_index("ix_plant_owner_key_type_cycle_sunlight", "plant")
+    op.drop_column("plant", "search_vector")
+    for field in SPECIES_FIELDS:
+        op.drop_column("plant", field)
+    op.add_column("plant", sa.Column("search_vector", TSVECTOR(), sa.Computed(PLANT_SEARCH_DOCUMENT, persisted=True)))
+
+    with op.get_context().autocommit_block():
+        op.create_index("ix_species_search", "species", ["search_vector"],
+                        postgresql_using="gin", postgresql_concurrently=True)
+        op.create_index("ix_species_scientific_name_trgm", "species", ["scientific_name"],
+                        postgresql_using="gin", postgresql_ops={"scientific_name": "gin_trgm_ops"},
+                        postgresql_concurrently=True)
+        op.create_index("ix_plant_search", "plant", ["owner_key", "search_vector", "common_name"],
+                        postgresql_using="gin", postgresql_ops={"common_name": "gin_trgm_ops"},
+                        postgresql_concurrently=True)
+        op.create_index("ix_plant_owner_key_species_id", "plant", ["owner_key", "species_id"],
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_plant_owner_key_species_id", "plant", postgresql_concurrently=True)
+        op.drop_index("ix_plant_search", "plant", postgresql_concurrently=True)
+
+    op.drop_column("plant", "search_vector")
+    for field in SPECIES_FIELDS:
+        op.add_column("plant", sa.Column(field, sa.String(), nullable=True))
+    op.execute("UPDATE plant SET " + ", ".join(f"{field} = species.{field}" for field in SPECIES_FIELDS)
+               + " FROM species WHERE species.id = plant.species_id")
+    for field in SPECIES_FIELDS:
+        op.alter_column("plant", field, nullable=False)
+    op.drop_constraint("plant_species_id_fkey", "plant", type_="foreignkey")
+    op.drop_column("plant", "species_id")
+    op.drop_table("species")
+    op.add_column("plant", sa.Column("search_vector", TSVECTOR(),
+                                     sa.Computed(PREVIOUS_PLANT_SEARCH_DOCUMENT, persisted=True)))
+
+    with op.get_context().autocommit_block():
+        op.create_index("ix_plant_owner_key_type_cycle_sunlight", "plant", ["owner_key", "type", "cycle", "sunlight"],
+                        postgresql_concurrently=True)
+        op.create_index("ix_plant_search", "plant", ["owner_key", "search_vector", "common_name", "scientific_name"],
+                        postgresql_using="gin",
+                        postgresql_ops={"common_name": "gin_trgm_ops", "scientific_name": "gin_trgm_ops"},
+                        postgresql_concurrently=True)
@@ -0,0 +1,27 @@
+"""Per-user version counter behind conditional reads
+
+Adds `user.version`, which every write to a user or their plants bumps. Its default is
+a constant, so Postgres adds the column without rewriting the table.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("user", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("user", "version")
@@ -0,0 +1,73 @@
+"""Stored plant.watering_interval, so the next watering time can be computed in SQL
+
+A partial update that only sets a plant's last watering recomputes `next_watering_at` from
+this column instead of reading the watering benchmark first. The column is backfilled from
+the watering benchmark of existing plants in batches, each its own statement. Plants whose
+benchmark cannot be parsed are left NULL.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.text_columns import join_number
+from backend.watering import parse_watering_interval
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+# Number of plants read and updated per backfill batch.
+BACKFILL_BATCH_SIZE = 5000
+
+plant = sa.table(
+    "plant",
+    sa.column("id", sa.Integer),
+    sa.column("watering_benchmark_value", sa.Numeric),
+    sa.column("watering_benchmark_value_text", sa.String),
+    sa.column("watering_benchmark_unit", sa.String),
+    sa.column("watering_interval", sa.Interval),
+)
+
+
+def backfill() -> None:
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(plant.c.id, plant.c.watering_benchmark_value, plant.c.watering_benchmark_value_text,
+                      plant.c.watering_benchmark_unit)
+            .where(plant.c.id > last_id)
+            .order_by(plant.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if len(rows) == 0:
+            return
+        intervals = [{"plant_id": row.id,
+                      "interval": parse_watering_interval(join_number(row.watering_benchmark_value,
+                                                                      row.watering_benchmark_value_text),
+                                                          row.watering_benchmark_unit or "")}
+                     for row in rows]
+        intervals = [values for values in intervals if values["interval"] is not None]
+        if len(intervals) > 0:
+            connection.execute(
+                plant.update().where(plant.c.id == sa.bindparam("plant_id"))
+                .values(watering_interval=sa.bindparam("interval")),
+                intervals,
+            )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column("plant", sa.Column("watering_interval", sa.Interval(), nullable=True))
+    backfill()
+
+
+def downgrade() -> None:
+    op.drop_column("plant", "watering_interval")
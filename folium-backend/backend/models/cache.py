@@ -0,0 +1,21 @@
+"""Cache status model serves as the data object for reporting in-process cache metrics."""
+
+from pydantic import BaseModel
+
+class CacheStatus(BaseModel):
+    """
+    Pydantic model to represent the live state of an in-process cache.
+
+    `size` is read when the status is taken; the remaining counters are
+    totals since process start.
+    """
+
+    name: str
+    size: int = 0
+    max_size: int = 0
+    ttl_seconds: float = 0.0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
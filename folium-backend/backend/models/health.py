@@ -0,0 +1,30 @@
+"""Health models serve as the data objects for reporting analytics over plants' health histories."""
+
+from pydantic import BaseModel
+
+class PlantHealth(BaseModel):
+    """
+    Pydantic model to represent the health trend of one plant.
+
+    The statistics cover the last `window` scores of the plant's
+    health history and are None when there are too few scores."""
+
+    id: int
+    entries: int = 0
+    latest: int | None = None
+    rolling_average: float | None = None
+    trend_slope: float | None = None
+    volatility: float | None = None
+    declining: bool = False
+
+
+class GardenHealth(BaseModel):
+    """
+    Pydantic model to represent the health trends of all of a user's plants.
+
+    `window` is the number of most recent scores each statistic covers,
+    and `declining` counts the plants flagged as declining."""
+
+    window: int
+    declining: int = 0
+    plants: list[PlantHealth] = []
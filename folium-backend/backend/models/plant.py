@@ -1,5 +1,7 @@
 """Plant model serves as the data object for representing plants across application layers."""
 
+from datetime import datetime
+
 from pydantic import BaseModel
 
 class PlantIdentity(BaseModel):
@@ -38,3 +40,69 @@ class Plant(PlantIdentity, BaseModel):
     owner_key: str = ""
     last_watering: str = ""
     health_history: list[int] = []
+    # Computed from the watering fields; ignored when sent to the API.
+    next_watering_at: datetime | None = None
+
+
+class PlantFilter(BaseModel):
+    """
+    Pydantic model to represent the filters a read of a user's
+    plants can apply.
+
+    Each set filter must match for a plant to be returned; unset
+    filters match every plant. The last watering range is
+    inclusive, and plants without a known last watering are only
+    returned when neither bound is set."""
+
+    type: str | None = None
+    cycle: str | None = None
+    sunlight: str | None = None
+    pet_poison: bool | None = None
+    human_poison: bool | None = None
+    watered_after: datetime | None = None
+    watered_before: datetime | None = None
+
+
+class PlantPage(BaseModel):
+    """
+    Pydantic model to represent one page of a user's plants.
+
+    Plants are ordered by id. `next_cursor` is an opaque token for
+    requesting the following page and is None on the last page."""
+
+    plants: list[Plant] = []
+    next_cursor: str | None = None
+
+
+class BulkPlantError(BaseModel):
+    """
+    Pydantic model to represent why one plant of a bulk
+    request was not written.
+
+    `index` is the position of the plant in the request."""
+
+    index: int
+    detail: str
+
+
+class BulkPlantResult(BaseModel):
+    """
+    Pydantic model to represent the outcome of a bulk plant request.
+
+    `plants` holds the plants that were written, in request order,
+    and `errors` holds one entry for each plant that was not."""
+
+    plants: list[Plant] = []
+    errors: list[BulkPlantError] = []
+
+
+class HealthScore(BaseModel):
+    """
+    Pydantic model to represent a health score recorded for a plant.
+
+    `entries` is the length of the plant's health history
+    after the score was appended to it, which keeps the 1000 most recent scores."""
+
+    id: int
+    score: int
+    entries: int
@@ -0,0 +1,21 @@
+"""Pool status model serves as the data object for reporting connection pool metrics."""
+
+from pydantic import BaseModel
+
+class PoolStatus(BaseModel):
+    """
+    Pydantic model to represent the live state of a database connection pool.
+
+    Gauges (`size`, `checked_out`, `overflow`) are read from the pool when the
+    status is taken; the remaining fields are counters since process start.
+    """
+
+    name: str
+    size: int = 0
+    checked_out: int = 0
+    overflow: int = 0
+    checkouts: int = 0
+    checkout_failures: int = 0
+    checkout_wait_total_seconds: float = 0.0
+    checkout_wait_max_seconds: float = 0.0
+    checkout_wait_recent_seconds: float = 0.0
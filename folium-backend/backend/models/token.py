@@ -0,0 +1,16 @@
+"""Token models serve as the data objects for the signed tokens users authenticate with."""
+
+from pydantic import BaseModel
+
+class TokenPair(BaseModel):
+    """
+    Pydantic model to represent the tokens issued to a signed in `User`.
+
+    The access token is sent as `Authorization: Bearer <access_token>` and expires after
+    `expires_in` seconds; the longer lived refresh token is exchanged for a new pair.
+    """
+
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
@@ -2,6 +2,8 @@
 
 from pydantic import BaseModel
 
+from .token import TokenPair
+
 class UserIdentity(BaseModel):
     """
     Pydantic model to represent how `User`s are identified in the system.
@@ -13,9 +15,9 @@ class UserIdentity(BaseModel):
     id: int | None = None
 
 
-class User(UserIdentity, BaseModel):
+class UserProfile(UserIdentity, BaseModel):
     """
-    Pydantic model to represent a registered `User`.
+    Pydantic model to represent a registered `User` as the API returns it, without their password.
 
     This model is based on the `UserEntity` entity, which defines the shape
     of the `User` table in the PostgreSQL database
@@ -24,6 +26,21 @@ class User(UserIdentity, BaseModel):
     first_name: str = ""
     last_name: str = ""
     email: str = ""
-    password: str = ""
     created_at: str = ""
-    key: str = ""
\ No newline at end of file
+    key: str = ""
+
+class User(UserProfile):
+    """
+    Pydantic model to represent a `User` as it is sent to the API to sign up or update them,
+    with their password.
+    """
+
+    password: str = ""
+
+class SignedInUser(UserProfile):
+    """
+    Pydantic model to represent a `User` that just signed up or signed in, with the tokens
+    it authenticates its later requests with.
+    """
+
+    tokens: TokenPair
@@ -0,0 +1,128 @@
+"""Connection pool instrumentation feeding live counters to the internal metrics endpoint."""
+
+import threading
+import time
+
+from sqlalchemy import Engine
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+from .models.pool import PoolStatus
+
+# Weight given to the newest sample in the moving average of checkout wait time.
+_RECENT_WAIT_WEIGHT = 0.2
+
+
+class PoolMetrics:
+    """Live checkout counters for the connection pool of a single engine."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Engine | None = None
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._checkout_failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_recent = 0.0
+
+    def bind(self, engine: Engine) -> None:
+        """
+        Attach the engine whose pool gauges are reported alongside the counters.
+
+        Args:
+            engine: The engine created with this object's instrumented pool class.
+        """
+        self.engine = engine
+
+    def record_checkout(self, waited: float) -> None:
+        """
+        Record a successful connection checkout.
+
+        Args:
+            waited: Seconds spent waiting for the connection.
+        """
+        with self._lock:
+            self._checkouts += 1
+            self._record_wait(waited)
+
+    def record_failure(self, waited: float) -> None:
+        """
+        Record a checkout that timed out because the pool was exhausted.
+
+        Args:
+            waited: Seconds spent waiting before giving up.
+        """
+        with self._lock:
+            self._checkout_failures += 1
+            self._record_wait(waited)
+
+    def _record_wait(self, waited: float) -> None:
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._wait_recent += _RECENT_WAIT_WEIGHT * (waited - self._wait_recent)
+
+    @property
+    def recent_wait(self) -> float:
+        """Moving average of recent checkout wait times in seconds."""
+        return self._wait_recent
+
+    def snapshot(self) -> PoolStatus:
+        """
+        Read the current pool gauges and counters.
+
+        Returns:
+            PoolStatus: The point-in-time status of the pool.
+        """
+        pool = self.engine.pool if self.engine is not None else None
+        with self._lock:
+            return PoolStatus(
+                name=self.name,
+                size=pool.size() if isinstance(pool, QueuePool) else 0,
+                checked_out=pool.checkedout() if isinstance(pool, QueuePool) else 0,
+                overflow=max(pool.overflow(), 0) if isinstance(pool, QueuePool) else 0,
+                checkouts=self._checkouts,
+                checkout_failures=self._checkout_failures,
+                checkout_wait_total_seconds=self._wait_total,
+                checkout_wait_max_seconds=self._wait_max,
+                checkout_wait_recent_seconds=self._wait_recent,
+            )
+
+
+registry: list[PoolMetrics] = []
+"""Metrics for every instrumented engine in the application, in creation order."""
+
+
+class _InstrumentedPool:
+    """Mixin timing every checkout of the pool class it is combined with."""
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except TimeoutError:
+            self.metrics.record_failure(time.perf_counter() - start)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+def instrumented_pool_class(base: type[Pool], name: str) -> tuple[type[Pool], PoolMetrics]:
+    """
+    Create a pool class that reports its checkouts to a new, registered `PoolMetrics`.
+
+    The metrics live on the class so they survive the pool being recreated by `Engine.dispose`.
+
+    Args:
+        base: The pool class to instrument, e.g. `QueuePool` or `AsyncAdaptedQueuePool`.
+        name: The name the pool is reported under.
+
+    Returns:
+        tuple[type[Pool], PoolMetrics]: The pool class to pass as `poolclass` and its metrics.
+    """
+    metrics = PoolMetrics(name)
+    registry.append(metrics)
+    pool_class = type(f"Instrumented{base.__name__}", (_InstrumentedPool, base), {"metrics": metrics})
+    return pool_class, metrics
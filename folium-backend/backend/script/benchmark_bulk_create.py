@@ -0,0 +1,114 @@
+"""Benchmark bulk plant creation against creating the same plants one by one.
+
+This script creates a scratch `<POSTGRES_DATABASE>_benchmark` database, migrates it to
+the latest schema, seeds it with a handful of owners and then adds the same plants
+twice: once through `PlantService.create_plant`, one request's work per plant, and
+once through `PlantService.bulk_create_plants` in batches of `--batch` plants.
+
+Usage: python3 -m backend.script.benchmark_bulk_create [--plants 10000] [--batch 500] [--owners 10]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import sqlalchemy
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.orm import Session
+
+from ..env import getenv
+from ..database import _engine_str
+from ..models.plant import Plant
+from ..services.plant import PlantService
+
+if getenv("MODE") != "development":
+    print("This script can only be run in development mode.", file=sys.stderr)
+    print("Add MODE=development to your .env file in workspace's `backend/` directory")
+    exit(1)
+
+BENCHMARK_DATABASE = f'{getenv("POSTGRES_DATABASE")}_benchmark'
+
+
+def create_benchmark_database() -> sqlalchemy.Engine:
+    """Drop and recreate the scratch database, migrate it and return an engine connected to it."""
+    server = sqlalchemy.create_engine(_engine_str(""), isolation_level="AUTOCOMMIT")
+    with server.connect() as connection:
+        connection.execute(sqlalchemy.text(f"DROP DATABASE IF EXISTS {BENCHMARK_DATABASE}"))
+        connection.execute(sqlalchemy.text(f"CREATE DATABASE {BENCHMARK_DATABASE}"))
+    server.dispose()
+
+    config = Config(Path(__file__).parents[2] / "alembic.ini")
+    config.set_main_option("sqlalchemy.url", _engine_str(BENCHMARK_DATABASE))
+    command.upgrade(config, "head")
+    return sqlalchemy.create_engine(_engine_str(BENCHMARK_DATABASE))
+
+
+def seed(engine: sqlalchemy.Engine, owners: int) -> None:
+    """Insert `owners` users to own the benchmark plants."""
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.text(
+            """
+            INSERT INTO "user" (first_name, last_name, email, password, created_at, key)
+            SELECT 'first', 'last', 'owner' || n || '@example.com', 'password',
+                   '2024-01-01 00:00:00', 'owner' || n
+            FROM generate_series(1, :owners) AS n
+            """
+        ), {"owners": owners})
+
+
+def benchmark_plants(count: int, owners: int) -> list[Plant]:
+    """Build `count` plants spread over the seeded owners."""
+    return [Plant(common_name=f"plant{n}", scientific_name="plantae", watering="average",
+                  owner_key=f"owner{n % owners + 1}", health_history=[7])
+            for n in range(count)]
+
+
+def time_one_by_one(engine: sqlalchemy.Engine, plants: list[Plant]) -> float:
+    """Add the plants with one `create_plant` call each and return the elapsed seconds."""
+    start = time.perf_counter()
+    with Session(engine) as session:
+        plant_service = PlantService(session=session)
+        for plant in plants:
+            plant_service.create_plant(plant)
+    return time.perf_counter() - start
+
+
+def time_bulk(engine: sqlalchemy.Engine, plants: list[Plant], batch: int) -> float:
+    """Add the plants with one `bulk_create_plants` call per batch and return the elapsed seconds."""
+    start = time.perf_counter()
+    with Session(engine) as session:
+        plant_service = PlantService(session=session)
+        for offset in range(0, len(plants), batch):
+            result = plant_service.bulk_create_plants(plants[offset:offset + batch])
+            assert len(result.errors) == 0
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plants", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--owners", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_benchmark_database()
+    seed(engine, args.owners)
+    plants = benchmark_plants(args.plants, args.owners)
+
+    timings = {
+        "one by one": time_one_by_one(engine, plants),
+        f"bulk ({args.batch} per batch)": time_bulk(engine, plants, args.batch),
+    }
+
+    print(f"\nCreating {args.plants:,} plants")
+    print(f"{'path':<24}{'seconds':>10}{'plants/s':>12}")
+    for name, seconds in timings.items():
+        print(f"{name:<24}{seconds:>10.2f}{args.plants / seconds:>12,.0f}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark user and plant lookups before and after the lookup indexes.
+
+This script creates a scratch `<POSTGRES_DATABASE>_benchmark` database, migrates it to
+the schema without indexes, seeds it with users and plants, and times the queries made
+by `UserService.get_user`, `UserService.sign_in` and `PlantService.get_all_user_plants`.
+It then applies the index migration online and times the same lookups again.
+
+Usage: python3 -m backend.script.benchmark_lookups [--users 1000000] [--lookups 200]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import sqlalchemy
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..env import getenv
+from ..database import _engine_str
+from ..entities.user_entity import UserEntity
+from ..entities.plant_entity import PlantEntity
+
+if getenv("MODE") != "development":
+    print("This script can only be run in development mode.", file=sys.stderr)
+    print("Add MODE=development to your .env file in workspace's `backend/` directory")
+    exit(1)
+
+BENCHMARK_DATABASE = f'{getenv("POSTGRES_DATABASE")}_benchmark'
+
+
+def create_benchmark_database() -> sqlalchemy.Engine:
+    """Drop and recreate the scratch database and return an engine connected to it."""
+    server = sqlalchemy.create_engine(_engine_str(""), isolation_level="AUTOCOMMIT")
+    with server.connect() as connection:
+        connection.execute(sqlalchemy.text(f"DROP DATABASE IF EXISTS {BENCHMARK_DATABASE}"))
+        connection.execute(sqlalchemy.text(f"CREATE DATABASE {BENCHMARK_DATABASE}"))
+    server.dispose()
+    return sqlalchemy.create_engine(_engine_str(BENCHMARK_DATABASE))
+
+
+def seed(engine: sqlalchemy.Engine, users: int) -> None:
+    """Insert `users` users, each owning one plant, with set-based statements."""
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.text(
+            """
+            INSERT INTO "user" (first_name, last_name, email, password, created_at, key)
+            SELECT 'first', 'last', 'user' || n || '@example.com', 'password',
+                   '2024-01-01 00:00:00', md5(n::text)
+            FROM generate_series(1, :users) AS n
+            """
+        ), {"users": users})
+        connection.execute(sqlalchemy.text(
+            """
+            INSERT INTO plant (common_name, scientific_name, type, cycle, watering, watering_period,
+                               watering_benchmark_value, watering_benchmark_unit, sunlight, pet_poison,
+                               human_poison, description, image_url, owner_key, last_watering, health_history)
+            SELECT 'plant', 'plantae', 'tree', 'perennial', 'average', 'morning', '7', 'days', 'full sun',
+                   false, false, 'description', 'https://example.com/plant.png', md5(n::text), '', '{}'
+            FROM generate_series(1, :users) AS n
+            """
+        ), {"users": users})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(sqlalchemy.text("VACUUM ANALYZE"))
+
+
+def time_lookups(engine: sqlalchemy.Engine, users: int, lookups: int) -> dict[str, list[float]]:
+    """Time the service lookup queries for random existing users, in milliseconds."""
+    samples: dict[str, list[float]] = {"user by key": [], "user by email": [], "plants by owner_key": []}
+    numbers = [random.randint(1, users) for _ in range(lookups)]
+    with Session(engine) as session:
+        # Warm up the connection and the catalog caches before timing.
+        session.execute(select(UserEntity).where(UserEntity.key == "warmup")).all()
+        keys = {n: session.scalar(sqlalchemy.text("SELECT md5(CAST(:n AS text))"), {"n": n}) for n in numbers}
+        for n in numbers:
+            queries = {
+                "user by key": select(UserEntity).where(UserEntity.key == keys[n]),
+                "user by email": select(UserEntity).where(UserEntity.email == f"user{n}@example.com"),
+                "plants by owner_key": select(PlantEntity).where(PlantEntity.owner_key == keys[n]),
+            }
+            for name, query in queries.items():
+                start = time.perf_counter()
+                session.execute(query).all()
+                samples[name].append((time.perf_counter() - start) * 1000)
+            session.expunge_all()
+    return samples
+
+
+def report(label: str, samples: dict[str, list[float]]) -> None:
+    """Print the median and 95th percentile of each lookup."""
+    print(f"\n{label}")
+    print(f"{'lookup':<22}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, timings in samples.items():
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(f"{name:<22}{statistics.median(timings):>10.3f}{p95:>10.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_benchmark_database()
+    config = Config(Path(__file__).parents[2] / "alembic.ini")
+    config.set_main_option("sqlalchemy.url", _engine_str(BENCHMARK_DATABASE))
+
+    command.upgrade(config, "0001")
+    seed(engine, args.users)
+    report(f"Without indexes ({args.users:,} users)", time_lookups(engine, args.users, args.lookups))
+
+    start = time.perf_counter()
+    command.upgrade(config, "0002")
+    print(f"\nBuilt indexes concurrently in {time.perf_counter() - start:.1f} s")
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(sqlalchemy.text("ANALYZE"))
+    report(f"With indexes ({args.users:,} users)", time_lookups(engine, args.users, args.lookups))
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
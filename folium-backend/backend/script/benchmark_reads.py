@@ -0,0 +1,78 @@
+"""Benchmark reading a user's plants as rows against reading them as entities.
+
+This script creates the scratch `<POSTGRES_DATABASE>_benchmark` database used by
+`benchmark_search`, seeds it with one user owning 10,000 plants and times reading pages of
+1, 100 and 10,000 of them with the same SQL two ways: the way `PlantService` reads them,
+selecting the Core columns and building each model straight from its row, and the way it
+used to, loading a `PlantEntity` and its `SpeciesEntity` for each plant into the session
+and copying them into the model. It checks that both produce the same plants.
+
+Usage: python3 -m backend.script.benchmark_reads [--repeat 10]
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .benchmark_search import create_benchmark_database, seed
+from ..entities.plant_entity import PlantEntity
+from ..entities.species_entity import SpeciesEntity
+from ..entities.user_entity import UserEntity
+from ..models.plant import Plant
+from ..services.plant import _user_plants_query
+
+PAGE_SIZES = (1, 100, 10_000)
+
+
+def time_reads(session: Session, size: int, repeat: int) -> dict[str, list[float]]:
+    """Time reading a page of `size` plants each way, in milliseconds."""
+
+    def rows() -> list[Plant]:
+        return [PlantEntity.model_from_row(row)
+                for row in session.execute(_user_plants_query("user1", limit=size)) if row.id is not None]
+
+    def entities() -> list[Plant]:
+        query = (select(UserEntity.key, PlantEntity, SpeciesEntity)
+                 .outerjoin(PlantEntity, PlantEntity.owner_key == UserEntity.key)
+                 .outerjoin(SpeciesEntity, SpeciesEntity.id == PlantEntity.species_id)
+                 .where(UserEntity.key == "user1")
+                 .order_by(PlantEntity.id)
+                 .limit(size))
+        plants = [plant_entity.to_model(species=species_entity)
+                  for _, plant_entity, species_entity in session.execute(query) if plant_entity is not None]
+        session.expunge_all()
+        return plants
+
+    assert rows() == entities()
+    samples: dict[str, list[float]] = {"entities": [], "rows": []}
+    for _ in range(repeat):
+        for name, read in (("entities", entities), ("rows", rows)):
+            start = time.perf_counter()
+            read()
+            samples[name].append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_benchmark_database()
+    seed(engine, 1, max(PAGE_SIZES))
+
+    print(f"{'plants':>8}{'entities ms':>14}{'rows ms':>10}{'speedup':>10}")
+    with Session(engine) as session:
+        for size in PAGE_SIZES:
+            samples = time_reads(session, size, args.repeat)
+            slow, fast = statistics.median(samples["entities"]), statistics.median(samples["rows"])
+            print(f"{size:>8}{slow:>14.3f}{fast:>10.3f}{slow / fast:>9.1f}x")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
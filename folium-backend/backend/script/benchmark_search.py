@@ -0,0 +1,148 @@
+"""Benchmark plant search at scale.
+
+This script creates a scratch `<POSTGRES_DATABASE>_benchmark` database, migrates it to
+the latest schema and seeds it with `--users` users owning `--plants` plants each,
+named from a small vocabulary of house plants. It then times `PlantService.search_plants`
+for random users, with both correctly spelled and misspelled searches, and prints the
+plan of one search so the use of the `ix_plant_search` index can be checked.
+
+Usage: python3 -m backend.script.benchmark_search [--users 20000] [--plants 100] [--searches 200]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import sqlalchemy
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from ..env import getenv
+from ..database import _engine_str
+from ..entities.species_entity import SpeciesEntity
+from ..models.plant import Plant
+from ..services.plant import PlantService, _search_plants_query
+
+if getenv("MODE") != "development":
+    print("This script can only be run in development mode.", file=sys.stderr)
+    print("Add MODE=development to your .env file in workspace's `backend/` directory")
+    exit(1)
+
+BENCHMARK_DATABASE = f'{getenv("POSTGRES_DATABASE")}_benchmark'
+
+# Plant names the seeded plants are named from, with their misspellings used as searches.
+NAMES = {
+    "Monstera": "monstra",
+    "Philodendron": "philodendorn",
+    "Pothos": "photos",
+    "Calathea": "calatea",
+    "Ficus": "fikus",
+    "Begonia": "begona",
+    "Dracaena": "dracena",
+    "Anthurium": "anthurim",
+    "Peperomia": "peperomai",
+    "Aglaonema": "aglonema",
+}
+
+
+def create_benchmark_database() -> sqlalchemy.Engine:
+    """Drop and recreate the scratch database, migrate it and return an engine connected to it."""
+    server = sqlalchemy.create_engine(_engine_str(""), isolation_level="AUTOCOMMIT")
+    with server.connect() as connection:
+        connection.execute(sqlalchemy.text(f"DROP DATABASE IF EXISTS {BENCHMARK_DATABASE}"))
+        connection.execute(sqlalchemy.text(f"CREATE DATABASE {BENCHMARK_DATABASE}"))
+    server.dispose()
+
+    config = Config(Path(__file__).parents[2] / "alembic.ini")
+    config.set_main_option("sqlalchemy.url", _engine_str(BENCHMARK_DATABASE))
+    command.upgrade(config, "head")
+    return sqlalchemy.create_engine(_engine_str(BENCHMARK_DATABASE))
+
+
+def seed(engine: sqlalchemy.Engine, users: int, plants: int) -> None:
+    """Insert `users` users owning `plants` plants each, with set-based statements."""
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.text(
+            """
+            INSERT INTO "user" (first_name, last_name, email, password, key)
+            SELECT 'first', 'last', 'user' || n || '@example.com', 'password', 'user' || n
+            FROM generate_series(1, :users) AS n
+            """
+        ), {"users": users})
+        # Plants reference their species by id, so each name's species is written first.
+        species = [SpeciesEntity.column_values(Plant(scientific_name=f"{name.lower()} plantae", type="tree",
+                                                     cycle="perennial", watering="average", sunlight="full sun",
+                                                     description="A house plant that prefers bright indirect light",
+                                                     image_url="https://example.com/plant.png"))
+                   for name in NAMES]
+        connection.execute(sqlalchemy.insert(SpeciesEntity), species)
+        connection.execute(sqlalchemy.text(
+            """
+            INSERT INTO plant (common_name, species_id, watering_period, watering_benchmark_unit, pet_poison,
+                               human_poison, owner_key, health_history)
+            SELECT (:names)[1 + (u * 7 + p) % cardinality(:names)] || ' ' || p,
+                   (CAST(:species_ids AS uuid[]))[1 + (u * 7 + p) % cardinality(:names)],
+                   'morning', 'days', false, false, 'user' || u, '{}'
+            FROM generate_series(1, :users) AS u, generate_series(1, :plants) AS p
+            """
+        ), {"users": users, "plants": plants, "names": list(NAMES),
+            "species_ids": [str(values["id"]) for values in species]})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(sqlalchemy.text("VACUUM ANALYZE"))
+
+
+def time_searches(engine: sqlalchemy.Engine, users: int, searches: int) -> dict[str, list[float]]:
+    """Time searches of random users' plants, in milliseconds."""
+    samples: dict[str, list[float]] = {"full text": [], "misspelled name": []}
+    with Session(engine) as session:
+        plant_service = PlantService(session=session)
+        # Warm up the connection and the catalog caches before timing.
+        plant_service.search_plants("user1", "warmup", limit=20)
+        for _ in range(searches):
+            key = f"user{random.randint(1, users)}"
+            name, misspelling = random.choice(list(NAMES.items()))
+            for sample, text in (("full text", name), ("misspelled name", misspelling)):
+                start = time.perf_counter()
+                plant_service.search_plants(key, text, limit=20)
+                samples[sample].append((time.perf_counter() - start) * 1000)
+            session.expunge_all()
+    return samples
+
+
+def explain(engine: sqlalchemy.Engine) -> str:
+    """Return the plan of one misspelled search."""
+    query = _search_plants_query("user1", "philodendorn", 0, 21).compile(dialect=postgresql.dialect())
+    with engine.connect() as connection:
+        return "\n".join(connection.exec_driver_sql(f"EXPLAIN ANALYZE {query}", query.params).scalars())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--plants", type=int, default=100)
+    parser.add_argument("--searches", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_benchmark_database()
+    start = time.perf_counter()
+    seed(engine, args.users, args.plants)
+    print(f"Seeded {args.users * args.plants:,} plants in {time.perf_counter() - start:.1f} s")
+
+    samples = time_searches(engine, args.users, args.searches)
+    print(f"\nSearching {args.plants} plants per user among {args.users * args.plants:,}")
+    print(f"{'search':<18}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, timings in samples.items():
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(f"{name:<18}{statistics.median(timings):>10.3f}{p95:>10.3f}")
+    print(f"\n{explain(engine)}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
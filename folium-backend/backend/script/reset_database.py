@@ -1,9 +1,17 @@
 """Reset Database"""
 
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
 from ..entities.entity_base import  EntityBase
 from ..entities.user_entity import UserEntity
 from ..entities.plant_entity import PlantEntity
 from ..database import engine
 
 EntityBase.metadata.drop_all(engine)
-EntityBase.metadata.create_all(engine)
\ No newline at end of file
+EntityBase.metadata.create_all(engine)
+
+# The fresh schema matches the latest migration, so later upgrades start from there.
+command.stamp(Config(Path(__file__).parents[2] / "alembic.ini"), "head")
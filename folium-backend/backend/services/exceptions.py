@@ -2,10 +2,11 @@
 
 from ..entities.user_entity import UserEntity
 from ..models.plant import Plant
+from ..models.user import User
 
 class DuplicateUserException(Exception):
     """Exception to be thrown when a new account is created with an email that is already being used for another user."""
-    def __init__(self, entity: UserEntity):
+    def __init__(self, entity: UserEntity | User):
         super().__init__(
             f"An account already exists with email {entity.email}."
         )
@@ -17,6 +18,13 @@ class InvalidCredentialsUserException(Exception):
             msg
         )
 
+class PasswordHasherBusyException(Exception):
+    """Exception to be thrown when too many passwords are already being hashed to accept another."""
+    def __init__(self):
+        super().__init__(
+            "Too many sign ins in progress. Please retry."
+        )
+
 class UserNotFoundException(Exception):
     """Exception to be thrown when a key is passed for a user that is not in the database."""
     def __init__(self):
@@ -24,6 +32,13 @@ class UserNotFoundException(Exception):
             "User not found."
         )
 
+class InvalidTokenException(Exception):
+    """Exception to be thrown when a token is malformed, forged, expired, revoked or of the wrong type."""
+    def __init__(self, msg: str = "Invalid token."):
+        super().__init__(
+            msg
+        )
+
 class UserBlankKeyException(Exception):
     """Exception to be thrown when an empty key is passed to be checked in the database."""
     def __init__(self):
@@ -43,4 +58,32 @@ class PlantBlankIdException(Exception):
     def __init__(self):
         super().__init__(
             "Empty ID passed. Plant ID field must be populated."
-        )
\ No newline at end of file
+        )
+
+class InvalidCursorException(Exception):
+    """Exception to be thrown when a pagination cursor is malformed."""
+    def __init__(self):
+        super().__init__(
+            "Invalid cursor. Use the next_cursor returned by the previous page."
+        )
+
+class InvalidFieldsException(Exception):
+    """Exception to be thrown when a sparse fieldset names a field that plants do not have."""
+    def __init__(self, fields: list[str]):
+        super().__init__(
+            f"Unknown plant fields: {', '.join(fields)}."
+        )
+
+class EmptyPatchException(Exception):
+    """Exception to be thrown when a partial plant update does not set any field that can be changed."""
+    def __init__(self):
+        super().__init__(
+            "Empty patch. Set at least one plant field to update."
+        )
+
+class BulkLimitException(Exception):
+    """Exception to be thrown when a bulk request holds more plants than one transaction may write."""
+    def __init__(self, limit: int):
+        super().__init__(
+            f"Too many plants. A bulk request may hold at most {limit} plants."
+        )
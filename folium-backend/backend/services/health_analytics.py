@@ -0,0 +1,94 @@
+"""Vectorized statistics over the health histories of a user's plants."""
+
+import itertools
+
+import numpy as np
+
+from ..models.health import GardenHealth
+
+# Fewest scores in the window for a trend slope to be reported.
+_MIN_TREND_ENTRIES = 3
+# Trend slope, in score points per entry, at or below which a plant is flagged as declining.
+_DECLINING_SLOPE = -0.25
+
+
+def _padded_window(histories: list[list[int]], window: int) -> np.ndarray:
+    """
+    Build a (plants, window) array holding the last `window` scores of each history.
+
+    Scores are right-aligned, so the last column holds every plant's latest score, and
+    plants with shorter histories are padded on the left with NaN. The scores are copied
+    in with one fancy-indexed assignment rather than row by row.
+    """
+    lengths = np.fromiter((min(len(history), window) for history in histories), dtype=np.intp, count=len(histories))
+    total = int(lengths.sum())
+    scores = np.fromiter(itertools.chain.from_iterable(history[len(history) - length:]
+                                                       for history, length in zip(histories, lengths.tolist())),
+                         dtype=np.float64, count=total)
+
+    rows = np.repeat(np.arange(len(histories)), lengths)
+    # Each score's offset within its history's slice, shifted right past the row's padding.
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    columns = np.arange(total) - starts + np.repeat(window - lengths, lengths)
+
+    padded = np.full((len(histories), window), np.nan)
+    padded[rows, columns] = scores
+    return padded
+
+
+def _none_if_nan(values: np.ndarray) -> list[float | None]:
+    return [None if value != value else value for value in values.tolist()]
+
+
+def analyze_health(ids: list[int], histories: list[list[int]], window: int) -> GardenHealth:
+    """
+    Compute health statistics over the last `window` scores of each plant at once.
+
+    For each plant this reports the rolling average and the (population) standard
+    deviation of the scores in the window, and the least-squares slope of the scores
+    against their position. Plants whose slope is at or below `_DECLINING_SLOPE` are
+    flagged as declining.
+
+    Args:
+        ids: The ids of the plants.
+        histories: The health history of each plant, in the same order as `ids`.
+        window: The number of most recent scores the statistics cover.
+
+    Returns:
+        GardenHealth: The statistics of each plant, in the order given.
+    """
+
+    padded = _padded_window(histories, window)
+    present = ~np.isnan(padded)
+    counts = present.sum(axis=1)
+    positions = np.broadcast_to(np.arange(window, dtype=np.float64), padded.shape)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        averages = np.where(present, padded, 0.0).sum(axis=1) / counts
+        deviations = np.where(present, padded - averages[:, None], 0.0)
+        volatility = np.sqrt((deviations ** 2).sum(axis=1) / counts)
+
+        mean_positions = np.where(present, positions, 0.0).sum(axis=1) / counts
+        position_deviations = np.where(present, positions - mean_positions[:, None], 0.0)
+        slopes = (position_deviations * deviations).sum(axis=1) / (position_deviations ** 2).sum(axis=1)
+
+    slopes[counts < _MIN_TREND_ENTRIES] = np.nan
+    declining = slopes <= _DECLINING_SLOPE
+
+    # The per-plant rows are validated in one call rather than one model at a time.
+    plants = [
+        {"id": plant_id,
+         "entries": len(history),
+         "latest": history[-1] if len(history) > 0 else None,
+         "rolling_average": average,
+         "trend_slope": slope,
+         "volatility": deviation,
+         "declining": is_declining}
+        for plant_id, history, average, slope, deviation, is_declining in zip(ids,
+                                                                             histories,
+                                                                             _none_if_nan(averages),
+                                                                             _none_if_nan(slopes),
+                                                                             _none_if_nan(volatility),
+                                                                             declining.tolist())
+    ]
+    return GardenHealth.model_validate({"window": window, "declining": int(declining.sum()), "plants": plants})
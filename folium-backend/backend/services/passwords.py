@@ -0,0 +1,171 @@
+"""Password hashing with scrypt, run in a bounded process pool so logins do not hold up other requests."""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from ..env import getenv
+from .exceptions import PasswordHasherBusyException
+
+# Prefix of stored scrypt hashes; stored passwords without it are legacy plaintext.
+_SCHEME = "scrypt"
+# Memory cost per unit of N is 128 * r bytes; r and p are fixed and recorded in each hash.
+_BLOCK_SIZE = 8
+_PARALLELISM = 1
+_SALT_BYTES = 16
+_KEY_BYTES = 32
+
+
+def _derive(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # hashlib refuses to use more than 32 MiB unless told otherwise.
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=2 * 128 * r * n, dklen=_KEY_BYTES)
+
+
+def hash_password(password: str, cost: int) -> str:
+    """
+    Hash a password with scrypt and a random salt.
+
+    Args:
+        password: The plaintext password.
+        cost: log2 of scrypt's CPU and memory cost N.
+
+    Returns:
+        str: The hash, as `scrypt$<log2 N>$<r>$<p>$<salt>$<key>` with base64 salt and key.
+    """
+    salt = os.urandom(_SALT_BYTES)
+    key = _derive(password, salt, 2 ** cost, _BLOCK_SIZE, _PARALLELISM)
+    return "$".join([_SCHEME, str(cost), str(_BLOCK_SIZE), str(_PARALLELISM),
+                     base64.b64encode(salt).decode(), base64.b64encode(key).decode()])
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """
+    Check a password against a stored hash, or a legacy plaintext password.
+
+    Args:
+        password: The plaintext password to check.
+        stored: The user's stored password.
+
+    Returns:
+        bool: True if the password matches.
+    """
+    if not stored.startswith(_SCHEME + "$"):
+        return hmac.compare_digest(password.encode(), stored.encode())
+    _, cost, r, p, salt, key = stored.split("$")
+    derived = _derive(password, base64.b64decode(salt), 2 ** int(cost), int(r), int(p))
+    return hmac.compare_digest(derived, base64.b64decode(key))
+
+
+def needs_rehash(stored: str, cost: int) -> bool:
+    """
+    Check whether a stored password should be hashed again on the next successful login.
+
+    Args:
+        stored: The user's stored password.
+        cost: The cost factor new hashes are made with.
+
+    Returns:
+        bool: True for legacy plaintext passwords and hashes made with other parameters.
+    """
+    return not stored.startswith(f"{_SCHEME}${cost}${_BLOCK_SIZE}${_PARALLELISM}$")
+
+
+class PasswordHasher:
+    """Runs password hashing and verification in a dedicated, size-bounded process pool.
+
+    A KDF is deliberately slow, so running it on a request thread (or the event loop) would
+    let a burst of sign ups and logins occupy the threads plant requests are served from.
+    Hashes are computed in `workers` processes instead, and at most `max_pending` of them
+    may be queued or running at once; past that, new ones are refused with
+    `PasswordHasherBusyException` rather than queued, which bounds both the wait of a login
+    and the number of request threads waiting on the pool.
+    """
+
+    def __init__(self, cost: int, workers: int, max_pending: int):
+        self.cost = cost
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+
+    def _submit(self, function, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusyException()
+            if self._executor is None:
+                # Spawned rather than forked, since the API process runs threads.
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            self._pending += 1
+            executor = self._executor
+        try:
+            future = executor.submit(function, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _: Future | None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password in the pool, blocking the calling thread until it is done.
+
+        Raises:
+            PasswordHasherBusyException: If too many hashes are already pending.
+        """
+        return self._submit(hash_password, password, self.cost).result()
+
+    def verify(self, password: str, stored: str) -> bool:
+        """
+        Verify a password in the pool, blocking the calling thread until it is done.
+
+        Raises:
+            PasswordHasherBusyException: If too many hashes are already pending.
+        """
+        return self._submit(verify_password, password, stored).result()
+
+    async def hash_async(self, password: str) -> str:
+        """
+        Hash a password in the pool without blocking the event loop.
+
+        Raises:
+            PasswordHasherBusyException: If too many hashes are already pending.
+        """
+        return await asyncio.wrap_future(self._submit(hash_password, password, self.cost))
+
+    async def verify_async(self, password: str, stored: str) -> bool:
+        """
+        Verify a password in the pool without blocking the event loop.
+
+        Raises:
+            PasswordHasherBusyException: If too many hashes are already pending.
+        """
+        return await asyncio.wrap_future(self._submit(verify_password, password, stored))
+
+    def needs_rehash(self, stored: str) -> bool:
+        """Check whether a stored password was not hashed with this hasher's parameters."""
+        return needs_rehash(stored, self.cost)
+
+    def shutdown(self) -> None:
+        """Stop the pool's processes; the next hash starts a new pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+password_hasher = PasswordHasher(cost=int(getenv("PASSWORD_SCRYPT_COST", "14")),
+                                 workers=int(getenv("PASSWORD_HASH_WORKERS", "2")),
+                                 max_pending=int(getenv("PASSWORD_HASH_MAX_PENDING", "16")))
+"""Application-wide password hasher."""
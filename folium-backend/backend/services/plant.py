@@ -1,19 +1,548 @@
 """Plant service used by the plant api to perform actions on the plant table in the db."""
 
+import asyncio
+import base64
+import binascii
+import itertools
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator
+
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (select, insert, update, delete, exists, literal, and_, any_, bindparam, cast, column, values, func,
+                        tuple_, true, Integer, ARRAY, Select, Insert, Update, Delete, CTE)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from fastapi import Depends
-from ..database import db_session
+from ..database import db_session, async_db_session, replica_reads, recent_writers
 
-from ..models.plant import Plant
-from ..entities.plant_entity import PlantEntity
+from ..models.plant import Plant, PlantFilter, PlantPage, BulkPlantError, BulkPlantResult, HealthScore
+from ..models.health import GardenHealth
+from ..entities.plant_entity import PlantEntity, INTERVAL_FIELDS
+from ..entities.species_entity import SpeciesEntity, SPECIES_FIELDS
 from ..models.user import User
 from ..entities.user_entity import UserEntity
 
+from .user_cache import user_cache
+from .health_analytics import analyze_health
 from .exceptions import (UserNotFoundException,
                          PlantNotFoundException,
                          UserBlankKeyException,
-                         PlantBlankIdException,)
+                         PlantBlankIdException,
+                         InvalidCursorException,
+                         InvalidFieldsException,
+                         EmptyPatchException,
+                         BulkLimitException,)
+
+# Each plant operation is a single statement that checks the owner (and for writes, the
+# plant's ownership) in SQL. When it matches nothing, a follow-up query on the error path
+# tells a missing user apart from a missing plant.
+
+def _check_key(key: str) -> None:
+    """
+    Helper function that rejects an empty owner key before any query is made.
+
+    Raises:
+        UserBlankKeyException: If the key is empty.
+    """
+
+    if key == "":
+        raise UserBlankKeyException()
+
+def _check_plant(plant: Plant) -> None:
+    """
+    Helper function that rejects a plant without an owner key or id before any query is made.
+
+    Raises:
+        UserBlankKeyException: If the owner key is empty.
+        PlantBlankIdException: If the plants ID is blank.
+    """
+
+    _check_key(plant.owner_key)
+    if plant.id is None:
+        raise PlantBlankIdException()
+
+def _user_exists_query(key: str) -> Select:
+    """Select the key of the user with the given key, if there is one."""
+    return select(UserEntity.key).where(UserEntity.key == key)
+
+def _version_query(key: str) -> Select:
+    """Select the version of the user with the given key, if there is one."""
+    return select(UserEntity.version).where(UserEntity.key == key)
+
+def _parse_fields(fields: str | None) -> list[str] | None:
+    """
+    Parse a comma separated sparse fieldset into the plant fields to load.
+
+    The id is always included. None means every field.
+
+    Raises:
+        InvalidFieldsException: If a field is not a field of `Plant`.
+    """
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip() != ""]
+    unknown = [name for name in names if name not in Plant.model_fields]
+    if len(unknown) > 0:
+        raise InvalidFieldsException(unknown)
+    return ["id"] + [name for name in dict.fromkeys(names) if name != "id"]
+
+# Reads select Core columns of the tables rather than entities, and build models from the rows.
+_plant_table = PlantEntity.__table__
+_species_table = SpeciesEntity.__table__
+_user_table = UserEntity.__table__
+
+# Plant filters matched by equality with the plant column of the same name.
+_PLANT_FILTERS = {"pet_poison", "human_poison"}
+# Plant filters matched by equality with the species column of the same name.
+_SPECIES_FILTERS = {"type", "cycle", "sunlight"}
+
+def _as_utc(value: datetime) -> datetime:
+    """Read a time without a time zone as UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def _filter_conditions(filters: PlantFilter | None) -> list:
+    """Build the SQL predicates on plants for the filters that are set."""
+    if filters is None:
+        return []
+    conditions = [_plant_table.c[name] == value
+                  for name, value in filters.model_dump(include=_PLANT_FILTERS).items()
+                  if value is not None]
+    species_conditions = [_species_table.c[name] == value
+                          for name, value in filters.model_dump(include=_SPECIES_FILTERS).items()
+                          if value is not None]
+    if len(species_conditions) > 0:
+        # Matching species are few, so they are found first and then looked up among the owner's plants.
+        conditions.append(_plant_table.c.species_id.in_(select(_species_table.c.id).where(*species_conditions)))
+    if filters.watered_after is not None:
+        conditions.append(_plant_table.c.last_watering >= _as_utc(filters.watered_after))
+    if filters.watered_before is not None:
+        conditions.append(_plant_table.c.last_watering <= _as_utc(filters.watered_before))
+    return conditions
+
+def _user_plants_query(key: str,
+                       after: int | None = None,
+                       limit: int | None = None,
+                       fields: list[str] | None = None,
+                       filters: PlantFilter | None = None) -> Select:
+    """
+    Select the user's key and version outer joined to each of their plants, in id order.
+
+    A user without plants yields one row with no plant and a missing user yields no rows,
+    so the owner check and the read are one statement, and the version on every row is the
+    one the plants were read at. `after` and `limit` select a page
+    by keyset, which the (owner_key, id) index serves without scanning earlier pages.
+    `fields` restricts the plant columns in the SELECT to a sparse fieldset. `filters`
+    are part of the join condition, so a user whose plants all fail them still yields a row.
+    """
+    join_condition = and_(_plant_table.c.owner_key == _user_table.c.key, *_filter_conditions(filters))
+    if after is not None:
+        join_condition = and_(join_condition, _plant_table.c.id > after)
+    return (select(_user_table.c.key, _user_table.c.version, *PlantEntity.read_columns(fields))
+            .select_from(PlantEntity.join_species(_user_table.outerjoin(_plant_table, join_condition), fields))
+            .where(_user_table.c.key == key)
+            .order_by(_plant_table.c.id)
+            .limit(limit))
+
+# Plant columns loaded for health analytics.
+_HEALTH_FIELDS = ["id", "health_history"]
+# Most recent health scores a plant keeps as scores are recorded; the largest analytics window.
+_HEALTH_HISTORY_LIMIT = 1000
+
+def _due_before(before: datetime | None) -> datetime:
+    """Default a due-by time to now and read a time without a time zone as UTC."""
+    if before is None:
+        return datetime.now(timezone.utc)
+    return _as_utc(before)
+
+def _due_plants_query(key: str, before: datetime, fields: list[str] | None = None) -> Select:
+    """
+    Select the user's key outer joined to each of their plants due for water by `before`,
+    soonest due first. Like `_user_plants_query`, a missing user yields no rows.
+    """
+    plants = _user_table.outerjoin(_plant_table, and_(_plant_table.c.owner_key == _user_table.c.key,
+                                                     _plant_table.c.next_watering_at <= before))
+    return (select(_user_table.c.key, *PlantEntity.read_columns(fields))
+            .select_from(PlantEntity.join_species(plants, fields))
+            .where(_user_table.c.key == key)
+            .order_by(_plant_table.c.next_watering_at, _plant_table.c.id))
+
+def _encode_due_cursor(plant: Plant) -> str:
+    """Encode the due time and id of the last plant on a page of due plants as an opaque cursor."""
+    return base64.urlsafe_b64encode(f"{plant.next_watering_at.isoformat()},{plant.id}".encode()).decode()
+
+def _decode_due_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    """
+    Decode a cursor into the due time and id of the last plant on the previous page of due plants.
+
+    Raises:
+        InvalidCursorException: If the cursor was not produced by `_encode_due_cursor`.
+    """
+    if cursor is None:
+        return None
+    try:
+        due, _, plant_id = base64.urlsafe_b64decode(cursor.encode()).decode().rpartition(",")
+        return datetime.fromisoformat(due), int(plant_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorException()
+
+# Fields of the plants listed across owners: every field but the owner's key, which is enough to act as the owner.
+_DUE_FIELDS = [field for field in Plant.model_fields if field != "owner_key"]
+
+def _all_due_plants_query(before: datetime, after: tuple[datetime, int] | None, limit: int) -> Select:
+    """Select a page of every owner's plants due for water by `before`, by keyset on (next_watering_at, id)."""
+    query = (select(*PlantEntity.read_columns(_DUE_FIELDS))
+             .select_from(PlantEntity.join_species(_plant_table, _DUE_FIELDS))
+             .where(_plant_table.c.next_watering_at <= before)
+             .order_by(_plant_table.c.next_watering_at, _plant_table.c.id)
+             .limit(limit))
+    if after is not None:
+        query = query.where(tuple_(_plant_table.c.next_watering_at, _plant_table.c.id) > tuple_(*after))
+    return query
+
+def _search_plants_query(key: str,
+                         text: str,
+                         offset: int,
+                         limit: int,
+                         fields: list[str] | None = None,
+                         filters: PlantFilter | None = None) -> Select:
+    """
+    Select the user's key and version outer joined to one page of their plants matching a search, best match first.
+
+    A plant matches when its or its species' full-text document matches the search as a
+    web-style query or when the search is a close (trigram) match for a word in either
+    its common name or its species' scientific name, so typos in names still match, and
+    when it passes `filters`. Matches are ranked by
+    full-text rank plus name similarity.
+    The page is selected in a LATERAL subquery so that, as in `_user_plants_query`, a
+    user without matches yields one row with no plant and a missing user yields no rows.
+    """
+    plant, species = _plant_table, _species_table
+    query_vector = func.websearch_to_tsquery("english", text)
+    name_similarity = func.greatest(func.word_similarity(text, plant.c.common_name),
+                                    func.word_similarity(text, species.c.scientific_name))
+    document = plant.c.search_vector.op("||")(species.c.search_vector)
+    rank = (func.ts_rank(document, query_vector) + name_similarity).label("rank")
+    matches = (select(plant.c.id, rank)
+               .join(species, species.c.id == plant.c.species_id)
+               .where(plant.c.owner_key == _user_table.c.key,
+                      plant.c.search_vector.bool_op("@@")(query_vector)
+                      | species.c.search_vector.bool_op("@@")(query_vector)
+                      | literal(text).bool_op("<%")(plant.c.common_name)
+                      | literal(text).bool_op("<%")(species.c.scientific_name),
+                      *_filter_conditions(filters))
+               .correlate(_user_table)
+               .order_by(rank.desc(), plant.c.id)
+               .offset(offset)
+               .limit(limit)
+               .lateral("matches"))
+    plants = _user_table.outerjoin(matches, true()).outerjoin(plant, plant.c.id == matches.c.id)
+    return (select(_user_table.c.key, _user_table.c.version, *PlantEntity.read_columns(fields))
+            .select_from(PlantEntity.join_species(plants, fields))
+            .where(_user_table.c.key == key)
+            .order_by(matches.c.rank.desc(), matches.c.id))
+
+# Number of plants fetched per round trip when streaming from a server-side cursor.
+_STREAM_BATCH_SIZE = 500
+
+def _encode_cursor(plant_id: int) -> str:
+    """Encode the id of the last plant on a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(str(plant_id).encode()).decode()
+
+def _decode_cursor(cursor: str | None) -> int | None:
+    """
+    Decode a cursor into the id of the last plant on the previous page.
+
+    Raises:
+        InvalidCursorException: If the cursor was not produced by `_encode_cursor`.
+    """
+    if cursor is None:
+        return None
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorException()
+
+def _plant_page(rows: list, limit: int, fields: list[str] | None) -> PlantPage:
+    """Build a page from rows of `_user_plants_query` fetched with one row more than the limit."""
+    plants = [PlantEntity.model_from_row(row, fields) for row in rows if row.id is not None]
+    if len(plants) <= limit:
+        # Set explicitly, so routes that leave out unset fields still send a null cursor.
+        return PlantPage(plants=plants, next_cursor=None)
+    return PlantPage(plants=plants[:limit], next_cursor=_encode_cursor(plants[limit - 1].id))
+
+def _decode_search_cursor(cursor: str | None) -> int:
+    """
+    Decode a cursor into the number of search matches on earlier pages.
+
+    Raises:
+        InvalidCursorException: If the cursor was not produced by `_search_page`.
+    """
+    offset = _decode_cursor(cursor) or 0
+    if offset < 0:
+        raise InvalidCursorException()
+    return offset
+
+def _search_page(rows: list, offset: int, limit: int, fields: list[str] | None) -> PlantPage:
+    """
+    Build a page from rows of `_search_plants_query` fetched with one row more than the limit.
+
+    Search results are ordered by rank rather than id, so the cursor encodes the offset
+    of the next page instead of the id of the last plant.
+    """
+    plants = [PlantEntity.model_from_row(row, fields) for row in rows if row.id is not None]
+    if len(plants) <= limit:
+        # Set explicitly, so routes that leave out unset fields still send a null cursor.
+        return PlantPage(plants=plants, next_cursor=None)
+    return PlantPage(plants=plants[:limit], next_cursor=_encode_cursor(offset + limit))
+
+# Largest number of plants a bulk request may write in its one transaction.
+_BULK_LIMIT = 1000
+
+def _owners_query(keys: set[str]) -> Select:
+    """Select the keys, out of the given keys, that belong to a user."""
+    return select(UserEntity.key).where(UserEntity.key.in_(keys))
+
+def _bulk_owners_query(keys: set[str], plants: list[Plant]) -> Select:
+    """
+    Select the keys, out of the given keys, that belong to a user, inserting the species of the plants.
+
+    The plants of a bulk create are inserted in batches that cannot carry a CTE, so their
+    species are inserted, and their owners' versions bumped, by the owner check that
+    precedes them instead. Species of plants whose owner turns out not to exist are
+    inserted too; they are catalog entries like any other.
+    """
+    return _owners_query(keys).add_cte(_insert_species_cte(plants), _bump_version_cte(*keys))
+
+def _check_bulk_size(items: list) -> None:
+    """
+    Helper function that rejects a bulk request larger than one transaction may write.
+
+    Raises:
+        BulkLimitException: If there are more items than `_BULK_LIMIT`.
+    """
+    if len(items) > _BULK_LIMIT:
+        raise BulkLimitException(_BULK_LIMIT)
+
+def _bulk_owner_keys(plants: list[Plant]) -> set[str]:
+    """
+    Helper function that collects the distinct owner keys of a bulk request.
+
+    Raises:
+        BulkLimitException: If there are more plants than `_BULK_LIMIT`.
+    """
+    _check_bulk_size(plants)
+    return {plant.owner_key for plant in plants if plant.owner_key != ""}
+
+def _bulk_create_values(plants: list[Plant], owners: set[str]) -> tuple[list[dict], list[BulkPlantError]]:
+    """Split a bulk request into the column values of the plants to insert and the errors of the rest."""
+    values, errors = [], []
+    for index, plant in enumerate(plants):
+        if plant.owner_key == "":
+            errors.append(BulkPlantError(index=index, detail=str(UserBlankKeyException())))
+        elif plant.owner_key not in owners:
+            errors.append(BulkPlantError(index=index, detail=str(UserNotFoundException())))
+        else:
+            values.append(PlantEntity.column_values(plant))
+    return values, errors
+
+def _bulk_insert_plants_statement() -> Insert:
+    """Insert many plants in multi-row batches, returning them in the order of the parameters."""
+    return insert(PlantEntity).returning(PlantEntity, sort_by_parameter_order=True)
+
+def _bulk_plant_ids(ids: list[int | None]) -> tuple[dict[int, int], list[BulkPlantError]]:
+    """Map each distinct plant id of a bulk request to its first position, with an error for each blank id."""
+    positions, errors = {}, []
+    for index, plant_id in enumerate(ids):
+        if plant_id is None:
+            errors.append(BulkPlantError(index=index, detail=str(PlantBlankIdException())))
+        else:
+            positions.setdefault(plant_id, index)
+    return positions, errors
+
+def _bulk_plant_result(positions: dict[int, int],
+                       plants: list[Plant],
+                       errors: list[BulkPlantError]) -> BulkPlantResult:
+    """Build the result of a bulk write, with an error for each requested plant the write did not return."""
+    written = {plant.id: plant for plant in plants}
+    errors = errors + [BulkPlantError(index=index, detail=str(PlantNotFoundException()))
+                       for plant_id, index in positions.items() if plant_id not in written]
+    return BulkPlantResult(plants=[written[plant_id] for plant_id in positions if plant_id in written],
+                           errors=sorted(errors, key=lambda error: error.index))
+
+def _bulk_update_plants_statement(key: str, plants: list[Plant]) -> Update:
+    """Update the owner's plants from a VALUES list joined on id (UPDATE ... FROM (VALUES ...)), returning them."""
+    columns = PlantEntity.__table__.columns
+    names = [name for name in PlantEntity.column_values(Plant()) if name != "owner_key"]
+    rows = []
+    for plant in plants:
+        plant_values = PlantEntity.column_values(plant)
+        rows.append((plant.id, *[plant_values[name] for name in names]))
+    new_values = (values(*[column(name, columns[name].type) for name in ["id"] + names], name="new_values")
+                  .data(rows))
+    # Cast in SET too, since Postgres types VALUES columns from untyped parameters as text.
+    return (update(PlantEntity)
+            .add_cte(_insert_species_cte(plants), _bump_version_cte(key))
+            .where(PlantEntity.id == new_values.c.id, PlantEntity.owner_key == key)
+            .values({name: cast(new_values.c[name], columns[name].type) for name in names})
+            .returning(PlantEntity)
+            .execution_options(synchronize_session=False))
+
+def _bulk_delete_plants_statement(key: str, ids: list[int]) -> Delete:
+    """Delete the owner's plants whose id is in the array (DELETE ... WHERE id = ANY(:ids)), returning them and their species."""
+    return (delete(PlantEntity)
+            .add_cte(_bump_version_cte(key))
+            .where(PlantEntity.owner_key == key,
+                   PlantEntity.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))),
+                   PlantEntity.species_id == SpeciesEntity.id)
+            .returning(PlantEntity, SpeciesEntity)
+            .execution_options(synchronize_session=False))
+
+def _species_values(plants: list[Plant]) -> list[dict]:
+    """Collect the column values of the distinct species of the plants."""
+    return list({values["id"]: values for values in map(SpeciesEntity.column_values, plants)}.values())
+
+def _species_by_id(plants: list[Plant]) -> dict[uuid.UUID, SpeciesEntity]:
+    """Build the species of the plants by id, for converting the plants a write returns."""
+    return {values["id"]: SpeciesEntity(**values) for values in _species_values(plants)}
+
+def _insert_species_cte(plants: list[Plant]) -> CTE:
+    """
+    Insert the species of the plants that are not in the catalog yet (INSERT ... ON CONFLICT DO NOTHING).
+
+    The insert is attached to the plant write as a CTE, so the species and the plants
+    referencing them are written by one statement. Postgres runs a data-modifying CTE
+    whether or not the statement reads from it, and checks the plants' foreign keys
+    after it has run.
+    """
+    return (pg_insert(SpeciesEntity)
+            .values(_species_values(plants))
+            .on_conflict_do_nothing()
+            .cte("new_species"))
+
+def _bump_version_cte(*keys: str) -> CTE:
+    """
+    Bump the version of the given owners (UPDATE "user" SET version = version + 1), for conditional reads.
+
+    Like the species insert, the bump is attached to the plant write as a CTE, so the
+    version changes in the same transaction as the plants. A write that turns out to
+    match no plant still bumps the version, which only costs the owner's clients one
+    full read.
+    """
+    return (update(UserEntity)
+            .where(UserEntity.key.in_(keys))
+            .values(version=UserEntity.version + 1)
+            .cte("bumped_version"))
+
+def _insert_plant_statement(plant: Plant) -> Insert:
+    """Insert the plant only if its owner exists (INSERT ... SELECT ... WHERE EXISTS), returning it."""
+    columns = PlantEntity.__table__.columns
+    values = PlantEntity.column_values(plant)
+    row = (select(*[literal(value, type_=columns[name].type) for name, value in values.items()])
+           .where(exists().where(UserEntity.key == plant.owner_key)))
+    return (insert(PlantEntity)
+            .add_cte(_insert_species_cte([plant]), _bump_version_cte(plant.owner_key))
+            .from_select(list(values), row)
+            .returning(PlantEntity))
+
+def _update_plant_statement(plant: Plant) -> Update:
+    """Update the plant only if it belongs to the given owner, returning it."""
+    values = PlantEntity.column_values(plant)
+    del values["owner_key"]
+    return (update(PlantEntity)
+            .add_cte(_insert_species_cte([plant]), _bump_version_cte(plant.owner_key))
+            .where(PlantEntity.id == plant.id, PlantEntity.owner_key == plant.owner_key)
+            .values(**values)
+            .returning(PlantEntity))
+
+# Fields a patch cannot change: a plant is named by its id and owner, and its next watering time is computed.
+_UNPATCHABLE_FIELDS = {"id", "owner_key", "next_watering_at"}
+
+def _patch_fields(changes: Plant) -> list[str]:
+    """
+    List the fields a patch sets, in model order.
+
+    Raises:
+        EmptyPatchException: If the patch sets no field that can be changed.
+    """
+    fields = [field for field in Plant.model_fields
+              if field in changes.model_fields_set and field not in _UNPATCHABLE_FIELDS]
+    if len(fields) == 0:
+        raise EmptyPatchException()
+    return fields
+
+def _patch_read_fields(fields: list[str]) -> list[str]:
+    """
+    List the fields a patch does not set but needs to read first, because a column it writes
+    is derived from them too: the species id from every species field, and the watering
+    interval from both watering benchmark fields.
+    """
+    read_fields = []
+    for group in (SPECIES_FIELDS, INTERVAL_FIELDS):
+        if any(field in fields for field in group):
+            read_fields += [field for field in group if field not in fields]
+    return read_fields
+
+def _plant_fields_query(key: str, plant_id: int, fields: list[str]) -> Select:
+    """
+    Select the given fields of the plant if it belongs to the owner, locking its row
+    (SELECT ... FOR UPDATE OF plant) so a patch derived from them cannot overwrite a
+    concurrent write made between the read and the update.
+    """
+    return (select(*PlantEntity.read_columns(fields))
+            .select_from(PlantEntity.join_species(_plant_table, fields))
+            .where(_plant_table.c.id == plant_id, _plant_table.c.owner_key == key)
+            .with_for_update(of=_plant_table))
+
+def _patch_plant_statement(key: str, plant_id: int, plant: Plant, fields: list[str]) -> Update:
+    """
+    Update only the columns of the given fields if the plant belongs to the owner, returning
+    it and the species it had (UPDATE ... FROM species).
+    """
+    statement = (update(PlantEntity)
+                 .add_cte(_bump_version_cte(key))
+                 .where(PlantEntity.id == plant_id,
+                        PlantEntity.owner_key == key,
+                        PlantEntity.species_id == SpeciesEntity.id)
+                 .values(PlantEntity.patch_values(plant, fields))
+                 .returning(PlantEntity, SpeciesEntity)
+                 .execution_options(synchronize_session=False))
+    if any(field in SPECIES_FIELDS for field in fields):
+        statement = statement.add_cte(_insert_species_cte([plant]))
+    return statement
+
+def _patched_plant(row, plant: Plant, fields: list[str]) -> Plant:
+    """Convert the row a patch returned, taking the species from the patch if it changed the species."""
+    plant_entity, species_entity = row
+    if any(field in SPECIES_FIELDS for field in fields):
+        species_entity = SpeciesEntity.from_model(plant)
+    return plant_entity.to_model(species=species_entity)
+
+def _append_health_score_statement(key: str, plant_id: int, score: int) -> Update:
+    """
+    Append a score to the plant's health history in SQL if the plant belongs to the owner, returning the new length.
+
+    Scores older than the most recent `_HEALTH_HISTORY_LIMIT` are dropped as the score is
+    appended, so the history works as a ring and the array each append rewrites stays bounded.
+    """
+    length = func.cardinality(PlantEntity.health_history)
+    recent = PlantEntity.health_history[length - _HEALTH_HISTORY_LIMIT + 2:length]
+    return (update(PlantEntity)
+            .add_cte(_bump_version_cte(key))
+            .where(PlantEntity.id == plant_id, PlantEntity.owner_key == key)
+            .values(health_history=func.array_append(recent, score))
+            .returning(PlantEntity.id, func.cardinality(PlantEntity.health_history)))
+
+def _delete_plant_statement(plant: Plant) -> Delete:
+    """Delete the plant only if it belongs to the given owner, returning it and its species (DELETE ... USING species)."""
+    return (delete(PlantEntity)
+            .add_cte(_bump_version_cte(plant.owner_key))
+            .where(PlantEntity.id == plant.id,
+                   PlantEntity.owner_key == plant.owner_key,
+                   PlantEntity.species_id == SpeciesEntity.id)
+            .returning(PlantEntity, SpeciesEntity)
+            .execution_options(synchronize_session=False))
+
 
 class PlantService:
     """Plant service to perform actions on the plant table."""
@@ -22,97 +551,331 @@ class PlantService:
                  session: Session = Depends(db_session)):
         self._session = session
 
-    def __identify_user(self, key: str) -> None:
+    def __user_exists(self, key: str) -> bool:
+        """
+        Helper method called on the error path of writes to check whether the owner exists.
+
+        Args:
+            key: the key of the owner the write was made for.
+
+        Returns:
+            bool: True if there is a user with the given key."""
+
+        return user_cache.get(key) is not None or self._session.scalar(_user_exists_query(key)) is not None
+
+    def __raise_not_found(self, key: str) -> None:
         """
-        Helper method that checks that a user with the given key exists in the database.
-        
+        Helper method called when a write matched no plant, raising the exception that explains why.
+
         Args:
-            key: the key of the user to search for.
-            
+            key: the key of the owner the write was made for.
+
         Raises:
-            UserBlankKeyException: If the key arg is empty.
-            UserNotFoundException: If the user is not found."""
-        
-        # If the key is empty raise exception
-        if key == "":
-            raise UserBlankKeyException()
-        
-        # Check that a user exists for the given key.
-        query = select(UserEntity).where(UserEntity.key == key)
-        user_entity: UserEntity | None = self._session.scalar(query)
+            UserNotFoundException: If the user is not found.
+            PlantNotFoundException: If the user exists but does not own the plant."""
 
-        # If the user does not exist then raise exception.
-        if user_entity is None:
+        if not self.__user_exists(key):
             raise UserNotFoundException()
-        
-        
-    def __find_plant_entity(self, plant_id: int, owner_key: str) -> PlantEntity:
+        raise PlantNotFoundException()
+
+    def get_version(self, key: str) -> int:
         """
-        Helper method that either retrieves a plant from the database or raises an exception.
-        
+        Retrieve the version of a user's plants, which every write to them changes.
+
+        Reading the version loads no plants, so it answers a conditional read cheaply
+        before any plants are read. Reads of the plants return the version they were
+        read at themselves, so a response is never tagged from a separate statement.
+
         Args:
-            plant_id: The id of the plant to search for.
-            owner_key: The key of the owner that owns the plant to search for.
+            key: The key for the user.
 
         Returns:
-            PlantEntity: The Entity representation of the retrieved plant.
-        
+            int: The current version of the user's plants.
+
         Raises:
-            PlantBlankIdException: If the plants ID is blank.
-            PlantNotFoundException: If the plant is not found in the database.
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
         """
 
-        # If plant_id is empty, raise exception
-        if plant_id == "":
-            raise PlantBlankIdException()
+        _check_key(key)
 
-         # Query the database to find the plant to be deleted.
-        query = select(PlantEntity).where(PlantEntity.id == plant_id)
-        plant_entity: PlantEntity | None = self._session.scalar(query)
+        # Reads for the user may be served by a replica.
+        with replica_reads(self._session, key):
+            version = self._session.scalar(_version_query(key))
 
-        # If not plant found, raise error. 
-        if plant_entity == None or plant_entity.owner_key != owner_key:
-            raise PlantNotFoundException()
-        else:
-            return plant_entity
+        if version is None:
+            raise UserNotFoundException()
+        return version
 
-    def get_all_user_plants(self, key: str) -> list[Plant]:
+    def get_all_user_plants(self,
+                            key: str,
+                            fields: str | None = None,
+                            filters: PlantFilter | None = None) -> tuple[list[Plant], int]:
         """
         Retrieve all plants for a given user from the database.
-        
+
+        Args:
+            key: The key for the user.
+            fields: Comma separated plant fields to load. Defaults to every field.
+            filters: Filters the plants must match. Defaults to every plant.
+
+        Returns:
+            tuple[list[Plant], int]: The list of the users plant objects and the version of the
+                user they were read at.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            InvalidFieldsException: If fields names a field plants do not have.
+        """
+
+        _check_key(key)
+        field_names = _parse_fields(fields)
+
+        # Reads for the user may be served by a replica.
+        with replica_reads(self._session, key):
+            rows = self._session.execute(_user_plants_query(key, fields=field_names, filters=filters)).all()
+
+        # No rows means there is no user with the given key.
+        if len(rows) == 0:
+            raise UserNotFoundException()
+
+        # Convert the retrieved entities to plant models.
+        return [PlantEntity.model_from_row(row, field_names) for row in rows if row.id is not None], rows[0].version
+
+    def get_user_plants_page(self,
+                                key: str,
+                                limit: int,
+                                cursor: str | None = None,
+                                fields: str | None = None,
+                                filters: PlantFilter | None = None) -> tuple[PlantPage, int]:
+        """
+        Retrieve one page of a user's plants from the database.
+
+        Args:
+            key: The key for the user.
+            limit: The maximum number of plants on the page.
+            cursor: The next_cursor of the previous page, or None for the first page.
+            fields: Comma separated plant fields to load. Defaults to every field.
+            filters: Filters the plants must match. Defaults to every plant.
+
+        Returns:
+            tuple[PlantPage, int]: The page of the users plants and the cursor for the next page,
+                and the version of the user they were read at.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            InvalidCursorException: If the cursor is malformed.
+            InvalidFieldsException: If fields names a field plants do not have.
+        """
+
+        _check_key(key)
+        after = _decode_cursor(cursor)
+        field_names = _parse_fields(fields)
+
+        # Fetch one plant more than the limit to learn whether there is a next page.
+        with replica_reads(self._session, key):
+            rows = self._session.execute(_user_plants_query(key, after=after, limit=limit + 1, fields=field_names, filters=filters)).all()
+
+        # No rows means there is no user with the given key.
+        if len(rows) == 0:
+            raise UserNotFoundException()
+
+        return _plant_page(rows, limit, field_names), rows[0].version
+
+    def search_plants(self,
+                      key: str,
+                      text: str,
+                      limit: int,
+                      cursor: str | None = None,
+                      fields: str | None = None,
+                      filters: PlantFilter | None = None) -> tuple[PlantPage, int]:
+        """
+        Search a user's plants by name and description, best match first.
+
+        The search is matched against the full text of the plants' names and descriptions,
+        and names also match when the search is close to a word in them, so misspelled
+        names are still found.
+
+        Args:
+            key: The key for the user.
+            text: The search, in web search syntax (quoted phrases, `or` and `-word`).
+            limit: The maximum number of plants on the page.
+            cursor: The next_cursor of the previous page, or None for the first page.
+            fields: Comma separated plant fields to load. Defaults to every field.
+            filters: Filters the plants must match. Defaults to every plant.
+
+        Returns:
+            tuple[PlantPage, int]: The page of matching plants and the cursor for the next page,
+                and the version of the user they were read at.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            InvalidCursorException: If the cursor is malformed.
+            InvalidFieldsException: If fields names a field plants do not have.
+        """
+
+        _check_key(key)
+        offset = _decode_search_cursor(cursor)
+        field_names = _parse_fields(fields)
+
+        # Fetch one plant more than the limit to learn whether there is a next page.
+        query = _search_plants_query(key, text, offset, limit + 1, field_names, filters)
+        with replica_reads(self._session, key):
+            rows = self._session.execute(query).all()
+
+        # No rows means there is no user with the given key.
+        if len(rows) == 0:
+            raise UserNotFoundException()
+
+        return _search_page(rows, offset, limit, field_names), rows[0].version
+
+    def get_due_plants(self,
+                       key: str,
+                       before: datetime | None = None,
+                       fields: str | None = None) -> list[Plant]:
+        """
+        Retrieve a user's plants that are due for water.
+
+        Args:
+            key: The key for the user.
+            before: Plants due at or before this time are returned. Defaults to now.
+            fields: Comma separated plant fields to load. Defaults to every field.
+
+        Returns:
+            list[Plant]: The users plants that are due, soonest due first.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            InvalidFieldsException: If fields names a field plants do not have.
+        """
+
+        _check_key(key)
+        field_names = _parse_fields(fields)
+
+        with replica_reads(self._session, key):
+            rows = self._session.execute(_due_plants_query(key, _due_before(before), field_names)).all()
+
+        # No rows means there is no user with the given key.
+        if len(rows) == 0:
+            raise UserNotFoundException()
+
+        return [PlantEntity.model_from_row(row, field_names) for row in rows if row.id is not None]
+
+    def get_all_due_plants(self,
+                           limit: int,
+                           before: datetime | None = None,
+                           cursor: str | None = None) -> PlantPage:
+        """
+        Retrieve one page of the plants of every user that are due for water, for reminder workers.
+
+        Args:
+            limit: The maximum number of plants on the page.
+            before: Plants due at or before this time are returned. Defaults to now.
+            cursor: The next_cursor of the previous page, or None for the first page.
+
+        Returns:
+            PlantPage: The page of due plants, soonest due first, without their owner keys,
+                and the cursor for the next page.
+
+        Raises:
+            InvalidCursorException: If the cursor is malformed.
+        """
+
+        after = _decode_due_cursor(cursor)
+
+        # Fetch one plant more than the limit to learn whether there is a next page.
+        rows = self._session.execute(_all_due_plants_query(_due_before(before), after, limit + 1)).all()
+        plants = [PlantEntity.model_from_row(row, _DUE_FIELDS) for row in rows]
+        if len(plants) <= limit:
+            return PlantPage(plants=plants, next_cursor=None)
+        return PlantPage(plants=plants[:limit], next_cursor=_encode_due_cursor(plants[limit - 1]))
+
+    def stream_user_plants(self,
+                           key: str,
+                           fields: str | None = None,
+                           filters: PlantFilter | None = None) -> Iterator[Plant]:
+        """
+        Stream all plants for a given user from a server-side cursor.
+
+        The owner is checked before this method returns; the plants are then fetched
+        in batches as the returned iterator is consumed, so memory stays flat however
+        many plants the user has. The session must stay open until iteration ends.
+
+        Args:
+            key: The key for the user.
+            fields: Comma separated plant fields to load. Defaults to every field.
+            filters: Filters the plants must match. Defaults to every plant.
+
+        Returns:
+            Iterator[Plant]: The users plants, in id order.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            InvalidFieldsException: If fields names a field plants do not have.
+        """
+
+        _check_key(key)
+        field_names = _parse_fields(fields)
+
+        query = _user_plants_query(key, fields=field_names, filters=filters).execution_options(yield_per=_STREAM_BATCH_SIZE)
+        with replica_reads(self._session, key):
+            result = self._session.execute(query)
+
+        # Peek at the first row: no rows means there is no user with the given key.
+        rows = iter(result)
+        first_row = next(rows, None)
+        if first_row is None:
+            result.close()
+            raise UserNotFoundException()
+
+        return (PlantEntity.model_from_row(row, field_names)
+                for row in itertools.chain([first_row], rows) if row.id is not None)
+
+    def get_health_analytics(self, key: str, window: int) -> tuple[GardenHealth, int]:
+        """
+        Compute health trends over the recent health scores of all of a user's plants.
+
+        Only the plants' ids and health histories are loaded, in the same single statement
+        that checks the owner, and the statistics are computed over all plants at once.
+
         Args:
             key: The key for the user.
-            
+            window: The number of most recent scores each statistic covers.
+
         Returns:
-            list[Plant]: The list of the users plant objects.
+            tuple[GardenHealth, int]: The health trend of each of the users plants, in id order,
+                and the version of the user the scores were read at.
 
         Raises:
             UserNotFoundException: If a user is not found for the provided key.
             UserBlankKeyException: If the key arg is empty.
         """
 
-        # Check that a user exists for the given key.
-        self.__identify_user(key=key)
-        
-        # Create list of plants and query db to retrieve entities.
-        plants: list[Plant] = []
-        plant_entities = self._session.query(PlantEntity).where(PlantEntity.owner_key == key)
+        _check_key(key)
 
-        # Loop through retrieved entities and convert to plant models.
-        for entity in plant_entities:
-            plant = entity.to_model()
-            plants.append(plant)
+        with replica_reads(self._session, key):
+            rows = self._session.execute(_user_plants_query(key, fields=_HEALTH_FIELDS)).all()
+
+        # No rows means there is no user with the given key.
+        if len(rows) == 0:
+            raise UserNotFoundException()
 
-        # Return the list of plants for the user with the provided key.
-        return plants
+        plant_rows = [row for row in rows if row.id is not None]
+        health = analyze_health([row.id for row in plant_rows], [row.health_history for row in plant_rows], window)
+        return health, rows[0].version
 
     def create_plant(self, plant: Plant) -> Plant:
         """
         Add a new plant to the database.
-        
+
         Args:
             plant: The plant to add to the database.
-            
+
         Returns:
             Plant: the plant that was successfully added to the database.
 
@@ -121,69 +884,870 @@ class PlantService:
             UserBlankKeyException: If the key arg is empty.
         """
 
-        # Check that a user exists for the given key.
-        self.__identify_user(key=plant.owner_key)
-        
-        # Add the plant to the db.
-        plant_entity = PlantEntity.from_model(plant=plant)
-        self._session.add(plant_entity)
+        _check_key(plant.owner_key)
+
+        # Add the plant to the db if its owner exists.
+        plant_entity: PlantEntity | None = self._session.scalar(_insert_plant_statement(plant))
+        if plant_entity is None:
+            raise UserNotFoundException()
+
+        # Convert before committing, since the commit expires the entity's attributes.
+        created_plant = plant_entity.to_model(species=SpeciesEntity.from_model(plant))
         self._session.commit()
+        recent_writers.mark(plant.owner_key)
 
-        return plant_entity.to_model()
+        return created_plant
 
-    def remove_plant(self, plant: Plant) -> Plant:
+    def bulk_create_plants(self, plants: list[Plant]) -> BulkPlantResult:
         """
-        Removes a plant from the database.
-        
-        Args: 
-            plant: The plant to remove from the database.
-            
+        Add many new plants to the database in one transaction.
+
+        Owners are checked with one query for all the distinct owner keys, and the plants
+        whose owner exists are inserted with multi-row INSERT ... RETURNING statements.
+        Plants that cannot be added are reported by their position instead of failing the
+        whole request.
+
+        Args:
+            plants: The plants to add to the database.
+
         Returns:
-            Plant: The plant that was successfully removed from the database.
+            BulkPlantResult: The plants that were added, in request order, and an error for each plant that was not.
 
         Raises:
-            UserNotfoundException: If the user with the respective key is not found.
+            BulkLimitException: If there are more plants than one bulk request may hold.
+        """
+
+        keys = _bulk_owner_keys(plants)
+        owners = set(self._session.scalars(_bulk_owners_query(keys, plants))) if len(keys) > 0 else set()
+        values, errors = _bulk_create_values(plants, owners)
+        if len(values) == 0:
+            return BulkPlantResult(errors=errors)
+
+        plant_entities = self._session.scalars(_bulk_insert_plants_statement(), values).all()
+
+        # Convert before committing, since the commit expires the entities' attributes.
+        species = _species_by_id(plants)
+        created_plants = [plant_entity.to_model(species=species[plant_entity.species_id])
+                          for plant_entity in plant_entities]
+        self._session.commit()
+        for key in owners:
+            recent_writers.mark(key)
+
+        return BulkPlantResult(plants=created_plants, errors=errors)
+
+    def bulk_update_plants(self, key: str, plants: list[Plant]) -> BulkPlantResult:
+        """
+        Update many of a user's plants in one transaction.
+
+        The plants are written with a single UPDATE ... FROM (VALUES ...) statement that
+        joins the new values to the owner's plants by id. A plant listed more than once is
+        updated with its last entry. The plants' own owner keys are not used.
+
+        Args:
+            key: The key of the user who owns the plants.
+            plants: The updated versions of the plants.
+
+        Returns:
+            BulkPlantResult: The plants that were updated, in request order, and an error for each plant that was not.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
             UserBlankKeyException: If the key arg is empty.
-            PlantNotFoundException: If the plant with the given id is not found in the database.
-            PlantBlankIdException: If the plants ID is blank.
+            BulkLimitException: If there are more plants than one bulk request may hold.
         """
 
-        # Query the database to find the owner of the plant.
-        self.__identify_user(key=plant.owner_key)
-        
-        # Query the database to find the plant to be deleted.
-        plant_entity = self.__find_plant_entity(plant_id=plant.id, owner_key=plant.owner_key)
-        
-        # Delete plant from database and return. 
-        self._session.delete(plant_entity)
+        _check_key(key)
+        _check_bulk_size(plants)
+        positions, errors = _bulk_plant_ids([plant.id for plant in plants])
+        latest = {plant.id: plant for plant in plants if plant.id is not None}
+
+        plant_entities = []
+        if len(latest) > 0:
+            plant_entities = self._session.scalars(_bulk_update_plants_statement(key, list(latest.values()))).all()
+        if len(plant_entities) == 0 and not self.__user_exists(key):
+            raise UserNotFoundException()
+
+        species = _species_by_id(list(latest.values()))
+        result = _bulk_plant_result(positions,
+                                    [plant_entity.to_model(species=species[plant_entity.species_id])
+                                     for plant_entity in plant_entities],
+                                    errors)
         self._session.commit()
+        if len(plant_entities) > 0:
+            recent_writers.mark(key)
 
-        return plant_entity.to_model()
+        return result
 
-    def update_Plant(self, plant: Plant) -> Plant:
+    def bulk_remove_plants(self, key: str, ids: list[int]) -> BulkPlantResult:
         """
-        Updates a plant in the database.
-        
+        Remove many of a user's plants in one transaction.
+
+        The plants are removed with a single DELETE ... WHERE id = ANY(:ids) statement.
+
         Args:
-            plant: The updated version of the plant.
-            
+            key: The key of the user who owns the plants.
+            ids: The ids of the plants to remove.
+
         Returns:
-            Plant: The model representation of the plant that was updated in the database.
+            BulkPlantResult: The plants that were removed, in request order, and an error for each id that was not.
 
         Raises:
-            UserNotfoundException: If the user with the respective key is not found.
+            UserNotFoundException: If a user is not found for the provided key.
             UserBlankKeyException: If the key arg is empty.
-            PlantNotFoundException: If the plant with the given id is not found in the database.
-            PlantBlankIdException: If the plants ID is blank.
+            BulkLimitException: If there are more ids than one bulk request may hold.
         """
-        # Query the database to find the owner of the plant.
-        self.__identify_user(plant.owner_key)
-        
-        # Query the database to find the plant to be deleted.
-        plant_entity = self.__find_plant_entity(plant_id=plant.id, owner_key=plant.owner_key)
-        
-        # Update the plant entity and commit the changes.
-        plant_entity.update(plant=plant)
+
+        _check_key(key)
+        _check_bulk_size(ids)
+        positions, errors = _bulk_plant_ids(ids)
+
+        rows = []
+        if len(positions) > 0:
+            rows = self._session.execute(_bulk_delete_plants_statement(key, list(positions))).all()
+        if len(rows) == 0 and not self.__user_exists(key):
+            raise UserNotFoundException()
+
+        result = _bulk_plant_result(positions,
+                                    [plant_entity.to_model(species=species_entity) for plant_entity, species_entity in rows],
+                                    errors)
         self._session.commit()
+        if len(rows) > 0:
+            recent_writers.mark(key)
+
+        return result
+
+    def remove_plant(self, plant: Plant) -> Plant:
+        """
+        Removes a plant from the database.
+
+        Args:
+            plant: The plant to remove from the database.
+
+        Returns:
+            Plant: The plant that was successfully removed from the database.
+
+        Raises:
+            UserNotfoundException: If the user with the respective key is not found.
+            UserBlankKeyException: If the key arg is empty.
+            PlantNotFoundException: If the plant with the given id is not found in the database.
+            PlantBlankIdException: If the plants ID is blank.
+        """
+
+        _check_plant(plant)
+
+        # Delete the plant from the database if it belongs to the owner.
+        row = self._session.execute(_delete_plant_statement(plant)).one_or_none()
+        if row is None:
+            self.__raise_not_found(plant.owner_key)
+
+        plant_entity, species_entity = row
+        removed_plant = plant_entity.to_model(species=species_entity)
+        self._session.commit()
+        recent_writers.mark(plant.owner_key)
+
+        return removed_plant
+
+    def record_health_score(self, key: str, plant_id: int, score: int) -> HealthScore:
+        """
+        Append a score to a plant's health history.
+
+        The score is appended by the database with `array_append`, so only the score is
+        sent and the other columns are left alone. The history keeps the most recent
+        `_HEALTH_HISTORY_LIMIT` scores, dropping the oldest as new ones are appended, so
+        the array rewritten by each append is bounded rather than growing with the plant's age.
+
+        Args:
+            key: The key of the user who owns the plant.
+            plant_id: The id of the plant.
+            score: The plant's health, from 1 to 10.
+
+        Returns:
+            HealthScore: The recorded score and the new length of the plant's health history,
+                at most `_HEALTH_HISTORY_LIMIT`.
+
+        Raises:
+            UserNotfoundException: If the user with the respective key is not found.
+            UserBlankKeyException: If the key arg is empty.
+            PlantNotFoundException: If the plant with the given id is not found in the database.
+        """
+
+        _check_key(key)
+
+        # Append the score if the plant belongs to the owner.
+        row = self._session.execute(_append_health_score_statement(key, plant_id, score)).one_or_none()
+        if row is None:
+            self.__raise_not_found(key)
+
+        self._session.commit()
+        recent_writers.mark(key)
+
+        return HealthScore(id=plant_id, score=score, entries=row[1])
+
+    def update_Plant(self, plant: Plant) -> Plant:
+        """
+        Updates a plant in the database.
+
+        Args:
+            plant: The updated version of the plant.
+
+        Returns:
+            Plant: The model representation of the plant that was updated in the database.
+
+        Raises:
+            UserNotfoundException: If the user with the respective key is not found.
+            UserBlankKeyException: If the key arg is empty.
+            PlantNotFoundException: If the plant with the given id is not found in the database.
+            PlantBlankIdException: If the plants ID is blank.
+        """
+
+        _check_plant(plant)
+
+        # Update the plant in the database if it belongs to the owner.
+        plant_entity: PlantEntity | None = self._session.scalar(_update_plant_statement(plant))
+        if plant_entity is None:
+            self.__raise_not_found(plant.owner_key)
+
+        updated_plant = plant_entity.to_model(species=SpeciesEntity.from_model(plant))
+        self._session.commit()
+        recent_writers.mark(plant.owner_key)
+
+        return updated_plant
+
+    def patch_plant(self, key: str, plant_id: int, changes: Plant) -> Plant:
+        """
+        Updates only the fields of a plant that a patch sets.
+
+        One UPDATE writes just the columns those fields are stored in, so large values the
+        patch leaves alone, like the health history, are not sent or rewritten. A patch of a
+        species field, or of only one of the watering benchmark fields, first reads the
+        fields stored together with it, locking the plant's row until the update commits.
+
+        Args:
+            key: The key of the user who owns the plant.
+            plant_id: The id of the plant.
+            changes: A plant with only the fields to update set. Its id, owner key and next
+                watering time are ignored.
+
+        Returns:
+            Plant: The model representation of the plant that was updated in the database.
+
+        Raises:
+            UserNotfoundException: If the user with the respective key is not found.
+            UserBlankKeyException: If the key arg is empty.
+            PlantNotFoundException: If the plant with the given id is not found in the database.
+            EmptyPatchException: If the patch sets no field that can be changed.
+        """
+
+        _check_key(key)
+        fields = _patch_fields(changes)
+
+        plant = changes
+        read_fields = _patch_read_fields(fields)
+        if len(read_fields) > 0:
+            row = self._session.execute(_plant_fields_query(key, plant_id, read_fields)).one_or_none()
+            if row is None:
+                self.__raise_not_found(key)
+            plant = PlantEntity.model_from_row(row, read_fields).model_copy(
+                update={field: getattr(changes, field) for field in fields})
+
+        # Update the plant's changed columns if it belongs to the owner.
+        row = self._session.execute(_patch_plant_statement(key, plant_id, plant, fields)).one_or_none()
+        if row is None:
+            self.__raise_not_found(key)
+
+        patched_plant = _patched_plant(row, plant, fields)
+        self._session.commit()
+        recent_writers.mark(key)
+
+        return patched_plant
+
+
+class AsyncPlantService:
+    """Async plant service to perform actions on the plant table without blocking the event loop."""
+
+    def __init__(self,
+                 session: AsyncSession = Depends(async_db_session)):
+        self._session = session
+
+    async def __user_exists(self, key: str) -> bool:
+        """
+        Helper method called on the error path of writes to check whether the owner exists.
+
+        Args:
+            key: the key of the owner the write was made for.
+
+        Returns:
+            bool: True if there is a user with the given key."""
+
+        return user_cache.get(key) is not None or await self._session.scalar(_user_exists_query(key)) is not None
+
+    async def __raise_not_found(self, key: str) -> None:
+        """
+        Helper method called when a write matched no plant, raising the exception that explains why.
+
+        Args:
+            key: the key of the owner the write was made for.
+
+        Raises:
+            UserNotFoundException: If the user is not found.
+            PlantNotFoundException: If the user exists but does not own the plant."""
+
+        if not await self.__user_exists(key):
+            raise UserNotFoundException()
+        raise PlantNotFoundException()
+
+    async def get_version(self, key: str) -> int:
+        """
+        Retrieve the version of a user's plants, which every write to them changes.
+
+        Reading the version loads no plants, so it answers a conditional read cheaply
+        before any plants are read. Reads of the plants return the version they were
+        read at themselves, so a response is never tagged from a separate statement.
+
+        Args:
+            key: The key for the user.
+
+        Returns:
+            int: The current version of the user's plants.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+        """
+
+        _check_key(key)
+
+        # Reads for the user may be served by a replica.
+        with replica_reads(self._session, key):
+            version = await self._session.scalar(_version_query(key))
+
+        if version is None:
+            raise UserNotFoundException()
+        return version
+
+    async def get_all_user_plants(self,
+                                  key: str,
+                                  fields: str | None = None,
+                                  filters: PlantFilter | None = None) -> tuple[list[Plant], int]:
+        """
+        Retrieve all plants for a given user from the database.
+
+        Args:
+            key: The key for the user.
+            fields: Comma separated plant fields to load. Defaults to every field.
+            filters: Filters the plants must match. Defaults to every plant.
+
+        Returns:
+            tuple[list[Plant], int]: The list of the users plant objects and the version of the
+                user they were read at.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            InvalidFieldsException: If fields names a field plants do not have.
+        """
+
+        _check_key(key)
+        field_names = _parse_fields(fields)
+
+        # Reads for the user may be served by a replica.
+        with replica_reads(self._session, key):
+            rows = (await self._session.execute(_user_plants_query(key, fields=field_names, filters=filters))).all()
+
+        # No rows means there is no user with the given key.
+        if len(rows) == 0:
+            raise UserNotFoundException()
+
+        return [PlantEntity.model_from_row(row, field_names) for row in rows if row.id is not None], rows[0].version
+
+    async def get_user_plants_page(self,
+                                   key: str,
+                                   limit: int,
+                                   cursor: str | None = None,
+                                   fields: str | None = None,
+                                   filters: PlantFilter | None = None) -> tuple[PlantPage, int]:
+        """
+        Retrieve one page of a user's plants from the database.
+
+        Args:
+            key: The key for the user.
+            limit: The maximum number of plants on the page.
+            cursor: The next_cursor of the previous page, or None for the first page.
+            fields: Comma separated plant fields to load. Defaults to every field.
+            filters: Filters the plants must match. Defaults to every plant.
+
+        Returns:
+            tuple[PlantPage, int]: The page of the users plants and the cursor for the next page,
+                and the version of the user they were read at.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            InvalidCursorException: If the cursor is malformed.
+            InvalidFieldsException: If fields names a field plants do not have.
+        """
+
+        _check_key(key)
+        after = _decode_cursor(cursor)
+        field_names = _parse_fields(fields)
+
+        # Fetch one plant more than the limit to learn whether there is a next page.
+        with replica_reads(self._session, key):
+            rows = (await self._session.execute(_user_plants_query(key, after=after, limit=limit + 1, fields=field_names, filters=filters))).all()
+
+        # No rows means there is no user with the given key.
+        if len(rows) == 0:
+            raise UserNotFoundException()
+
+        return _plant_page(rows, limit, field_names), rows[0].version
+
+    async def search_plants(self,
+                            key: str,
+                            text: str,
+                            limit: int,
+                            cursor: str | None = None,
+                            fields: str | None = None,
+                            filters: PlantFilter | None = None) -> tuple[PlantPage, int]:
+        """
+        Search a user's plants by name and description, best match first.
+
+        The search is matched against the full text of the plants' names and descriptions,
+        and names also match when the search is close to a word in them, so misspelled
+        names are still found.
+
+        Args:
+            key: The key for the user.
+            text: The search, in web search syntax (quoted phrases, `or` and `-word`).
+            limit: The maximum number of plants on the page.
+            cursor: The next_cursor of the previous page, or None for the first page.
+            fields: Comma separated plant fields to load. Defaults to every field.
+            filters: Filters the plants must match. Defaults to every plant.
+
+        Returns:
+            tuple[PlantPage, int]: The page of matching plants and the cursor for the next page,
+                and the version of the user they were read at.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            InvalidCursorException: If the cursor is malformed.
+            InvalidFieldsException: If fields names a field plants do not have.
+        """
+
+        _check_key(key)
+        offset = _decode_search_cursor(cursor)
+        field_names = _parse_fields(fields)
+
+        # Fetch one plant more than the limit to learn whether there is a next page.
+        query = _search_plants_query(key, text, offset, limit + 1, field_names, filters)
+        with replica_reads(self._session, key):
+            rows = (await self._session.execute(query)).all()
+
+        # No rows means there is no user with the given key.
+        if len(rows) == 0:
+            raise UserNotFoundException()
+
+        return _search_page(rows, offset, limit, field_names), rows[0].version
+
+    async def get_due_plants(self,
+                             key: str,
+                             before: datetime | None = None,
+                             fields: str | None = None) -> list[Plant]:
+        """
+        Retrieve a user's plants that are due for water.
+
+        Args:
+            key: The key for the user.
+            before: Plants due at or before this time are returned. Defaults to now.
+            fields: Comma separated plant fields to load. Defaults to every field.
+
+        Returns:
+            list[Plant]: The users plants that are due, soonest due first.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            InvalidFieldsException: If fields names a field plants do not have.
+        """
+
+        _check_key(key)
+        field_names = _parse_fields(fields)
+
+        with replica_reads(self._session, key):
+            rows = (await self._session.execute(_due_plants_query(key, _due_before(before), field_names))).all()
+
+        # No rows means there is no user with the given key.
+        if len(rows) == 0:
+            raise UserNotFoundException()
+
+        return [PlantEntity.model_from_row(row, field_names) for row in rows if row.id is not None]
+
+    async def stream_user_plants(self,
+                                 key: str,
+                                 fields: str | None = None,
+                                 filters: PlantFilter | None = None) -> AsyncIterator[Plant]:
+        """
+        Stream all plants for a given user from a server-side cursor.
+
+        The owner is checked before this method returns; the plants are then fetched
+        in batches as the returned iterator is consumed, so memory stays flat however
+        many plants the user has. The session must stay open until iteration ends.
+
+        Args:
+            key: The key for the user.
+            fields: Comma separated plant fields to load. Defaults to every field.
+            filters: Filters the plants must match. Defaults to every plant.
+
+        Returns:
+            AsyncIterator[Plant]: The users plants, in id order.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            InvalidFieldsException: If fields names a field plants do not have.
+        """
+
+        _check_key(key)
+        field_names = _parse_fields(fields)
+
+        query = _user_plants_query(key, fields=field_names, filters=filters).execution_options(yield_per=_STREAM_BATCH_SIZE)
+        with replica_reads(self._session, key):
+            result = await self._session.stream(query)
+
+        # Peek at the first row: no rows means there is no user with the given key.
+        first_row = await result.fetchone()
+        if first_row is None:
+            await result.close()
+            raise UserNotFoundException()
+
+        async def plants() -> AsyncIterator[Plant]:
+            if first_row.id is not None:
+                yield PlantEntity.model_from_row(first_row, field_names)
+            async for row in result:
+                yield PlantEntity.model_from_row(row, field_names)
+
+        return plants()
+
+    async def get_health_analytics(self, key: str, window: int) -> tuple[GardenHealth, int]:
+        """
+        Compute health trends over the recent health scores of all of a user's plants.
+
+        Only the plants' ids and health histories are loaded, in the same single statement
+        that checks the owner, and the statistics are computed over all plants at once.
+
+        Args:
+            key: The key for the user.
+            window: The number of most recent scores each statistic covers.
+
+        Returns:
+            tuple[GardenHealth, int]: The health trend of each of the users plants, in id order,
+                and the version of the user the scores were read at.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+        """
+
+        _check_key(key)
+
+        with replica_reads(self._session, key):
+            rows = (await self._session.execute(_user_plants_query(key, fields=_HEALTH_FIELDS))).all()
+
+        # No rows means there is no user with the given key.
+        if len(rows) == 0:
+            raise UserNotFoundException()
+
+        # The statistics are CPU bound, so they are computed off the event loop.
+        plant_rows = [row for row in rows if row.id is not None]
+        health = await asyncio.to_thread(analyze_health,
+                                         [row.id for row in plant_rows],
+                                         [row.health_history for row in plant_rows],
+                                         window)
+        return health, rows[0].version
+
+    async def create_plant(self, plant: Plant) -> Plant:
+        """
+        Add a new plant to the database.
+
+        Args:
+            plant: The plant to add to the database.
+
+        Returns:
+            Plant: the plant that was successfully added to the database.
+
+        Raises:
+            UserNotFoundException: If the plant's owner key does not belong to a user in the user table.
+            UserBlankKeyException: If the key arg is empty.
+        """
+
+        _check_key(plant.owner_key)
+
+        # Add the plant to the db if its owner exists.
+        plant_entity: PlantEntity | None = await self._session.scalar(_insert_plant_statement(plant))
+        if plant_entity is None:
+            raise UserNotFoundException()
+
+        await self._session.commit()
+        recent_writers.mark(plant.owner_key)
+
+        return plant_entity.to_model(species=SpeciesEntity.from_model(plant))
+
+    async def bulk_create_plants(self, plants: list[Plant]) -> BulkPlantResult:
+        """
+        Add many new plants to the database in one transaction.
+
+        Owners are checked with one query for all the distinct owner keys, and the plants
+        whose owner exists are inserted with multi-row INSERT ... RETURNING statements.
+        Plants that cannot be added are reported by their position instead of failing the
+        whole request.
+
+        Args:
+            plants: The plants to add to the database.
+
+        Returns:
+            BulkPlantResult: The plants that were added, in request order, and an error for each plant that was not.
+
+        Raises:
+            BulkLimitException: If there are more plants than one bulk request may hold.
+        """
+
+        keys = _bulk_owner_keys(plants)
+        owners = set(await self._session.scalars(_bulk_owners_query(keys, plants))) if len(keys) > 0 else set()
+        values, errors = _bulk_create_values(plants, owners)
+        if len(values) == 0:
+            return BulkPlantResult(errors=errors)
+
+        plant_entities = (await self._session.scalars(_bulk_insert_plants_statement(), values)).all()
+
+        await self._session.commit()
+        for key in owners:
+            recent_writers.mark(key)
+
+        species = _species_by_id(plants)
+        return BulkPlantResult(plants=[plant_entity.to_model(species=species[plant_entity.species_id])
+                                       for plant_entity in plant_entities],
+                               errors=errors)
+
+    async def bulk_update_plants(self, key: str, plants: list[Plant]) -> BulkPlantResult:
+        """
+        Update many of a user's plants in one transaction.
+
+        The plants are written with a single UPDATE ... FROM (VALUES ...) statement that
+        joins the new values to the owner's plants by id. A plant listed more than once is
+        updated with its last entry. The plants' own owner keys are not used.
+
+        Args:
+            key: The key of the user who owns the plants.
+            plants: The updated versions of the plants.
+
+        Returns:
+            BulkPlantResult: The plants that were updated, in request order, and an error for each plant that was not.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            BulkLimitException: If there are more plants than one bulk request may hold.
+        """
+
+        _check_key(key)
+        _check_bulk_size(plants)
+        positions, errors = _bulk_plant_ids([plant.id for plant in plants])
+        latest = {plant.id: plant for plant in plants if plant.id is not None}
+
+        plant_entities = []
+        if len(latest) > 0:
+            plant_entities = (await self._session.scalars(_bulk_update_plants_statement(key, list(latest.values())))).all()
+        if len(plant_entities) == 0 and not await self.__user_exists(key):
+            raise UserNotFoundException()
+
+        species = _species_by_id(list(latest.values()))
+        result = _bulk_plant_result(positions,
+                                    [plant_entity.to_model(species=species[plant_entity.species_id])
+                                     for plant_entity in plant_entities],
+                                    errors)
+        await self._session.commit()
+        if len(plant_entities) > 0:
+            recent_writers.mark(key)
+
+        return result
+
+    async def bulk_remove_plants(self, key: str, ids: list[int]) -> BulkPlantResult:
+        """
+        Remove many of a user's plants in one transaction.
+
+        The plants are removed with a single DELETE ... WHERE id = ANY(:ids) statement.
+
+        Args:
+            key: The key of the user who owns the plants.
+            ids: The ids of the plants to remove.
+
+        Returns:
+            BulkPlantResult: The plants that were removed, in request order, and an error for each id that was not.
+
+        Raises:
+            UserNotFoundException: If a user is not found for the provided key.
+            UserBlankKeyException: If the key arg is empty.
+            BulkLimitException: If there are more ids than one bulk request may hold.
+        """
+
+        _check_key(key)
+        _check_bulk_size(ids)
+        positions, errors = _bulk_plant_ids(ids)
+
+        rows = []
+        if len(positions) > 0:
+            rows = (await self._session.execute(_bulk_delete_plants_statement(key, list(positions)))).all()
+        if len(rows) == 0 and not await self.__user_exists(key):
+            raise UserNotFoundException()
+
+        result = _bulk_plant_result(positions,
+                                    [plant_entity.to_model(species=species_entity) for plant_entity, species_entity in rows],
+                                    errors)
+        await self._session.commit()
+        if len(rows) > 0:
+            recent_writers.mark(key)
+
+        return result
+
+    async def remove_plant(self, plant: Plant) -> Plant:
+        """
+        Removes a plant from the database.
+
+        Args:
+            plant: The plant to remove from the database.
+
+        Returns:
+            Plant: The plant that was successfully removed from the database.
+
+        Raises:
+            UserNotfoundException: If the user with the respective key is not found.
+            UserBlankKeyException: If the key arg is empty.
+            PlantNotFoundException: If the plant with the given id is not found in the database.
+            PlantBlankIdException: If the plants ID is blank.
+        """
+
+        _check_plant(plant)
+
+        # Delete the plant from the database if it belongs to the owner.
+        row = (await self._session.execute(_delete_plant_statement(plant))).one_or_none()
+        if row is None:
+            await self.__raise_not_found(plant.owner_key)
+
+        await self._session.commit()
+        recent_writers.mark(plant.owner_key)
+
+        plant_entity, species_entity = row
+        return plant_entity.to_model(species=species_entity)
+
+    async def record_health_score(self, key: str, plant_id: int, score: int) -> HealthScore:
+        """
+        Append a score to a plant's health history.
+
+        The score is appended by the database with `array_append`, so only the score is
+        sent and the other columns are left alone. The history keeps the most recent
+        `_HEALTH_HISTORY_LIMIT` scores, dropping the oldest as new ones are appended, so
+        the array rewritten by each append is bounded rather than growing with the plant's age.
+
+        Args:
+            key: The key of the user who owns the plant.
+            plant_id: The id of the plant.
+            score: The plant's health, from 1 to 10.
+
+        Returns:
+            HealthScore: The recorded score and the new length of the plant's health history,
+                at most `_HEALTH_HISTORY_LIMIT`.
+
+        Raises:
+            UserNotfoundException: If the user with the respective key is not found.
+            UserBlankKeyException: If the key arg is empty.
+            PlantNotFoundException: If the plant with the given id is not found in the database.
+        """
+
+        _check_key(key)
+
+        # Append the score if the plant belongs to the owner.
+        row = (await self._session.execute(_append_health_score_statement(key, plant_id, score))).one_or_none()
+        if row is None:
+            await self.__raise_not_found(key)
+
+        await self._session.commit()
+        recent_writers.mark(key)
+
+        return HealthScore(id=plant_id, score=score, entries=row[1])
+
+    async def update_Plant(self, plant: Plant) -> Plant:
+        """
+        Updates a plant in the database.
+
+        Args:
+            plant: The updated version of the plant.
+
+        Returns:
+            Plant: The model representation of the plant that was updated in the database.
+
+        Raises:
+            UserNotfoundException: If the user with the respective key is not found.
+            UserBlankKeyException: If the key arg is empty.
+            PlantNotFoundException: If the plant with the given id is not found in the database.
+            PlantBlankIdException: If the plants ID is blank.
+        """
+
+        _check_plant(plant)
+
+        # Update the plant in the database if it belongs to the owner.
+        plant_entity: PlantEntity | None = await self._session.scalar(_update_plant_statement(plant))
+        if plant_entity is None:
+            await self.__raise_not_found(plant.owner_key)
+
+        await self._session.commit()
+        recent_writers.mark(plant.owner_key)
+
+        return plant_entity.to_model(species=SpeciesEntity.from_model(plant))
+
+    async def patch_plant(self, key: str, plant_id: int, changes: Plant) -> Plant:
+        """
+        Updates only the fields of a plant that a patch sets.
+
+        One UPDATE writes just the columns those fields are stored in, so large values the
+        patch leaves alone, like the health history, are not sent or rewritten. A patch of a
+        species field, or of only one of the watering benchmark fields, first reads the
+        fields stored together with it, locking the plant's row until the update commits.
+
+        Args:
+            key: The key of the user who owns the plant.
+            plant_id: The id of the plant.
+            changes: A plant with only the fields to update set. Its id, owner key and next
+                watering time are ignored.
+
+        Returns:
+            Plant: The model representation of the plant that was updated in the database.
+
+        Raises:
+            UserNotfoundException: If the user with the respective key is not found.
+            UserBlankKeyException: If the key arg is empty.
+            PlantNotFoundException: If the plant with the given id is not found in the database.
+            EmptyPatchException: If the patch sets no field that can be changed.
+        """
+
+        _check_key(key)
+        fields = _patch_fields(changes)
+
+        plant = changes
+        read_fields = _patch_read_fields(fields)
+        if len(read_fields) > 0:
+            row = (await self._session.execute(_plant_fields_query(key, plant_id, read_fields))).one_or_none()
+            if row is None:
+                await self.__raise_not_found(key)
+            plant = PlantEntity.model_from_row(row, read_fields).model_copy(
+                update={field: getattr(changes, field) for field in fields})
+
+        # Update the plant's changed columns if it belongs to the owner.
+        row = (await self._session.execute(_patch_plant_statement(key, plant_id, plant, fields))).one_or_none()
+        if row is None:
+            await self.__raise_not_found(key)
+
+        patched_plant = _patched_plant(row, plant, fields)
+        await self._session.commit()
+        recent_writers.mark(key)
 
-        return plant_entity.to_model()
+        return patched_plant
@@ -0,0 +1,115 @@
+"""Signed access and refresh tokens that identify users without a lookup of the user table."""
+
+import threading
+import time
+from typing import Callable
+
+import jwt
+
+from ..env import getenv
+from ..models.token import TokenPair
+from .exceptions import InvalidTokenException
+
+# The only algorithm tokens are signed and accepted with.
+_ALGORITHM = "HS256"
+
+
+class TokenIssuer:
+    """Issues and verifies HS256 JWTs whose subject is a user's key.
+
+    Access tokens are short lived and verified from their signature alone, so a request
+    carrying one identifies its user without a database round trip. Refresh tokens live
+    longer and are only accepted by `UserService.refresh_tokens`, which checks that the user
+    still exists before issuing a new pair.
+
+    Deleted users are kept on a revocation list for as long as an access token issued to
+    them could still be valid. The list is per process, like the user cache: other workers
+    accept a deleted user's access token until it expires, after which refreshing it fails.
+    """
+
+    def __init__(self,
+                 secret: str,
+                 access_ttl: int,
+                 refresh_ttl: int,
+                 clock: Callable[[], float] = time.time):
+        self.access_ttl = access_ttl
+        self.refresh_ttl = refresh_ttl
+        self._secret = secret
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._revoked: dict[str, float] = {}
+
+    def _encode(self, key: str, token_type: str, ttl: int) -> str:
+        issued_at = int(self._clock())
+        return jwt.encode({"sub": key, "type": token_type, "iat": issued_at, "exp": issued_at + ttl},
+                          self._secret, algorithm=_ALGORITHM)
+
+    def issue(self, key: str) -> TokenPair:
+        """
+        Issue an access and a refresh token for a user.
+
+        Args:
+            key: The key of the user, which becomes the tokens' subject.
+
+        Returns:
+            TokenPair: The signed tokens.
+        """
+        return TokenPair(access_token=self._encode(key, "access", self.access_ttl),
+                         refresh_token=self._encode(key, "refresh", self.refresh_ttl),
+                         expires_in=self.access_ttl)
+
+    def verify(self, token: str, token_type: str = "access") -> str:
+        """
+        Verify a token's signature, expiry and type, and that its user was not deleted.
+
+        Args:
+            token: The encoded token.
+            token_type: The type the token must be, `access` or `refresh`.
+
+        Returns:
+            str: The key of the user the token was issued to.
+
+        Raises:
+            InvalidTokenException: If the token is malformed, forged, expired, revoked or of the wrong type.
+        """
+        try:
+            # Expiry is checked against the issuer's clock below.
+            claims = jwt.decode(token, self._secret, algorithms=[_ALGORITHM],
+                                options={"require": ["sub", "type", "exp"], "verify_exp": False})
+        except jwt.InvalidTokenError:
+            raise InvalidTokenException()
+
+        now = self._clock()
+        if claims["type"] != token_type:
+            raise InvalidTokenException(f"Expected an {token_type} token.")
+        if claims["exp"] <= now:
+            raise InvalidTokenException("Token expired.")
+        with self._lock:
+            if self._revoked.get(claims["sub"], 0) > now:
+                raise InvalidTokenException("Token revoked.")
+        return claims["sub"]
+
+    def revoke(self, key: str) -> None:
+        """
+        Reject the access tokens issued to a user so far, e.g. after the user was deleted.
+
+        Args:
+            key: The key of the user.
+        """
+        with self._lock:
+            now = self._clock()
+            # Entries are only needed until the last access token they reject has expired.
+            self._revoked = {revoked_key: until for revoked_key, until in self._revoked.items() if until > now}
+            self._revoked[key] = now + self.access_ttl
+
+    def clear(self) -> None:
+        """Forget every revoked user."""
+        with self._lock:
+            self._revoked.clear()
+
+
+# Every worker signs and verifies tokens with the same configured secret, so there is no default.
+token_issuer = TokenIssuer(secret=getenv("JWT_SECRET"),
+                           access_ttl=int(getenv("ACCESS_TOKEN_TTL_SECONDS", "900")),
+                           refresh_ttl=int(getenv("REFRESH_TOKEN_TTL_SECONDS", "1209600")))
+"""Application-wide issuer of user tokens."""
@@ -1,16 +1,25 @@
 """User Service to be used by the user api to perform actions on the user table."""
 
 from fastapi import Depends
-from ..database import db_session
-from sqlalchemy.orm import Session
+from ..database import db_session, async_db_session, replica_reads, recent_writers
+from sqlalchemy.orm import Session, defer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
-from ..models.user import User
+from ..models.user import User, UserProfile, SignedInUser
+from ..models.token import TokenPair
 from ..entities.user_entity import UserEntity
 from .exceptions import InvalidCredentialsUserException, DuplicateUserException, UserNotFoundException
+from .user_cache import user_cache
+from .tokens import token_issuer
+from .passwords import password_hasher
 
 import hashlib
-from datetime import datetime
+from datetime import datetime, timezone
+
+# Leaves the password hash out of loaded users; only signing in reads it.
+_without_password = defer(UserEntity.password)
 
 class UserService:
     """User service to perform actions on the user table"""
@@ -20,7 +29,7 @@ class UserService:
     ):
         self._session = session
 
-    def create_user(self, user: User) -> User:
+    def create_user(self, user: User) -> SignedInUser:
         """
         Creates a new user in the database
         
@@ -30,7 +39,7 @@ class UserService:
             email: The users email.
 
         Returns:
-            key: the key for the newly create user in the db.
+            SignedInUser: the newly created user, with its key and the tokens it authenticates with.
 
         Raises:
             InvalidCredentialsException: If the input is improperly formatted or empty.
@@ -48,14 +57,14 @@ class UserService:
         elif user.first_name == "" or user.last_name == "" or user.email == "" or user.password == "":
             raise InvalidCredentialsUserException("All fields must be filled out.")
         
-        entity = self._session.query(UserEntity).filter(UserEntity.email == user.email).one_or_none()
+        entity = self._session.query(UserEntity).options(_without_password).filter(UserEntity.email == user.email).one_or_none()
         
         # Check for duplicate user
         if entity:
             raise DuplicateUserException(entity=entity)
         
         # Create the date string
-        date = datetime.now()
+        date = datetime.now(timezone.utc)
         date_string = date.strftime("%Y-%m-%d %H:%M:%S")
 
         # Create the key for the user
@@ -67,7 +76,7 @@ class UserService:
         user = User(first_name=user.first_name,
                     last_name=user.last_name,
                     email= user.email,
-                    password= user.password,
+                    password= password_hasher.hash(user.password),
                     created_at=date_string,
                     key=key,
                     )
@@ -75,12 +84,18 @@ class UserService:
         # Create the entity and add it to the database
         user_entity = UserEntity.from_model(user=user)
         self._session.add(user_entity)
-        self._session.commit()
+        try:
+            self._session.commit()
+        except IntegrityError:
+            # The email was taken since it was checked above, e.g. by a concurrent sign up.
+            self._session.rollback()
+            raise DuplicateUserException(entity=user)
+        recent_writers.mark(user_entity.key)
 
-        # Return the new users key
-        return user_entity.to_model()
+        # Return the new user with its key and tokens
+        return SignedInUser(**user_entity.to_model().model_dump(), tokens=token_issuer.issue(user_entity.key))
     
-    def sign_in(self, email: str, password: str) -> User:
+    def sign_in(self, email: str, password: str) -> SignedInUser:
         """
         Signs in a user with a given email and password.
         
@@ -89,72 +104,127 @@ class UserService:
             password: The password of the user to be signed in.
             
         Returns:
-            key: The key for the newly signed in user.
+            SignedInUser: The signed in user, with its key and the tokens it authenticates with.
             
         Raises: 
             UserNotFoundException: if the user is not found in the database."""
         
-        # Retreive the user from the database.
-        query = select(UserEntity).where(UserEntity.email == email and UserEntity.password == password)
+        # Retreive the user from the database and check the password in the hashing pool.
+        query = select(UserEntity).where(UserEntity.email == email)
         entity: UserEntity | None = self._session.scalar(query)
 
-        if entity:
-            # Return the key for the entity.
-            return entity.to_model()
+        if entity and password_hasher.verify(password, entity.password):
+            # Upgrade plaintext passwords and hashes of an older cost now that the password is known.
+            if password_hasher.needs_rehash(entity.password):
+                entity.password = password_hasher.hash(password)
+                entity.version = UserEntity.version + 1
+                self._session.commit()
+                recent_writers.mark(entity.key)
+                user_cache.invalidate(entity.key)
+            # Return the user with its key and a new pair of tokens.
+            return SignedInUser(**entity.to_model().model_dump(), tokens=token_issuer.issue(entity.key))
         else:
             raise UserNotFoundException()
     
-    def get_user(self, key: str) -> User:
+    def refresh_tokens(self, refresh_token: str) -> TokenPair:
         """
-        Retrieves a user from the database
-        
+        Exchanges a refresh token for a new pair of tokens.
+
+        Access tokens are trusted without a lookup until they expire, so this is where a
+        signed in user is checked against the database again.
+
+        Args:
+            refresh_token: The refresh token of an earlier sign in or refresh.
+
+        Returns:
+            TokenPair: The new tokens.
+
+        Raises:
+            InvalidTokenException: If the refresh token is invalid, expired or revoked.
+            UserNotFoundException: If the user it was issued to is no longer in the database.
+        """
+
+        key = token_issuer.verify(refresh_token, token_type="refresh")
+        if self._session.scalar(select(UserEntity.key).where(UserEntity.key == key)) is None:
+            raise UserNotFoundException()
+        return token_issuer.issue(key)
+
+    def get_user(self, key: str) -> tuple[UserProfile, int]:
+        """
+        Retrieves a user from the database, and the version of the user it was read at.
+
+        The version is read in the same row as the user and cached with it, so a user
+        served from the cache is tagged with the version it reflects.
+
         Args:
             key: the key of the user to be retrieved
 
-        User:
-            User: a user in the database
+        Returns:
+            tuple[UserProfile, int]: a user in the database, without their password, and their version
 
         Raises:
             UserNotFoundException: If the user is not in the database
         """
         
-        # Get the user entity from the database.
-        query = select(UserEntity).where(UserEntity.key == key)
-        entity: UserEntity | None = self._session.scalar(query)
+        # Serve the user from the cache when possible.
+        cached = user_cache.get(key)
+        if cached is not None:
+            return cached
 
-        if entity:
-            # return the model representation of the user.
-            return entity.to_model()
+        # Get the user's row and version from the database, possibly from a replica, without building an entity.
+        query = select(*UserEntity.read_columns(), UserEntity.version).where(UserEntity.__table__.c.key == key)
+        with replica_reads(self._session, key):
+            row = self._session.execute(query).one_or_none()
+
+        if row:
+            # Cache and return the model representation of the user.
+            user = UserEntity.model_from_row(row)
+            user_cache.put(user, row.version)
+            return user, row.version
         else:
             raise UserNotFoundException()
-        
 
-    def update_user(self, key:str, user: User) -> User:
+    def update_user(self, key:str, user: User) -> UserProfile:
         """
         Updates a user in the database.
 
         Args:
             key: The key of the user to update.
-            user: The updated user.
+            user: The updated user. An empty password keeps the current password.
+
+        Returns:
+            UserProfile: The updated user, without their password.
 
         Raises:
             UserNotFoundException: If the user is not found in the database.
+            DuplicateUserException: If the new email is already used for another user.
         """
 
         # Get the entity to be updated from the database.
-        query = select(UserEntity).where(UserEntity.key == key)
+        query = select(UserEntity).options(_without_password).where(UserEntity.key == key)
         entity: UserEntity | None = self._session.scalar(query)
 
         if entity:
-            # Update the user and commit the changes to the database.
+            # Update the user, hashing a new password, and commit the changes to the database.
             entity.update(user=user)
-            self._session.commit()
+            if user.password != "":
+                entity.password = password_hasher.hash(user.password)
+            # Bumped in SQL, so a concurrent plant write's bump is not lost.
+            entity.version = UserEntity.version + 1
+            try:
+                self._session.commit()
+            except IntegrityError:
+                # The new email belongs to another user.
+                self._session.rollback()
+                raise DuplicateUserException(entity=user)
+            recent_writers.mark(key)
+            user_cache.invalidate(key)
 
             return entity.to_model()
         else:
             raise UserNotFoundException()
         
-    def delete_user(self, key: str) -> User:
+    def delete_user(self, key: str) -> UserProfile:
         """
         Deletes a user from the database.
         
@@ -162,21 +232,256 @@ class UserService:
             key: the key for the user to be deleted.
             
         Returns:
-            User: The deleted user.
+            UserProfile: The deleted user, without their password.
             
         Raises: 
             UserNotFoundException: If the user is not found in the database.
         """
 
         # Get the entity to be deleted from the database.
-        query = select(UserEntity).where(UserEntity.key == key)
+        query = select(UserEntity).options(_without_password).where(UserEntity.key == key)
         entity: UserEntity | None = self._session.scalar(query)
 
         if entity:
             # Delete the user from the database.
             self._session.delete(entity)
             self._session.commit()
+            recent_writers.mark(key)
+            user_cache.invalidate(key)
+            token_issuer.revoke(key)
 
             return entity.to_model()
         else:
-            raise UserNotFoundException()
\ No newline at end of file
+            raise UserNotFoundException()
+
+class AsyncUserService:
+    """Async user service to perform actions on the user table without blocking the event loop."""
+
+    def __init__(self,
+                 session: AsyncSession = Depends(async_db_session)
+    ):
+        self._session = session
+
+    async def create_user(self, user: User) -> SignedInUser:
+        """
+        Creates a new user in the database
+        
+        Args:
+            first name: The users first name.
+            last name: The users last name.
+            email: The users email.
+
+        Returns:
+            SignedInUser: the newly created user, with its key and the tokens it authenticates with.
+
+        Raises:
+            InvalidCredentialsException: If the input is improperly formatted or empty.
+            DuplicateUserException: If the user is already in the database.
+        """
+        strip_first = user.first_name.replace(" ", "")
+        strip_last = user.last_name.replace(" ", "")
+        strip_email = user.email.replace(" ", "")
+        strip_password = user.password.replace(" ", "")
+
+        if strip_password != user.password:
+            raise InvalidCredentialsUserException(msg="Spaces not allowed in password")
+        elif strip_first != user.first_name or strip_last != user.last_name or strip_email != user.email:
+            raise InvalidCredentialsUserException()
+        elif user.first_name == "" or user.last_name == "" or user.email == "" or user.password == "":
+            raise InvalidCredentialsUserException("All fields must be filled out.")
+        
+        query = select(UserEntity).options(_without_password).where(UserEntity.email == user.email)
+        entity: UserEntity | None = await self._session.scalar(query)
+        
+        # Check for duplicate user
+        if entity:
+            raise DuplicateUserException(entity=entity)
+        
+        # Create the date string
+        date = datetime.now(timezone.utc)
+        date_string = date.strftime("%Y-%m-%d %H:%M:%S")
+
+        # Create the key for the user
+        hash_input: str = strip_first + strip_last + strip_email + date_string.replace(" ", "")
+        encoded_string = hash_input.encode()
+        key = hashlib.sha256(encoded_string).hexdigest()
+
+        # Create the user model
+        user = User(first_name=user.first_name,
+                    last_name=user.last_name,
+                    email= user.email,
+                    password= await password_hasher.hash_async(user.password),
+                    created_at=date_string,
+                    key=key,
+                    )
+        
+        # Create the entity and add it to the database
+        user_entity = UserEntity.from_model(user=user)
+        self._session.add(user_entity)
+        try:
+            await self._session.commit()
+        except IntegrityError:
+            # The email was taken since it was checked above, e.g. by a concurrent sign up.
+            await self._session.rollback()
+            raise DuplicateUserException(entity=user)
+        recent_writers.mark(user_entity.key)
+
+        return SignedInUser(**user_entity.to_model().model_dump(), tokens=token_issuer.issue(user_entity.key))
+    
+    async def sign_in(self, email: str, password: str) -> SignedInUser:
+        """
+        Signs in a user with a given email and password.
+        
+        Args: 
+            email: The email of the user to be signed in.
+            password: The password of the user to be signed in.
+            
+        Returns:
+            SignedInUser: The signed in user, with its key and the tokens it authenticates with.
+            
+        Raises: 
+            UserNotFoundException: if the user is not found in the database."""
+        
+        # Retreive the user from the database and check the password in the hashing pool.
+        query = select(UserEntity).where(UserEntity.email == email)
+        entity: UserEntity | None = await self._session.scalar(query)
+
+        if entity and await password_hasher.verify_async(password, entity.password):
+            # Upgrade plaintext passwords and hashes of an older cost now that the password is known.
+            if password_hasher.needs_rehash(entity.password):
+                entity.password = await password_hasher.hash_async(password)
+                entity.version = UserEntity.version + 1
+                await self._session.commit()
+                recent_writers.mark(entity.key)
+                user_cache.invalidate(entity.key)
+            return SignedInUser(**entity.to_model().model_dump(), tokens=token_issuer.issue(entity.key))
+        else:
+            raise UserNotFoundException()
+    
+    async def refresh_tokens(self, refresh_token: str) -> TokenPair:
+        """
+        Exchanges a refresh token for a new pair of tokens.
+
+        Access tokens are trusted without a lookup until they expire, so this is where a
+        signed in user is checked against the database again.
+
+        Args:
+            refresh_token: The refresh token of an earlier sign in or refresh.
+
+        Returns:
+            TokenPair: The new tokens.
+
+        Raises:
+            InvalidTokenException: If the refresh token is invalid, expired or revoked.
+            UserNotFoundException: If the user it was issued to is no longer in the database.
+        """
+
+        key = token_issuer.verify(refresh_token, token_type="refresh")
+        if await self._session.scalar(select(UserEntity.key).where(UserEntity.key == key)) is None:
+            raise UserNotFoundException()
+        return token_issuer.issue(key)
+
+    async def get_user(self, key: str) -> tuple[UserProfile, int]:
+        """
+        Retrieves a user from the database, and the version of the user it was read at.
+
+        The version is read in the same row as the user and cached with it, so a user
+        served from the cache is tagged with the version it reflects.
+
+        Args:
+            key: the key of the user to be retrieved
+
+        Returns:
+            tuple[UserProfile, int]: a user in the database, without their password, and their version
+
+        Raises:
+            UserNotFoundException: If the user is not in the database
+        """
+        
+        # Serve the user from the cache when possible.
+        cached = user_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Get the user's row and version from the database, possibly from a replica, without building an entity.
+        query = select(*UserEntity.read_columns(), UserEntity.version).where(UserEntity.__table__.c.key == key)
+        with replica_reads(self._session, key):
+            row = (await self._session.execute(query)).one_or_none()
+
+        if row:
+            # Cache and return the model representation of the user.
+            user = UserEntity.model_from_row(row)
+            user_cache.put(user, row.version)
+            return user, row.version
+        else:
+            raise UserNotFoundException()
+
+    async def update_user(self, key:str, user: User) -> UserProfile:
+        """
+        Updates a user in the database.
+
+        Args:
+            key: The key of the user to update.
+            user: The updated user. An empty password keeps the current password.
+
+        Returns:
+            UserProfile: The updated user, without their password.
+
+        Raises:
+            UserNotFoundException: If the user is not found in the database.
+            DuplicateUserException: If the new email is already used for another user.
+        """
+
+        # Get the entity to be updated from the database.
+        query = select(UserEntity).options(_without_password).where(UserEntity.key == key)
+        entity: UserEntity | None = await self._session.scalar(query)
+
+        if entity:
+            # Update the user, hashing a new password, and commit the changes to the database.
+            entity.update(user=user)
+            if user.password != "":
+                entity.password = await password_hasher.hash_async(user.password)
+            # Bumped in SQL, so a concurrent plant write's bump is not lost.
+            entity.version = UserEntity.version + 1
+            try:
+                await self._session.commit()
+            except IntegrityError:
+                # The new email belongs to another user.
+                await self._session.rollback()
+                raise DuplicateUserException(entity=user)
+            recent_writers.mark(key)
+            user_cache.invalidate(key)
+
+            return entity.to_model()
+        else:
+            raise UserNotFoundException()
+        
+    async def delete_user(self, key: str) -> UserProfile:
+        """
+        Deletes a user from the database.
+        
+        Args: 
+            key: the key for the user to be deleted.
+            
+        Returns:
+            UserProfile: The deleted user, without their password.
+            
+        Raises: 
+            UserNotFoundException: If the user is not found in the database.
+        """
+
+        # Get the entity to be deleted from the database.
+        query = select(UserEntity).options(_without_password).where(UserEntity.key == key)
+        entity: UserEntity | None = await self._session.scalar(query)
+
+        if entity:
+            # Delete the user from the database.
+            await self._session.delete(entity)
+            await self._session.commit()
+            recent_writers.mark(key)
+            user_cache.invalidate(key)
+            token_issuer.revoke(key)
+
+            return entity.to_model()
+        else:
+            raise UserNotFoundException()
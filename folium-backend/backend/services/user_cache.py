@@ -0,0 +1,118 @@
+"""In-process cache resolving user keys to users and their versions, shared by the user and plant services."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from ..env import getenv
+from ..models.cache import CacheStatus
+from ..models.user import UserProfile
+
+
+class UserCache:
+    """Size-bounded LRU cache with a TTL mapping user keys to user models and their versions.
+
+    The cache is per process: `invalidate` is called by the user service whenever a user
+    is updated or deleted, and the TTL bounds how long other workers can serve a stale user.
+    A user is cached with the version read in the same row, so a stale user is still sent
+    under the ETag of the version it was read at.
+    """
+
+    def __init__(self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, UserProfile, int]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get(self, key: str) -> tuple[UserProfile, int] | None:
+        """
+        Look up a user by key.
+
+        Args:
+            key: The key of the user.
+
+        Returns:
+            tuple[UserProfile, int] | None: A copy of the cached user and the version it was read at,
+                or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, user, version = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return user.model_copy(), version
+
+    def put(self, user: UserProfile, version: int) -> None:
+        """
+        Cache a user under its key, evicting the least recently used user when full.
+
+        Args:
+            user: The user to cache.
+            version: The version of the user, read in the same row as the user.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user.key] = (self._clock() + self.ttl, user.model_copy(), version)
+            self._entries.move_to_end(user.key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        """
+        Drop a user from the cache after it was updated or deleted.
+
+        Args:
+            key: The key of the user.
+        """
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every cached user."""
+        with self._lock:
+            self._entries.clear()
+
+    def status(self) -> CacheStatus:
+        """
+        Read the cache's size and counters.
+
+        Returns:
+            CacheStatus: The point-in-time status of the cache.
+        """
+        with self._lock:
+            return CacheStatus(
+                name="user",
+                size=len(self._entries),
+                max_size=self.max_size,
+                ttl_seconds=self.ttl,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations,
+            )
+
+
+user_cache = UserCache(max_size=int(getenv("USER_CACHE_SIZE", "10000")),
+                       ttl=float(getenv("USER_CACHE_TTL_SECONDS", "30")))
+"""Application-level cache of users by key."""
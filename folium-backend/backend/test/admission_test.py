@@ -0,0 +1,127 @@
+"""Tests for the rate limits and load shedding in front of the API"""
+
+import asyncio
+
+import pytest
+
+from ..admission import AdmissionMiddleware, TokenBuckets, parse_route_limits
+from ..services.tokens import token_issuer
+
+class FakeClock:
+    """Clock whose time only moves when the test advances it."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+def test_bucket_burst_and_refill(clock: FakeClock):
+    """Tests that a client may burst, is then limited to the rate, and is told when to retry."""
+    buckets = TokenBuckets(rate=2, burst=3, clock=clock)
+    assert [buckets.take("a") for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("a") == pytest.approx(0.5)
+    assert buckets.take("b") == 0
+    clock.now += 0.5
+    assert buckets.take("a") == 0
+    assert buckets.take("a") > 0
+
+def test_full_buckets_expire(clock: FakeClock):
+    """Tests that only clients active within a full refill are kept."""
+    buckets = TokenBuckets(rate=1, burst=2, clock=clock)
+    for key in ("a", "b", "c"):
+        buckets.take(key)
+    assert len(buckets) == 3
+    clock.now += 1
+    buckets.take("b")
+    clock.now += 1
+    buckets.take("d")
+    assert len(buckets) == 2
+
+def test_parse_route_limits():
+    """Tests that per-route limits are read from their setting."""
+    assert parse_route_limits("/user/login=1:5, /plant/search=0.5:2") == {"/user/login": (1.0, 5.0),
+                                                                          "/plant/search": (0.5, 2.0)}
+    assert parse_route_limits("") == {}
+
+class Server:
+    """An ASGI app behind the middleware whose requests finish once `release` is set."""
+    def __init__(self, clock: FakeClock, **settings):
+        self.release = asyncio.Event()
+        self.release.set()
+        self.pool_wait = 0.0
+        self.middleware = AdmissionMiddleware(self.app,
+                                              rate=settings.get("rate", 1000),
+                                              burst=settings.get("burst", 1000),
+                                              route_limits=settings.get("route_limits", {}),
+                                              max_in_flight=settings.get("max_in_flight", 100),
+                                              max_pool_wait=0.5,
+                                              pool_wait=lambda: self.pool_wait,
+                                              clock=clock)
+
+    async def app(self, scope, receive, send):
+        await self.release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def request(self, path: str, query: str = "", token: str | None = None) -> tuple[int, dict]:
+        """Send a request through the middleware and return its status and headers."""
+        headers = [] if token is None else [(b"authorization", f"Bearer {token}".encode())]
+        scope = {"type": "http", "path": path, "query_string": query.encode(), "headers": headers,
+                 "client": ("10.0.0.1", 50000)}
+        start = {}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                start.update(status=message["status"], headers=dict(message["headers"]))
+
+        await self.middleware(scope, None, send)
+        return start["status"], start["headers"]
+
+def test_rate_limited_per_client(clock: FakeClock):
+    """Tests that each client, by token or address, has its own buckets per limited route."""
+    async def scenario():
+        server = Server(clock, rate=1, burst=1, route_limits={"/plant/search": (1, 2)})
+        assert [(await server.request("/plant/search", "key=a"))[0] for _ in range(3)] == [200, 200, 429]
+        status, headers = await server.request("/plant/search", "key=a")
+        assert (status, headers[b"retry-after"]) == (429, b"1")
+        assert (await server.request("/plant/search", token=token_issuer.issue("c").access_token))[0] == 200
+        # Routes without a limit of their own share the default one.
+        assert (await server.request("/plant/get_user_plants", "key=a"))[0] == 200
+        assert (await server.request("/plant/get_due_plants", "key=a"))[0] == 429
+        assert (await server.request("/internal/pool", "key=a"))[0] == 200
+        assert (await server.request("/internal/due_plants", "key=a"))[0] == 429
+    asyncio.run(scenario())
+
+def test_rotating_key_still_limited(clock: FakeClock):
+    """Tests that a client without a token cannot get a fresh bucket by sending a new key with each request."""
+    async def scenario():
+        server = Server(clock, route_limits={"/user/login": (1, 2)})
+        statuses = [(await server.request("/user/login", f"key={attempt}"))[0] for attempt in range(3)]
+        assert statuses == [200, 200, 429]
+        assert (await server.request("/user/login", token="not a token"))[0] == 429
+    asyncio.run(scenario())
+
+def test_sheds_load(clock: FakeClock):
+    """Tests that requests past the in-flight limit, or while connections are slow to get, are shed with a 503."""
+    async def scenario():
+        server = Server(clock, max_in_flight=2)
+        server.release.clear()
+        first = asyncio.create_task(server.request("/plant/get_user_plants"))
+        await asyncio.sleep(0)
+        server.pool_wait = 1.0
+        assert (await server.request("/plant/get_user_plants"))[0] == 503
+        server.pool_wait = 0.0
+        second = asyncio.create_task(server.request("/plant/get_user_plants"))
+        await asyncio.sleep(0)
+        status, headers = await server.request("/plant/get_user_plants")
+        assert (status, headers[b"retry-after"]) == (503, b"1")
+        server.release.set()
+        assert [(await first)[0], (await second)[0]] == [200, 200]
+        # With nothing in flight the wait is not acted on, so the next request can refresh it.
+        server.pool_wait = 1.0
+        assert (await server.request("/plant/get_user_plants"))[0] == 200
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+"""Tests for answering conditional reads from a user's version"""
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from ..api import plant
+from ..api.conditional import not_modified, tag_version, version_etag
+from ..database import db_session
+from ..services.plant import PlantService
+from .plant_test_data import insert_test_data
+
+def test_tag_version():
+    """Tests that a read is tagged with its version's ETag."""
+    response = Response()
+    tag_version(response, 3)
+    assert response.headers["ETag"] == 'W/"3"'
+
+@pytest.mark.parametrize("if_none_match", ['W/"3"', '"3"', 'W/"1", W/"3"', "*"])
+def test_not_modified_matching_etag(if_none_match: str):
+    """Tests that a client holding the current version, by weak comparison, gets a 304."""
+    unchanged = not_modified(3, if_none_match)
+    assert unchanged is not None
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == version_etag(3)
+
+@pytest.mark.parametrize("if_none_match", ['W/"2"', 'W/"30"', "", None])
+def test_not_modified_stale_etag(if_none_match: str | None):
+    """Tests that a client holding another version, or none, gets the read."""
+    assert not_modified(3, if_none_match) is None
+
+@pytest.fixture()
+def client(session: Session) -> TestClient:
+    """This PyTest fixture serves the plant routes over the test data in the test session."""
+    insert_test_data(session)
+    session.commit()
+    app = FastAPI()
+    app.include_router(plant.api)
+    app.dependency_overrides[db_session] = lambda: session
+    return TestClient(app)
+
+@pytest.mark.parametrize("path, params", [("/plant/get_user_plants", {}),
+                                          ("/plant/get_user_plants_page", {}),
+                                          ("/plant/search", {"q": "test1"}),
+                                          ("/plant/health_analytics", {})])
+def test_read_tagged_from_its_own_statement(path: str, params: dict, client: TestClient, session: Session,
+                                            statements: list[str]):
+    """Tests that a read without If-None-Match is one statement, tagged with the version it read."""
+    version = PlantService(session=session).get_version("user1")
+    statements.clear()
+    response = client.get(path, params={"key": "user1", **params})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == version_etag(version)
+    assert len(statements) == 1
+
+def test_conditional_read(client: TestClient, session: Session, statements: list[str]):
+    """Tests that a conditional read is answered from the version alone until the plants change."""
+    etag = client.get("/plant/get_user_plants", params={"key": "user1"}).headers["ETag"]
+    statements.clear()
+    unchanged = client.get("/plant/get_user_plants", params={"key": "user1"}, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert len(statements) == 1
+
+    client.put("/plant/update_plant", json={"id": 1, "owner_key": "user1", "common_name": "fern"})
+    changed = client.get("/plant/get_user_plants", params={"key": "user1"}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.headers["ETag"] == version_etag(PlantService(session=session).get_version("user1"))
@@ -1,25 +1,36 @@
 """Shared pytest fixtures for database dependent tests."""
 
+import asyncio
+import os
 import pytest
 
-from sqlalchemy import create_engine, text, Engine
+# Secrets the app requires, fixed for the tests; they must be set before the app is imported.
+os.environ.setdefault("JWT_SECRET", "test-jwt-secret")
+os.environ.setdefault("INTERNAL_API_TOKEN", "test-internal-token")
+
+from sqlalchemy import create_engine, event, text, Engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.exc import OperationalError, ProgrammingError
 
 from ..database import _engine_str
 from ..env import getenv
 from ..entities.entity_base import EntityBase
+from ..services.user_cache import user_cache
+from ..services.tokens import token_issuer
 
 POSTGRES_DATABASE = f'{getenv("POSTGRES_DATABASE")}_test'
+POSTGRES_REPLICA_DATABASE = f'{POSTGRES_DATABASE}_replica'
 POSTGRES_USER = getenv("POSTGRES_USER")
 
-def reset_database():
+def reset_database(database: str = POSTGRES_DATABASE):
     engine = create_engine(_engine_str(""))
     with engine.connect() as connection:
         try:
             conn = connection.execution_options(autocommit=False)
             conn.execute(text("ROLLBACK"))  # Get out of transactional mode...
-            conn.execute(text(f"DROP DATABASE {POSTGRES_DATABASE}"))
+            conn.execute(text(f"DROP DATABASE {database}"))
         except ProgrammingError:
             ...
         except OperationalError:
@@ -28,10 +39,10 @@ def reset_database():
             )
             exit(1)
 
-        conn.execute(text(f"CREATE DATABASE {POSTGRES_DATABASE}"))
+        conn.execute(text(f"CREATE DATABASE {database}"))
         conn.execute(
             text(
-                f"GRANT ALL PRIVILEGES ON DATABASE {POSTGRES_DATABASE} TO {POSTGRES_USER}"
+                f"GRANT ALL PRIVILEGES ON DATABASE {database} TO {POSTGRES_USER}"
             )
         )
 
@@ -42,12 +53,62 @@ def test_engine() -> Engine:
     return create_engine(_engine_str(POSTGRES_DATABASE))
 
 
+@pytest.fixture(scope="session")
+def replica_engine() -> Engine:
+    # A second, separately reset database standing in for a read replica.
+    reset_database(POSTGRES_REPLICA_DATABASE)
+    return create_engine(_engine_str(POSTGRES_REPLICA_DATABASE))
+
+
 @pytest.fixture(scope="function")
 def session(test_engine: Engine):
     EntityBase.metadata.drop_all(test_engine)
     EntityBase.metadata.create_all(test_engine)
+    # Users cached by an earlier test no longer exist in the reset tables.
+    user_cache.clear()
+    # Keys of users deleted by an earlier test may be issued again.
+    token_issuer.clear()
     session = Session(test_engine)
     try:
         yield session
     finally:
         session.close()
+
+
+@pytest.fixture(scope="function")
+def async_loop():
+    loop = asyncio.new_event_loop()
+    try:
+        yield loop
+    finally:
+        loop.close()
+
+
+@pytest.fixture(scope="function")
+def async_session(session: Session, async_loop: asyncio.AbstractEventLoop):
+    # asyncpg connections are bound to the loop that opened them, so every test gets
+    # its own unpooled engine on its own loop. Depending on `session` resets the tables first.
+    engine = create_async_engine(
+        _engine_str(POSTGRES_DATABASE, dialect="postgresql+asyncpg"), poolclass=NullPool
+    )
+    async_session = AsyncSession(engine, expire_on_commit=False)
+    try:
+        yield async_session
+    finally:
+        async_loop.run_until_complete(async_session.close())
+        async_loop.run_until_complete(engine.dispose())
+
+
+@pytest.fixture(scope="function")
+def statements(test_engine: Engine):
+    """Records the SQL of every statement executed on the test engine while the test runs."""
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", record)
+    try:
+        yield executed
+    finally:
+        event.remove(test_engine, "before_cursor_execute", record)
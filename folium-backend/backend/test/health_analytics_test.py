@@ -0,0 +1,45 @@
+"""Tests for the vectorized health analytics"""
+
+import numpy as np
+import pytest
+
+from ..services.health_analytics import analyze_health
+
+def reference(history: list[int], window: int) -> tuple[float, float, float]:
+    """Per-plant statistics computed the slow way, to check the vectorized ones against."""
+    scores = np.array(history[-window:], dtype=float)
+    slope = np.polyfit(np.arange(len(scores)), scores, 1)[0]
+    return scores.mean(), slope, scores.std()
+
+def test_analyze_health_matches_reference():
+    """Tests that histories of different lengths are aligned on their latest scores."""
+    histories = [[5, 6, 7, 8, 9], [9, 8, 7, 6, 5, 4, 3, 2], [4, 4, 4]]
+    garden = analyze_health([1, 2, 3], histories, window=4)
+    for plant, history in zip(garden.plants, histories):
+        average, slope, volatility = reference(history, 4)
+        assert plant.rolling_average == pytest.approx(average)
+        assert plant.trend_slope == pytest.approx(slope)
+        assert plant.volatility == pytest.approx(volatility)
+        assert plant.latest == history[-1]
+        assert plant.entries == len(history)
+
+def test_analyze_health_declining():
+    """Tests that only plants whose scores fall steeply enough are flagged as declining."""
+    garden = analyze_health([1, 2, 3], [[9, 7, 5], [5, 5, 5, 5, 4], [1, 3, 5]], window=7)
+    assert [plant.declining for plant in garden.plants] == [True, False, False]
+    assert garden.declining == 1
+
+def test_analyze_health_short_histories():
+    """Tests that plants with too few scores get no trend and are not flagged."""
+    garden = analyze_health([1, 2], [[], [3, 1]], window=7)
+    empty, short = garden.plants
+    assert (empty.latest, empty.rolling_average, empty.trend_slope, empty.volatility) == (None, None, None, None)
+    assert short.rolling_average == 2
+    assert short.trend_slope is None
+    assert not short.declining
+
+def test_analyze_health_no_plants():
+    """Tests that a garden without plants has no statistics."""
+    garden = analyze_health([], [], window=7)
+    assert garden.plants == []
+    assert garden.declining == 0
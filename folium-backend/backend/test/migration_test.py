@@ -0,0 +1,152 @@
+"""Tests for the Alembic migrations"""
+
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from ..database import _engine_str
+from ..entities.entity_base import EntityBase
+from ..entities import user_entity, plant_entity  # noqa: F401 - registers the tables on the metadata.
+from .conftest import POSTGRES_DATABASE, reset_database
+
+POSTGRES_MIGRATION_DATABASE = f"{POSTGRES_DATABASE}_migrations"
+
+@pytest.fixture()
+def alembic_config() -> Config:
+    """This PyTest fixture points Alembic at a freshly created, empty database."""
+    reset_database(POSTGRES_MIGRATION_DATABASE)
+    config = Config(Path(__file__).parents[2] / "alembic.ini")
+    config.set_main_option("sqlalchemy.url", _engine_str(POSTGRES_MIGRATION_DATABASE))
+    return config
+
+# Postgres normalizes generated column expressions, so Alembic cannot compare them.
+@pytest.mark.filterwarnings("ignore:Computed default")
+def test_migrations_match_entities(alembic_config: Config):
+    """Tests that upgrading to head produces exactly the schema the entities describe."""
+    command.upgrade(alembic_config, "head")
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), EntityBase.metadata) == []
+    engine.dispose()
+
+def test_migrations_downgrade(alembic_config: Config):
+    """Tests that every migration can be rolled back."""
+    command.upgrade(alembic_config, "head")
+    command.downgrade(alembic_config, "base")
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+    engine.dispose()
+
+def test_next_watering_at_backfill(alembic_config: Config):
+    """Tests that existing plants get their next watering time when the column is added."""
+    command.upgrade(alembic_config, "0003")
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    with engine.begin() as connection:
+        connection.execute(text(
+            """
+            INSERT INTO plant (common_name, scientific_name, type, cycle, watering, watering_period,
+                               watering_benchmark_value, watering_benchmark_unit, sunlight, pet_poison,
+                               human_poison, description, image_url, owner_key, last_watering, health_history)
+            VALUES ('', '', '', '', '', '', '7-10', 'days', '', false, false, '', '', 'user1', '2024-01-01', '{}'),
+                   ('', '', '', '', '', '', 'fake', 'fake', '', false, false, '', '', 'user1', 'fake', '{}')
+            """
+        ))
+    command.upgrade(alembic_config, "0004")
+    with engine.connect() as connection:
+        due = connection.execute(text("SELECT to_char(next_watering_at AT TIME ZONE 'UTC', 'YYYY-MM-DD') FROM plant ORDER BY id")).scalars().all()
+    assert due == ["2024-01-08", None]
+    engine.dispose()
+
+def test_typed_columns_backfill_is_lossless(alembic_config: Config):
+    """Tests that typing the timestamp and numeric columns keeps every original string, both ways."""
+    command.upgrade(alembic_config, "0004")
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    original = [("7", "2024-01-01 10:00:00"), ("7-10", "2024-01-01"), ("fake", "fake"), ("", "")]
+    with engine.begin() as connection:
+        for value, last_watering in original:
+            connection.execute(text(
+                """
+                INSERT INTO plant (common_name, scientific_name, type, cycle, watering, watering_period,
+                                   watering_benchmark_value, watering_benchmark_unit, sunlight, pet_poison,
+                                   human_poison, description, image_url, owner_key, last_watering, health_history)
+                VALUES ('', '', '', '', '', '', :value, 'days', '', false, false, '', '', 'user1', :last_watering, '{}')
+                """
+            ), {"value": value, "last_watering": last_watering})
+
+    command.upgrade(alembic_config, "0005")
+    with engine.connect() as connection:
+        typed = connection.execute(text(
+            "SELECT watering_benchmark_value::text, watering_benchmark_value_text, last_watering_text FROM plant ORDER BY id"
+        )).all()
+    assert [tuple(row) for row in typed] == [("7", None, None), ("7", "7-10", "2024-01-01"),
+                                             (None, "fake", "fake"), (None, None, None)]
+
+    command.downgrade(alembic_config, "0004")
+    with engine.connect() as connection:
+        restored = connection.execute(text("SELECT watering_benchmark_value, last_watering FROM plant ORDER BY id")).all()
+    assert [tuple(row) for row in restored] == original
+    engine.dispose()
+
+def test_species_catalog_backfill_is_lossless(alembic_config: Config):
+    """Tests that moving the species fields into the catalog shares species between plants and keeps every field, both ways."""
+    command.upgrade(alembic_config, "0007")
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    original = [("Monstera deliciosa", "Perennial"), ("Monstera deliciosa", "Perennial"), ("Ficus lyrata", "Annual")]
+    with engine.begin() as connection:
+        for scientific_name, cycle in original:
+            connection.execute(text(
+                """
+                INSERT INTO plant (common_name, scientific_name, type, cycle, watering, watering_period,
+                                   watering_benchmark_value, watering_benchmark_unit, sunlight, pet_poison,
+                                   human_poison, description, image_url, owner_key, health_history)
+                VALUES ('', :scientific_name, 'tree', :cycle, 'Average', '', 7, 'days', 'full sun', false, false,
+                        'Leafy', 'url', 'user1', '{}')
+                """
+            ), {"scientific_name": scientific_name, "cycle": cycle})
+
+    command.upgrade(alembic_config, "0008")
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM species")).scalar() == 2
+        joined = connection.execute(text(
+            "SELECT species.scientific_name, species.cycle FROM plant JOIN species ON species.id = plant.species_id ORDER BY plant.id"
+        )).all()
+    assert [tuple(row) for row in joined] == original
+
+    command.downgrade(alembic_config, "0007")
+    with engine.connect() as connection:
+        restored = connection.execute(text("SELECT scientific_name, cycle FROM plant ORDER BY id")).all()
+    assert [tuple(row) for row in restored] == original
+    engine.dispose()
+
+def test_watering_interval_backfill(alembic_config: Config):
+    """Tests that existing plants get the watering interval parsed from their watering benchmark."""
+    command.upgrade(alembic_config, "0009")
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    with engine.begin() as connection:
+        connection.execute(text(
+            """
+            INSERT INTO species (id, scientific_name, type, cycle, watering, sunlight, description, image_url)
+            VALUES ('6f1c2b2e-4f55-4d2a-9a39-3c1b1f0e7d52', '', '', '', '', '', '', '')
+            """
+        ))
+        connection.execute(text(
+            """
+            INSERT INTO plant (common_name, species_id, watering_period, watering_benchmark_value,
+                               watering_benchmark_value_text, watering_benchmark_unit, pet_poison, human_poison,
+                               owner_key, health_history)
+            VALUES ('', '6f1c2b2e-4f55-4d2a-9a39-3c1b1f0e7d52', '', 7, '7-10', 'days', false, false, 'user1', '{}'),
+                   ('', '6f1c2b2e-4f55-4d2a-9a39-3c1b1f0e7d52', '', 2, NULL, 'Weeks', false, false, 'user1', '{}'),
+                   ('', '6f1c2b2e-4f55-4d2a-9a39-3c1b1f0e7d52', '', NULL, 'fake', 'fake', false, false, 'user1', '{}')
+            """
+        ))
+
+    command.upgrade(alembic_config, "0010")
+    with engine.connect() as connection:
+        intervals = connection.execute(text("SELECT watering_interval::text FROM plant ORDER BY id")).scalars().all()
+    assert intervals == ["7 days", "14 days", None]
+    engine.dispose()
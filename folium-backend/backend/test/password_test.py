@@ -0,0 +1,55 @@
+"""Tests for password hashing and the process pool it runs in"""
+
+import asyncio
+
+import pytest
+
+from ..services.passwords import PasswordHasher, hash_password, verify_password, needs_rehash
+from ..services.exceptions import PasswordHasherBusyException
+
+# A low cost keeps the tests fast; the parameters are recorded in each hash.
+COST = 10
+
+def test_hash_and_verify():
+    """Tests that a hash verifies its password only, and is salted."""
+    stored = hash_password("password", COST)
+    assert stored.startswith(f"scrypt${COST}$")
+    assert verify_password("password", stored)
+    assert not verify_password("Password", stored)
+    assert hash_password("password", COST) != stored
+
+def test_verify_plaintext():
+    """Tests that passwords stored before hashing are still compared."""
+    assert verify_password("password", "password")
+    assert not verify_password("guess", "password")
+
+def test_needs_rehash():
+    """Tests that plaintext passwords and hashes of another cost are upgraded."""
+    assert needs_rehash("password", COST)
+    assert needs_rehash(hash_password("password", COST), COST + 1)
+    assert not needs_rehash(hash_password("password", COST), COST)
+
+@pytest.fixture()
+def hasher():
+    """This PyTest fixture constructs a hasher with one worker and room for one pending hash."""
+    hasher = PasswordHasher(cost=COST, workers=1, max_pending=1)
+    try:
+        yield hasher
+    finally:
+        hasher.shutdown()
+
+def test_hasher_pool(hasher: PasswordHasher):
+    """Tests that hashing and verification run in the pool, from threads and from the event loop."""
+    stored = hasher.hash("password")
+    assert hasher.verify("password", stored)
+    assert asyncio.run(hasher.verify_async("password", asyncio.run(hasher.hash_async("password"))))
+    assert hasher._pending == 0
+
+def test_hasher_sheds_load(hasher: PasswordHasher):
+    """Tests that hashes past the pending limit are refused instead of queued."""
+    # Stand in for a hash in progress by filling the only pending slot.
+    hasher._pending = hasher.max_pending
+    with pytest.raises(PasswordHasherBusyException):
+        hasher.hash("password")
+    hasher._pending = 0
+    assert hasher.verify("password", "password")
@@ -0,0 +1,153 @@
+"""Tests that each plant service operation is served by a single SQL statement"""
+
+import pytest
+from sqlalchemy import Engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from .plant_test_data import insert_test_data
+from ..services.plant import PlantService
+from ..services.exceptions import UserNotFoundException, PlantNotFoundException
+from ..models.plant import Plant, PlantFilter
+
+@pytest.fixture()
+def plant_service(session: Session, statements: list[str]):
+    """This PyTest fixture constructs a PlantService over the test data and then
+    clears the statements recorded while setting it up."""
+    insert_test_data(session)
+    session.commit()
+    statements.clear()
+    return PlantService(session=session)
+
+def test_get_all_user_plants_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that reading a user's plants checks the owner in the same statement."""
+    plant_service.get_all_user_plants("user1")
+    assert len(statements) == 1
+
+def test_get_all_user_plants_no_plants_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that a user without plants gets an empty list from a single statement."""
+    plant_service.create_plant(Plant(owner_key="user1"))
+    plant_service.remove_plant(Plant(id=1, owner_key="user1"))
+    plant_service.remove_plant(Plant(id=3, owner_key="user1"))
+    statements.clear()
+    assert plant_service.get_all_user_plants("user1")[0] == []
+    assert len(statements) == 1
+
+def test_get_user_plants_page_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that reading a page of a user's plants checks the owner in the same statement."""
+    plant_service.get_user_plants_page("user1", limit=10)
+    assert len(statements) == 1
+
+def test_get_all_user_plants_fields_statement(plant_service: PlantService, statements: list[str]):
+    """Tests that a sparse fieldset restricts the columns selected."""
+    plant_service.get_all_user_plants("user1", fields="common_name")
+    assert len(statements) == 1
+    assert "plant.common_name" in statements[0]
+    assert "plant.description" not in statements[0]
+
+def test_get_all_user_plants_filters_statement(plant_service: PlantService, statements: list[str]):
+    """Tests that filters are applied in SQL rather than to the fetched plants."""
+    plant_service.get_all_user_plants("user1", filters=PlantFilter(pet_poison=True))
+    assert len(statements) == 1
+    assert "plant.pet_poison" in statements[0]
+
+def test_create_plant_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that creating a plant checks the owner in the insert itself."""
+    plant_service.create_plant(Plant(common_name="new", owner_key="user1"))
+    assert len(statements) == 1
+
+def test_update_plant_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that updating a plant checks ownership in the update itself."""
+    plant_service.update_Plant(Plant(id=1, common_name="new", owner_key="user1"))
+    assert len(statements) == 1
+
+def test_patch_plant_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that watering a plant writes only its watering columns, with one statement."""
+    plant_service.patch_plant("user1", 1, Plant(last_watering="2024-01-01 00:00:00"))
+    assert len(statements) == 1
+    assert "last_watering" in statements[0]
+    assert "health_history=" not in statements[0].replace(" ", "")
+
+def test_patch_plant_species_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that a species patch locks the plant while reading the species fields it keeps, then updates it."""
+    plant_service.patch_plant("user1", 1, Plant(scientific_name="new"))
+    assert len(statements) == 2
+    assert "FOR UPDATE OF plant" in statements[0]
+
+def test_patch_plant_blocks_concurrent_write(plant_service: PlantService, test_engine: Engine):
+    """Tests that a write to the plant between a patch's read and its update has to wait for the patch."""
+    blocked = []
+
+    def write_after_read(conn, cursor, statement, parameters, context, executemany):
+        if "FOR UPDATE" not in statement:
+            return
+        with test_engine.connect() as other:
+            other.execute(text("SET lock_timeout = '100ms'"))
+            try:
+                other.execute(text("UPDATE plant SET watering_benchmark_unit = 'weeks' WHERE id = 1"))
+            except OperationalError:
+                blocked.append(True)
+
+    event.listen(test_engine, "after_cursor_execute", write_after_read)
+    try:
+        patched = plant_service.patch_plant("user1", 1, Plant(watering_benchmark_value="7"))
+    finally:
+        event.remove(test_engine, "after_cursor_execute", write_after_read)
+    assert blocked == [True]
+    assert patched.watering_benchmark_unit == "fake"
+
+def test_remove_plant_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that removing a plant checks ownership in the delete itself."""
+    plant_service.remove_plant(Plant(id=1, owner_key="user1"))
+    assert len(statements) == 1
+
+def test_update_other_user_plant_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that only the error path pays for telling a missing plant from a missing user."""
+    with pytest.raises(PlantNotFoundException):
+        plant_service.update_Plant(Plant(id=2, owner_key="user1"))
+    assert len(statements) == 2
+
+def test_get_all_user_plants_nonexistent_user_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that a missing user is detected without a second statement."""
+    with pytest.raises(UserNotFoundException):
+        plant_service.get_all_user_plants("user3")
+    assert len(statements) == 1
+
+def test_bulk_create_plants_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that a bulk create checks all owners in one query and inserts with one statement."""
+    plants = [Plant(common_name=f"bulk{number}", owner_key=f"user{number % 2 + 1}") for number in range(50)]
+    result = plant_service.bulk_create_plants(plants)
+    assert len(result.plants) == 50
+    assert len(statements) == 2
+
+def test_bulk_update_plants_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that a bulk update writes every plant with one set-based statement."""
+    created = plant_service.bulk_create_plants([Plant(owner_key="user1") for _ in range(20)])
+    statements.clear()
+    result = plant_service.bulk_update_plants("user1", [plant.model_copy(update={"common_name": "new"}) for plant in created.plants])
+    assert len(result.plants) == 20
+    assert len(statements) == 1
+
+def test_bulk_remove_plants_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that a bulk remove deletes every plant with one set-based statement."""
+    created = plant_service.bulk_create_plants([Plant(owner_key="user1") for _ in range(20)])
+    statements.clear()
+    result = plant_service.bulk_remove_plants("user1", [plant.id for plant in created.plants])
+    assert len(result.plants) == 20
+    assert len(statements) == 1
+
+def test_record_health_score_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that recording a health score appends in SQL without sending the history."""
+    plant_service.record_health_score("user1", 1, 7)
+    assert len(statements) == 1
+    assert "array_append" in statements[0]
+
+def test_get_due_plants_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that reading a user's due plants checks the owner in the same statement."""
+    plant_service.get_due_plants("user1")
+    assert len(statements) == 1
+
+def test_search_plants_statements(plant_service: PlantService, statements: list[str]):
+    """Tests that searching a user's plants checks the owner in the same statement."""
+    plant_service.search_plants("user1", "test", limit=10)
+    assert len(statements) == 1
@@ -1,30 +1,45 @@
 """Unit tests for the plant service"""
 
+from datetime import datetime, timezone
+
 import pytest
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from .plant_test_data import insert_test_data
 
 from ..services.exceptions import (UserNotFoundException,
                                    PlantNotFoundException,
                                    UserBlankKeyException,
-                                   PlantBlankIdException,)
-
-from ..services.plant import PlantService
-from ..models.plant import Plant
-
-@pytest.fixture(autouse=True, scope="function")
-def plant_service(session: Session):
+                                   PlantBlankIdException,
+                                   InvalidCursorException,
+                                   InvalidFieldsException,
+                                   EmptyPatchException,
+                                   BulkLimitException,)
+
+from ..services import plant as plant_module
+from ..services.plant import PlantService, AsyncPlantService, _BULK_LIMIT
+from ..models.plant import Plant, PlantFilter
+from ..entities.species_entity import SpeciesEntity
+from .sync_adapter import SyncAdapter
+
+@pytest.fixture(autouse=True, scope="function", params=["sync", "async"])
+def plant_service(request: pytest.FixtureRequest, session: Session):
     """This PyTest fixture is injected into each test parameter of the same name below.
-    It constructs a new, empty PlantService object."""
+    It constructs a new, empty PlantService object, once for the sync request path
+    and once for the async request path."""
     insert_test_data(session)
     session.commit()
+    if request.param == "async":
+        async_session = request.getfixturevalue("async_session")
+        async_loop = request.getfixturevalue("async_loop")
+        return SyncAdapter(AsyncPlantService(session=async_session), async_loop)
     plant_service = PlantService(session=session)
     return plant_service
 
 def test_get_all_user_plants(plant_service: PlantService):
     """Test basic usage for get all user plants service method"""
 
-    plants = plant_service.get_all_user_plants("user1")
+    plants, _ = plant_service.get_all_user_plants("user1")
     assert len(plants) == 1
     assert plants[0].common_name == "test1"
 
@@ -32,7 +47,7 @@ def test_get_all_user_plants(plant_service: PlantService):
 def test_get_all_user_plants_correct_plants(plant_service: PlantService):
     """Test that get all user plants service method returns the correct plants"""
 
-    plants = plant_service.get_all_user_plants("user1")
+    plants, _ = plant_service.get_all_user_plants("user1")
     assert len(plants) == 1
     assert plants[0].common_name != "test2"
 
@@ -45,6 +60,128 @@ def test_get_all_user_plants_nonexistent_user(plant_service: PlantService):
     except UserNotFoundException:
         assert True
 
+def test_get_user_plants_page(plant_service: PlantService):
+    """Test that paging through a user's plants returns each plant once, in id order."""
+
+    for number in range(4):
+        plant_service.create_plant(Plant(common_name=f"page{number}", owner_key="user1"))
+
+    page, _ = plant_service.get_user_plants_page("user1", limit=2)
+    assert [plant.common_name for plant in page.plants] == ["test1", "page0"]
+    page, _ = plant_service.get_user_plants_page("user1", limit=2, cursor=page.next_cursor)
+    assert [plant.common_name for plant in page.plants] == ["page1", "page2"]
+    page, _ = plant_service.get_user_plants_page("user1", limit=2, cursor=page.next_cursor)
+    assert [plant.common_name for plant in page.plants] == ["page3"]
+    assert page.next_cursor is None
+
+def test_get_user_plants_page_exact_fit(plant_service: PlantService):
+    """Test that a page holding the last plant has no next cursor."""
+
+    page, _ = plant_service.get_user_plants_page("user1", limit=1)
+    assert len(page.plants) == 1
+    assert page.next_cursor is None
+
+def test_get_user_plants_page_nonexistent_user(plant_service: PlantService):
+    """Test that an exception is thrown when paging the plants of a nonexistent user"""
+
+    with pytest.raises(UserNotFoundException):
+        plant_service.get_user_plants_page("user3", limit=10)
+
+def test_get_user_plants_page_invalid_cursor(plant_service: PlantService):
+    """Test that an exception is thrown for a cursor that was not issued by the service"""
+
+    with pytest.raises(InvalidCursorException):
+        plant_service.get_user_plants_page("user1", limit=10, cursor="not a cursor")
+
+def test_get_all_user_plants_filters(plant_service: PlantService):
+    """Test that only the user's plants matching every filter are returned."""
+
+    plant_service.create_plant(Plant(common_name="lily", type="flower", pet_poison=True, owner_key="user1"))
+    plant_service.create_plant(Plant(common_name="rose", type="flower", owner_key="user1"))
+    plant_service.create_plant(Plant(common_name="pothos", type="vine", pet_poison=True, owner_key="user1"))
+    plant_service.create_plant(Plant(common_name="other", type="flower", pet_poison=True, owner_key="user2"))
+    plants, _ = plant_service.get_all_user_plants("user1", filters=PlantFilter(pet_poison=True))
+    assert [plant.common_name for plant in plants] == ["lily", "pothos"]
+    plants, _ = plant_service.get_all_user_plants("user1", filters=PlantFilter(type="flower", pet_poison=True))
+    assert [plant.common_name for plant in plants] == ["lily"]
+
+def test_get_all_user_plants_last_watering_range(plant_service: PlantService):
+    """Test that the last watering range is inclusive and skips plants with no known last watering."""
+
+    for day in (1, 5, 9):
+        plant_service.create_plant(Plant(common_name=f"day{day}", last_watering=f"2024-01-0{day}", owner_key="user1"))
+    filters = PlantFilter(watered_after=datetime(2024, 1, 5), watered_before=datetime(2024, 1, 9))
+    plants, _ = plant_service.get_all_user_plants("user1", filters=filters)
+    assert [plant.common_name for plant in plants] == ["day5", "day9"]
+
+def test_get_all_user_plants_filters_no_matches(plant_service: PlantService):
+    """Test that filters matching none of the user's plants return an empty list."""
+
+    assert plant_service.get_all_user_plants("user1", filters=PlantFilter(cycle="annual"))[0] == []
+
+def test_get_all_user_plants_filters_nonexistent_user(plant_service: PlantService):
+    """Test that an exception is still thrown for a nonexistent user when filtering."""
+
+    with pytest.raises(UserNotFoundException):
+        plant_service.get_all_user_plants("user3", filters=PlantFilter(pet_poison=True))
+
+def test_get_user_plants_page_filters(plant_service: PlantService):
+    """Test that paging with filters returns each matching plant once."""
+
+    for number in range(3):
+        plant_service.create_plant(Plant(common_name=f"toxic{number}", pet_poison=True, owner_key="user1"))
+    filters = PlantFilter(pet_poison=True)
+    page, _ = plant_service.get_user_plants_page("user1", limit=2, filters=filters)
+    assert [plant.common_name for plant in page.plants] == ["toxic0", "toxic1"]
+    page, _ = plant_service.get_user_plants_page("user1", limit=2, cursor=page.next_cursor, filters=filters)
+    assert [plant.common_name for plant in page.plants] == ["toxic2"]
+    assert page.next_cursor is None
+
+def test_stream_user_plants(plant_service: PlantService):
+    """Test that streaming a user's plants yields all of them in id order."""
+
+    for number in range(3):
+        plant_service.create_plant(Plant(common_name=f"stream{number}", owner_key="user1"))
+
+    plants = list(plant_service.stream_user_plants("user1"))
+    assert [plant.common_name for plant in plants] == ["test1", "stream0", "stream1", "stream2"]
+
+def test_stream_user_plants_no_plants(plant_service: PlantService):
+    """Test that streaming the plants of a user without plants yields nothing."""
+
+    plant_service.remove_plant(Plant(id=1, owner_key="user1"))
+    assert list(plant_service.stream_user_plants("user1")) == []
+
+def test_stream_user_plants_nonexistent_user(plant_service: PlantService):
+    """Test that a nonexistent user is reported before any plant is streamed."""
+
+    with pytest.raises(UserNotFoundException):
+        plant_service.stream_user_plants("user3")
+
+def test_get_all_user_plants_fields(plant_service: PlantService):
+    """Test that a sparse fieldset returns plants with only the requested fields set."""
+
+    plants, _ = plant_service.get_all_user_plants("user1", fields="common_name,last_watering")
+    assert plants[0].model_dump(exclude_unset=True) == {"id": 1, "common_name": "test1", "last_watering": "fake"}
+
+def test_get_user_plants_page_fields(plant_service: PlantService):
+    """Test that pages honor a sparse fieldset."""
+
+    page, _ = plant_service.get_user_plants_page("user1", limit=10, fields="common_name")
+    assert page.plants[0].model_dump(exclude_unset=True) == {"id": 1, "common_name": "test1"}
+
+def test_stream_user_plants_fields(plant_service: PlantService):
+    """Test that streamed plants honor a sparse fieldset."""
+
+    plants = list(plant_service.stream_user_plants("user1", fields="health_history"))
+    assert plants[0].model_dump(exclude_unset=True) == {"id": 1, "health_history": []}
+
+def test_get_all_user_plants_unknown_field(plant_service: PlantService):
+    """Test that an exception is thrown for a field plants do not have."""
+
+    with pytest.raises(InvalidFieldsException):
+        plant_service.get_all_user_plants("user1", fields="common_name,password")
+
 def test_create_plant(plant_service: PlantService):
     """Tests create plant service method basic usage."""
 
@@ -101,9 +238,9 @@ def test_remove_plant(plant_service: PlantService):
 
     plant = Plant(owner_key="user1")
     plant = plant_service.create_plant(plant=plant)
-    assert len(plant_service.get_all_user_plants("user1")) == 2
+    assert len(plant_service.get_all_user_plants("user1")[0]) == 2
     plant_service.remove_plant(plant=plant)
-    assert len(plant_service.get_all_user_plants("user1")) == 1
+    assert len(plant_service.get_all_user_plants("user1")[0]) == 1
 
 def test_remove_other_user_plant(plant_service: PlantService):
     """Tests that a user cannot remove another users plants."""
@@ -153,6 +290,25 @@ def test_update_plant(plant_service: PlantService):
     updated_plant = plant_service.update_Plant(plant=plant)
     assert updated_plant.common_name == "super fake"
 
+def test_plants_share_species(plant_service: PlantService, session: Session):
+    """Test that plants of the same species, whoever owns them, are stored with one species row."""
+
+    plant_service.create_plant(Plant(scientific_name="Monstera deliciosa", owner_key="user1"))
+    plant_service.bulk_create_plants([Plant(scientific_name="Monstera deliciosa", owner_key="user1"),
+                                      Plant(scientific_name="Monstera deliciosa", owner_key="user2")])
+    count = select(func.count()).where(SpeciesEntity.scientific_name == "Monstera deliciosa")
+    assert session.scalar(count) == 1
+
+def test_update_plant_species(plant_service: PlantService):
+    """Test that changing a plant's species fields moves only that plant to the new species."""
+
+    plant = plant_service.create_plant(Plant(scientific_name="Monstera deliciosa", owner_key="user1"))
+    plant_service.create_plant(Plant(scientific_name="Monstera deliciosa", owner_key="user1"))
+    plant.scientific_name = "Monstera adansonii"
+    assert plant_service.update_Plant(plant=plant).scientific_name == "Monstera adansonii"
+    plants, _ = plant_service.get_all_user_plants("user1", fields="scientific_name")
+    assert [plant.scientific_name for plant in plants] == ["fake", "Monstera adansonii", "Monstera deliciosa"]
+
 def test_update_plant_nonexistent_owner(plant_service: PlantService):
     """Test that an exception is raised when a plant is updated with a nonexistent owner."""
 
@@ -173,4 +329,325 @@ def test_update_plant_nonexistent_plant(plant_service: PlantService):
         plant_service.update_Plant(plant=plant)
         pytest.fail()
     except:
-        assert True
\ No newline at end of file
+        assert True
+
+def test_patch_plant(plant_service: PlantService):
+    """Test that a patch changes only the fields it sets and returns the whole plant."""
+
+    plant = plant_service.create_plant(Plant(common_name="fern", scientific_name="Nephrolepis exaltata",
+                                             health_history=[8, 9], owner_key="user1"))
+    patched = plant_service.patch_plant("user1", plant.id, Plant(common_name="boston fern", pet_poison=True))
+    assert patched == plant.model_copy(update={"common_name": "boston fern", "pet_poison": True})
+
+def test_patch_plant_last_watering(plant_service: PlantService):
+    """Test that patching the last watering recomputes the next watering time from the stored interval."""
+
+    plant = plant_service.create_plant(Plant(owner_key="user1", last_watering="2024-01-01",
+                                             watering_benchmark_value="7-10", watering_benchmark_unit="days"))
+    patched = plant_service.patch_plant("user1", plant.id, Plant(last_watering="2024-02-01 08:00:00"))
+    assert patched.last_watering == "2024-02-01 08:00:00"
+    assert patched.next_watering_at == datetime(2024, 2, 8, 8, tzinfo=timezone.utc)
+    patched = plant_service.patch_plant("user1", plant.id, Plant(last_watering="9999-12-30"))
+    assert patched.next_watering_at is None
+
+def test_patch_plant_watering_benchmark(plant_service: PlantService):
+    """Test that patching one watering benchmark field reparses the interval with the other."""
+
+    plant = plant_service.create_plant(Plant(owner_key="user1", last_watering="2024-01-01",
+                                             watering_benchmark_value="7", watering_benchmark_unit="days"))
+    patched = plant_service.patch_plant("user1", plant.id, Plant(watering_benchmark_unit="weeks"))
+    assert patched.next_watering_at == datetime(2024, 2, 19, tzinfo=timezone.utc)
+    patched = plant_service.patch_plant("user1", plant.id, Plant(watering_benchmark_value="1",
+                                                                 last_watering="2024-03-01"))
+    assert patched.next_watering_at == datetime(2024, 3, 8, tzinfo=timezone.utc)
+
+def test_patch_plant_species(plant_service: PlantService):
+    """Test that patching a species field moves the plant to the species with its other species fields kept."""
+
+    plant = plant_service.create_plant(Plant(scientific_name="Monstera deliciosa", description="Swiss cheese plant",
+                                             owner_key="user1"))
+    patched = plant_service.patch_plant("user1", plant.id, Plant(scientific_name="Monstera adansonii"))
+    assert (patched.scientific_name, patched.description) == ("Monstera adansonii", "Swiss cheese plant")
+    plants, _ = plant_service.get_all_user_plants("user1", fields="scientific_name,description")
+    assert (plants[1].scientific_name, plants[1].description) == ("Monstera adansonii", "Swiss cheese plant")
+
+def test_patch_plant_ignores_owner(plant_service: PlantService):
+    """Test that a patch cannot move a plant to another owner, and must set some other field."""
+
+    patched = plant_service.patch_plant("user1", 1, Plant(common_name="mine", owner_key="user2"))
+    assert patched.owner_key == "user1"
+    with pytest.raises(EmptyPatchException):
+        plant_service.patch_plant("user1", 1, Plant(id=2, owner_key="user2"))
+
+def test_patch_other_user_plant(plant_service: PlantService):
+    """Test that an exception is raised when patching another user's plant, whichever fields are set."""
+
+    with pytest.raises(PlantNotFoundException):
+        plant_service.patch_plant("user1", 2, Plant(common_name="mine"))
+    with pytest.raises(PlantNotFoundException):
+        plant_service.patch_plant("user1", 2, Plant(scientific_name="mine"))
+    plants, _ = plant_service.get_all_user_plants("user2")
+    assert plants[0].common_name == "test2"
+
+def test_patch_plant_nonexistent_user(plant_service: PlantService):
+    """Test that an exception is raised when patching a plant of a nonexistent user."""
+
+    with pytest.raises(UserNotFoundException):
+        plant_service.patch_plant("user3", 1, Plant(common_name="mine"))
+
+def test_bulk_create_plants(plant_service: PlantService):
+    """Test that bulk create adds every plant and returns them in request order."""
+
+    plants = [Plant(common_name=f"bulk{number}", owner_key=f"user{number % 2 + 1}") for number in range(5)]
+    result = plant_service.bulk_create_plants(plants)
+    assert result.errors == []
+    assert [plant.common_name for plant in result.plants] == [f"bulk{number}" for number in range(5)]
+    assert all(plant.id is not None for plant in result.plants)
+    assert len(plant_service.get_all_user_plants("user1")[0]) == 4
+    assert len(plant_service.get_all_user_plants("user2")[0]) == 3
+
+def test_bulk_create_plants_reports_item_errors(plant_service: PlantService):
+    """Test that plants with a blank or unknown owner are reported while the rest are added."""
+
+    plants = [Plant(common_name="ok", owner_key="user1"),
+              Plant(common_name="blank", owner_key=""),
+              Plant(common_name="unknown", owner_key="user3")]
+    result = plant_service.bulk_create_plants(plants)
+    assert [plant.common_name for plant in result.plants] == ["ok"]
+    assert [(error.index, error.detail) for error in result.errors] == [
+        (1, str(UserBlankKeyException())),
+        (2, str(UserNotFoundException())),
+    ]
+    assert len(plant_service.get_all_user_plants("user1")[0]) == 2
+
+def test_bulk_create_plants_no_valid_plants(plant_service: PlantService):
+    """Test that a bulk create where no plant has an existing owner adds nothing."""
+
+    result = plant_service.bulk_create_plants([Plant(owner_key="user3")])
+    assert result.plants == []
+    assert len(result.errors) == 1
+
+def test_bulk_create_plants_over_limit(plant_service: PlantService):
+    """Test that an exception is raised when a bulk create holds too many plants."""
+
+    with pytest.raises(BulkLimitException):
+        plant_service.bulk_create_plants([Plant(owner_key="user1")] * (_BULK_LIMIT + 1))
+
+def test_bulk_update_plants(plant_service: PlantService):
+    """Test that bulk update writes every plant of the owner and returns them in request order."""
+
+    created = plant_service.bulk_create_plants([Plant(common_name=f"bulk{number}", owner_key="user1") for number in range(3)])
+    plants = [plant.model_copy(update={"last_watering": "today", "health_history": [number]})
+              for number, plant in enumerate(reversed(created.plants))]
+    result = plant_service.bulk_update_plants("user1", plants)
+    assert result.errors == []
+    assert [plant.common_name for plant in result.plants] == ["bulk2", "bulk1", "bulk0"]
+    assert [plant.health_history for plant in result.plants] == [[0], [1], [2]]
+    assert all(plant.last_watering == "today" for plant in plant_service.get_all_user_plants("user1")[0][1:])
+
+def test_bulk_update_plants_reports_item_errors(plant_service: PlantService):
+    """Test that blank ids and plants of another owner are reported while the rest are updated."""
+
+    plants = [Plant(id=1, common_name="updated", owner_key="user1"),
+              Plant(common_name="blank"),
+              Plant(id=2, common_name="stolen", owner_key="user1")]
+    result = plant_service.bulk_update_plants("user1", plants)
+    assert [plant.common_name for plant in result.plants] == ["updated"]
+    assert [(error.index, error.detail) for error in result.errors] == [
+        (1, str(PlantBlankIdException())),
+        (2, str(PlantNotFoundException())),
+    ]
+    plants, _ = plant_service.get_all_user_plants("user2")
+    assert plants[0].common_name == "test2"
+
+def test_bulk_update_plants_nonexistent_user(plant_service: PlantService):
+    """Test that an exception is raised when bulk updating the plants of a nonexistent user."""
+
+    with pytest.raises(UserNotFoundException):
+        plant_service.bulk_update_plants("user3", [Plant(id=1)])
+
+def test_bulk_remove_plants(plant_service: PlantService):
+    """Test that bulk remove deletes the owner's plants and reports ids it did not delete."""
+
+    created = plant_service.bulk_create_plants([Plant(common_name=f"bulk{number}", owner_key="user1") for number in range(2)])
+    ids = [plant.id for plant in created.plants] + [2, 999]
+    result = plant_service.bulk_remove_plants("user1", ids)
+    assert [plant.common_name for plant in result.plants] == ["bulk0", "bulk1"]
+    assert [error.index for error in result.errors] == [2, 3]
+    assert [plant.common_name for plant in plant_service.get_all_user_plants("user1")[0]] == ["test1"]
+    assert len(plant_service.get_all_user_plants("user2")[0]) == 1
+
+def test_bulk_remove_plants_nonexistent_user(plant_service: PlantService):
+    """Test that an exception is raised when bulk removing the plants of a nonexistent user."""
+
+    with pytest.raises(UserNotFoundException):
+        plant_service.bulk_remove_plants("user3", [1])
+
+def test_bulk_remove_plants_blank_key(plant_service: PlantService):
+    """Test that an exception is raised when bulk removing plants with an empty key."""
+
+    with pytest.raises(UserBlankKeyException):
+        plant_service.bulk_remove_plants("", [1])
+
+def test_record_health_score(plant_service: PlantService):
+    """Test that recording health scores appends them to the plant's health history in order."""
+
+    plant_service.record_health_score("user1", 1, 7)
+    recorded = plant_service.record_health_score("user1", 1, 4)
+    assert (recorded.id, recorded.score, recorded.entries) == (1, 4, 2)
+    plants, _ = plant_service.get_all_user_plants("user1")
+    assert plants[0].health_history == [7, 4]
+
+def test_record_health_score_keeps_recent_scores(plant_service: PlantService, monkeypatch: pytest.MonkeyPatch):
+    """Test that recording a score drops the oldest scores past the history limit."""
+
+    monkeypatch.setattr(plant_module, "_HEALTH_HISTORY_LIMIT", 3)
+    for score in (9, 8, 7, 6):
+        recorded = plant_service.record_health_score("user1", 1, score)
+    assert recorded.entries == 3
+    plants, _ = plant_service.get_all_user_plants("user1")
+    assert plants[0].health_history == [8, 7, 6]
+
+def test_record_health_score_other_user_plant(plant_service: PlantService):
+    """Test that an exception is raised when recording a score for another user's plant."""
+
+    with pytest.raises(PlantNotFoundException):
+        plant_service.record_health_score("user1", 2, 7)
+    plants, _ = plant_service.get_all_user_plants("user2")
+    assert plants[0].health_history == []
+
+def test_record_health_score_nonexistent_user(plant_service: PlantService):
+    """Test that an exception is raised when recording a score for a nonexistent user."""
+
+    with pytest.raises(UserNotFoundException):
+        plant_service.record_health_score("user3", 1, 7)
+
+def test_get_health_analytics(plant_service: PlantService):
+    """Test that health analytics cover each of the user's plants and only theirs."""
+
+    for score in (9, 7, 5):
+        plant_service.record_health_score("user1", 1, score)
+    garden, _ = plant_service.get_health_analytics("user1", window=7)
+    assert [plant.id for plant in garden.plants] == [1]
+    assert garden.plants[0].rolling_average == 7
+    assert garden.declining == 1
+
+def test_get_health_analytics_nonexistent_user(plant_service: PlantService):
+    """Test that an exception is raised when analyzing the plants of a nonexistent user."""
+
+    with pytest.raises(UserNotFoundException):
+        plant_service.get_health_analytics("user3", window=7)
+
+def test_next_watering_at_maintained(plant_service: PlantService):
+    """Test that the next watering time follows the watering fields on create and update."""
+
+    plant = plant_service.create_plant(Plant(owner_key="user1", last_watering="2024-01-01",
+                                             watering_benchmark_value="7-10", watering_benchmark_unit="days"))
+    assert plant.next_watering_at == datetime(2024, 1, 8, tzinfo=timezone.utc)
+    plant.watering_benchmark_value = "3"
+    assert plant_service.update_Plant(plant).next_watering_at == datetime(2024, 1, 4, tzinfo=timezone.utc)
+    plant.watering_benchmark_unit = ""
+    assert plant_service.bulk_update_plants("user1", [plant]).plants[0].next_watering_at is None
+
+def test_get_due_plants(plant_service: PlantService):
+    """Test that only the user's plants due by the given time are returned, soonest first."""
+
+    for day in (3, 1, 9):
+        plant_service.create_plant(Plant(common_name=f"day{day}", owner_key="user1", last_watering=f"2024-01-0{day}",
+                                         watering_benchmark_value="1", watering_benchmark_unit="day"))
+    plant_service.create_plant(Plant(common_name="other", owner_key="user2", last_watering="2024-01-01",
+                                     watering_benchmark_value="1", watering_benchmark_unit="day"))
+    plants = plant_service.get_due_plants("user1", before=datetime(2024, 1, 5))
+    assert [plant.common_name for plant in plants] == ["day1", "day3"]
+    assert [plant.common_name for plant in plant_service.get_due_plants("user1")] == ["day1", "day3", "day9"]
+
+def test_get_due_plants_nonexistent_user(plant_service: PlantService):
+    """Test that an exception is raised when getting the due plants of a nonexistent user."""
+
+    with pytest.raises(UserNotFoundException):
+        plant_service.get_due_plants("user3")
+
+def test_typed_fields_round_trip(plant_service: PlantService):
+    """Test that fields stored in typed columns are returned exactly as they were sent."""
+
+    plant = plant_service.create_plant(Plant(owner_key="user1", last_watering="2024-01-01",
+                                             watering_benchmark_value="7-10"))
+    assert (plant.last_watering, plant.watering_benchmark_value) == ("2024-01-01", "7-10")
+    plant.last_watering, plant.watering_benchmark_value = "2024-02-01 08:30:00", "3.5"
+    plant_service.update_Plant(plant)
+    plants, _ = plant_service.get_all_user_plants("user1", fields="last_watering,watering_benchmark_value")
+    assert (plants[1].last_watering, plants[1].watering_benchmark_value) == ("2024-02-01 08:30:00", "3.5")
+
+def test_search_plants(plant_service: PlantService):
+    """Test that a search returns the user's matching plants, best match first."""
+
+    plant_service.create_plant(Plant(common_name="Swiss cheese plant", scientific_name="Monstera deliciosa",
+                                     owner_key="user1"))
+    plant_service.create_plant(Plant(common_name="Monstera", scientific_name="Monstera adansonii",
+                                     owner_key="user1"))
+    plant_service.create_plant(Plant(common_name="Fern", description="Grows beside a monstera", owner_key="user1"))
+    plant_service.create_plant(Plant(common_name="Monstera", owner_key="user2"))
+    page, _ = plant_service.search_plants("user1", "monstera", limit=10)
+    assert [plant.common_name for plant in page.plants] == ["Monstera", "Swiss cheese plant", "Fern"]
+    assert page.next_cursor is None
+
+def test_search_plants_misspelled_name(plant_service: PlantService):
+    """Test that a search still matches a plant name it misspells."""
+
+    plant_service.create_plant(Plant(common_name="Philodendron", owner_key="user1"))
+    page, _ = plant_service.search_plants("user1", "philodendorn", limit=10)
+    assert [plant.common_name for plant in page.plants] == ["Philodendron"]
+
+def test_search_plants_pages(plant_service: PlantService):
+    """Test that paging through search results returns each match once."""
+
+    for number in range(3):
+        plant_service.create_plant(Plant(common_name=f"Pothos {number}", owner_key="user1"))
+    page, _ = plant_service.search_plants("user1", "pothos", limit=2)
+    names = [plant.common_name for plant in page.plants]
+    page, _ = plant_service.search_plants("user1", "pothos", limit=2, cursor=page.next_cursor)
+    names += [plant.common_name for plant in page.plants]
+    assert sorted(names) == ["Pothos 0", "Pothos 1", "Pothos 2"]
+    assert page.next_cursor is None
+
+def test_search_plants_no_matches(plant_service: PlantService):
+    """Test that a search without matches returns an empty page."""
+
+    assert plant_service.search_plants("user1", "cactus", limit=10)[0].plants == []
+
+def test_search_plants_nonexistent_user(plant_service: PlantService):
+    """Test that an exception is raised when searching the plants of a nonexistent user."""
+
+    with pytest.raises(UserNotFoundException):
+        plant_service.search_plants("user3", "monstera", limit=10)
+
+def test_get_version_changes_on_every_write(plant_service: PlantService):
+    """Test that creating, updating, removing and scoring a plant each change its owner's version, and only theirs."""
+
+    versions = [plant_service.get_version("user1")]
+    other_version = plant_service.get_version("user2")
+    plant = plant_service.create_plant(Plant(common_name="fern", owner_key="user1"))
+    versions.append(plant_service.get_version("user1"))
+    plant_service.update_Plant(plant)
+    versions.append(plant_service.get_version("user1"))
+    plant_service.record_health_score("user1", plant.id, 5)
+    versions.append(plant_service.get_version("user1"))
+    plant_service.bulk_create_plants([Plant(owner_key="user1")])
+    versions.append(plant_service.get_version("user1"))
+    plant_service.remove_plant(plant)
+    versions.append(plant_service.get_version("user1"))
+    assert len(set(versions)) == len(versions)
+    assert plant_service.get_version("user2") == other_version
+
+def test_get_version_unchanged_by_reads(plant_service: PlantService):
+    """Test that reading a user's plants leaves their version as it was."""
+
+    version = plant_service.get_version("user1")
+    plant_service.get_all_user_plants("user1")
+    assert plant_service.get_version("user1") == version
+
+def test_get_version_nonexistent_user(plant_service: PlantService):
+    """Test that an exception is raised for the version of a nonexistent user."""
+
+    with pytest.raises(UserNotFoundException):
+        plant_service.get_version("user3")
@@ -7,6 +7,7 @@ from ..models.user import User
 from ..entities.user_entity import UserEntity
 from ..models.plant import Plant
 from ..entities.plant_entity import PlantEntity
+from ..entities.species_entity import SpeciesEntity, species_id
 
 user1 = User(
     id=0,
@@ -80,6 +81,12 @@ def insert_test_data(session: Session):
         new_user = UserEntity.from_model(user=user)
         session.add(new_user)
 
+    # Add the species of the plants to db.
+    for species in {species_id(plant): SpeciesEntity.from_model(plant) for plant in plants}.values():
+        session.add(species)
+    # Plants only reference their species by id, so the species are written first.
+    session.flush()
+
     # Add plants to db.
     for plant in plants:
         new_plant = PlantEntity.from_model(plant=plant)
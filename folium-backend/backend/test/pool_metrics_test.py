@@ -0,0 +1,46 @@
+"""Tests for the connection pool instrumentation"""
+
+import pytest
+from sqlalchemy import create_engine, Engine
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import QueuePool
+
+from ..pool_metrics import instrumented_pool_class, registry
+
+@pytest.fixture()
+def tiny_engine(test_engine: Engine):
+    """This PyTest fixture builds an instrumented engine with room for a single connection."""
+    pool_class, metrics = instrumented_pool_class(QueuePool, "tiny")
+    engine = create_engine(test_engine.url, poolclass=pool_class, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    metrics.bind(engine)
+    try:
+        yield engine, metrics
+    finally:
+        registry.remove(metrics)
+        engine.dispose()
+
+def test_checkout_counted(tiny_engine):
+    """Tests that checkouts and checked out connections are reported."""
+    engine, metrics = tiny_engine
+    with engine.connect():
+        status = metrics.snapshot()
+        assert status.checked_out == 1
+        assert status.checkouts == 1
+    assert metrics.snapshot().checked_out == 0
+
+def test_exhausted_pool_fails_fast(tiny_engine):
+    """Tests that an exhausted pool raises after the checkout timeout and counts the failure."""
+    engine, metrics = tiny_engine
+    with engine.connect():
+        with pytest.raises(TimeoutError):
+            engine.connect()
+    status = metrics.snapshot()
+    assert status.checkout_failures == 1
+    assert status.checkout_wait_max_seconds >= 0.05
+
+def test_metrics_survive_dispose(tiny_engine):
+    """Tests that recreating the pool keeps reporting to the same metrics."""
+    engine, metrics = tiny_engine
+    engine.dispose()
+    with engine.connect():
+        assert metrics.snapshot().checkouts == 1
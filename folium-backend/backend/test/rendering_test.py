@@ -0,0 +1,56 @@
+"""Tests for rendering route results straight to JSON"""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from ..api import rendering, plant
+from ..database import db_session
+from ..api.rendering import render, render_json
+from ..models.plant import Plant, PlantPage
+from .plant_test_data import insert_test_data
+
+def test_render_json_matches_response_model():
+    """Tests that the fast path renders the JSON the response model would, unset fields and all."""
+    plants = [Plant(id=1, common_name="fern", next_watering_at=datetime(2024, 1, 8, 8, 30, tzinfo=timezone.utc)),
+              Plant(id=2, health_history=[7, 8])]
+    page = PlantPage(plants=plants, next_cursor="abc")
+    assert json.loads(render_json(plants, list[Plant], exclude_unset=True)) == jsonable_encoder(plants, exclude_unset=True)
+    assert json.loads(render_json(page, PlantPage)) == jsonable_encoder(page)
+
+def test_render_disabled_returns_content():
+    """Tests that results are left to the response model unless the fast path is enabled."""
+    plant = Plant(id=1)
+    assert render(plant, Plant) is plant
+
+def test_render_enabled_keeps_headers(monkeypatch: pytest.MonkeyPatch):
+    """Tests that the fast path returns the encoded result with the headers the route set."""
+    monkeypatch.setattr(rendering, "FAST_RESPONSES", True)
+    response = Response()
+    del response.headers["content-length"]
+    response.headers["ETag"] = 'W/"3"'
+    rendered = render([Plant(id=1, common_name="fern")], list[Plant], response, exclude_unset=True)
+    assert isinstance(rendered, Response)
+    assert json.loads(rendered.body) == [{"id": 1, "common_name": "fern"}]
+    assert rendered.headers["ETag"] == 'W/"3"'
+    assert rendered.headers["content-type"] == "application/json"
+
+@pytest.mark.parametrize("fast_responses", [False, True])
+def test_last_page_has_null_cursor(fast_responses: bool, session: Session, monkeypatch: pytest.MonkeyPatch):
+    """Tests that the last page of plants, and of search results, says there is no next page."""
+    monkeypatch.setattr(rendering, "FAST_RESPONSES", fast_responses)
+    insert_test_data(session)
+    session.commit()
+    app = FastAPI()
+    app.include_router(plant.api)
+    app.dependency_overrides[db_session] = lambda: session
+    client = TestClient(app)
+    page = client.get("/plant/get_user_plants_page", params={"key": "user1", "fields": "common_name"}).json()
+    assert page == {"plants": [{"id": 1, "common_name": "test1"}], "next_cursor": None}
+    page = client.get("/plant/search", params={"key": "user1", "q": "test1", "fields": "common_name"}).json()
+    assert page == {"plants": [{"id": 1, "common_name": "test1"}], "next_cursor": None}
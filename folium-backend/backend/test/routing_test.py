@@ -0,0 +1,69 @@
+"""Tests for read replica routing with read-your-writes pinning"""
+
+import pytest
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session
+
+from ..database import RoutingSession, recent_writers, replica_reads
+from ..entities.entity_base import EntityBase
+from ..services.plant import PlantService
+from ..services.user import UserService
+from ..services.exceptions import UserNotFoundException
+from ..models.plant import Plant
+from .plant_test_data import insert_test_data
+
+@pytest.fixture(autouse=True)
+def routing_session(session: Session, test_engine: Engine, replica_engine: Engine):
+    """This PyTest fixture builds a routing session whose replica is an empty copy of the schema.
+    Any read that reaches the replica therefore finds nothing."""
+    insert_test_data(session)
+    session.commit()
+    EntityBase.metadata.drop_all(replica_engine)
+    EntityBase.metadata.create_all(replica_engine)
+    recent_writers.clear()
+    routing_session = RoutingSession(test_engine, [replica_engine])
+    try:
+        yield routing_session
+    finally:
+        routing_session.close()
+        recent_writers.clear()
+
+def test_reads_go_to_replica(routing_session: RoutingSession):
+    """Tests that read-only service calls are served by the replica."""
+    with pytest.raises(UserNotFoundException):
+        PlantService(session=routing_session).get_all_user_plants("user1")
+    with pytest.raises(UserNotFoundException):
+        UserService(session=routing_session).get_user("user1")
+
+def test_writes_go_to_primary(routing_session: RoutingSession, session: Session):
+    """Tests that writes are made on the primary."""
+    PlantService(session=routing_session).create_plant(Plant(common_name="new", owner_key="user2"))
+    assert len(PlantService(session=session).get_all_user_plants("user2")[0]) == 2
+
+def test_reads_after_write_are_pinned_to_primary(routing_session: RoutingSession):
+    """Tests that a user who just wrote reads their own write."""
+    plant_service = PlantService(session=routing_session)
+    plant_service.create_plant(Plant(common_name="new", owner_key="user1"))
+    assert len(plant_service.get_all_user_plants("user1")[0]) == 2
+
+def test_pin_expires(routing_session: RoutingSession, monkeypatch: pytest.MonkeyPatch):
+    """Tests that reads return to the replica once the window has passed."""
+    monkeypatch.setattr(recent_writers, "window", 0)
+    plant_service = PlantService(session=routing_session)
+    plant_service.create_plant(Plant(common_name="new", owner_key="user1"))
+    with pytest.raises(UserNotFoundException):
+        plant_service.get_all_user_plants("user1")
+
+def test_sessions_spread_across_replicas(test_engine: Engine, replica_engine: Engine):
+    """Tests that consecutive sessions read from different replicas, and each session keeps to one."""
+    replicas = [replica_engine, create_engine(replica_engine.url)]
+    try:
+        binds = []
+        for _ in range(4):
+            with RoutingSession(test_engine, replicas) as session, replica_reads(session, "user1"):
+                binds.append([session.get_bind() for _ in range(3)])
+        assert all(session_binds == [session_binds[0]] * 3 for session_binds in binds)
+        assert [session_binds[0] for session_binds in binds].count(replicas[0]) == 2
+        assert [session_binds[0] for session_binds in binds].count(replicas[1]) == 2
+    finally:
+        replicas[1].dispose()
@@ -0,0 +1,37 @@
+"""Helper class that lets the sync service test cases drive the async services.
+   Coroutine methods of the wrapped service are run to completion on the
+   given event loop, so the same test body covers both request paths.
+   Async iterators they return are drained into lists."""
+
+import asyncio
+import inspect
+from typing import Any, AsyncIterator
+
+
+class SyncAdapter:
+    """Wraps an async service and exposes its coroutine methods as blocking calls."""
+
+    def __init__(self, service: Any, loop: asyncio.AbstractEventLoop):
+        """
+        Args:
+            service (Any) - The async service to wrap.
+            loop (AbstractEventLoop) - The event loop that owns the service's AsyncSession."""
+        self._service = service
+        self._loop = loop
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._service, name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        def run(*args, **kwargs):
+            result = self._loop.run_until_complete(attribute(*args, **kwargs))
+            if isinstance(result, AsyncIterator):
+                return self._loop.run_until_complete(_drain(result))
+            return result
+
+        return run
+
+
+async def _drain(iterator: AsyncIterator) -> list:
+    return [item async for item in iterator]
@@ -0,0 +1,32 @@
+"""Tests for splitting text fields into typed columns and back"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from ..text_columns import split_number, join_number, split_timestamp, join_timestamp
+
+@pytest.mark.parametrize("text", ["", "2024-01-02 03:04:05", "2024-01-02", "2024-01-02T03:04:05Z",
+                                  "1700000000", "fake", " 2024-01-02 03:04:05"])
+def test_timestamp_round_trip(text: str):
+    """Tests that every timestamp field is rebuilt exactly as it was sent."""
+    assert join_timestamp(*split_timestamp(text)) == text
+
+@pytest.mark.parametrize("text", ["", "7", "7.50", "0", "7-10", '"7"', "fake", "1e3", "9" * 40])
+def test_number_round_trip(text: str):
+    """Tests that every numeric field is rebuilt exactly as it was sent."""
+    assert join_number(*split_number(text)) == text
+
+def test_split_timestamp_keeps_text_only_when_needed():
+    """Tests that text in the API's own format is stored only as a typed value."""
+    assert split_timestamp("2024-01-02 03:04:05") == (datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc), None)
+    assert split_timestamp("2024-01-02") == (datetime(2024, 1, 2, tzinfo=timezone.utc), "2024-01-02")
+    assert split_timestamp("fake") == (None, "fake")
+    assert split_timestamp("") == (None, None)
+
+def test_split_number_keeps_text_only_when_needed():
+    """Tests that plain numbers are stored only as a typed value and ranges as their lower bound."""
+    assert split_number("7.50") == (Decimal("7.50"), None)
+    assert split_number("7-10") == (Decimal("7"), "7-10")
+    assert split_number("fake") == (None, "fake")
@@ -0,0 +1,101 @@
+"""Tests for the token issuer and the authentication of plant requests by its tokens"""
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from ..api.auth import token_key, owner_key, claim_plants
+from ..models.plant import Plant
+from ..services.tokens import TokenIssuer, token_issuer
+from ..services.exceptions import InvalidTokenException
+
+class FakeClock:
+    """Clock whose time only moves when the test advances it."""
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+@pytest.fixture()
+def issuer(clock: FakeClock) -> TokenIssuer:
+    """This PyTest fixture constructs an issuer with short lifetimes driven by a fake clock."""
+    return TokenIssuer(secret="secret", access_ttl=60, refresh_ttl=600, clock=clock)
+
+def test_issue_and_verify(issuer: TokenIssuer):
+    """Tests that both tokens of a pair identify the user they were issued to."""
+    tokens = issuer.issue("user1")
+    assert tokens.expires_in == 60
+    assert issuer.verify(tokens.access_token) == "user1"
+    assert issuer.verify(tokens.refresh_token, token_type="refresh") == "user1"
+
+def test_token_types_not_interchangeable(issuer: TokenIssuer):
+    """Tests that a refresh token is not accepted as an access token and vice versa."""
+    tokens = issuer.issue("user1")
+    with pytest.raises(InvalidTokenException):
+        issuer.verify(tokens.refresh_token)
+    with pytest.raises(InvalidTokenException):
+        issuer.verify(tokens.access_token, token_type="refresh")
+
+def test_access_token_expires(issuer: TokenIssuer, clock: FakeClock):
+    """Tests that an access token is rejected once its lifetime has passed, while the refresh token lives on."""
+    tokens = issuer.issue("user1")
+    clock.now += 60
+    with pytest.raises(InvalidTokenException):
+        issuer.verify(tokens.access_token)
+    assert issuer.verify(tokens.refresh_token, token_type="refresh") == "user1"
+
+def test_forged_token_rejected(issuer: TokenIssuer, clock: FakeClock):
+    """Tests that tokens signed with another secret, or not tokens at all, are rejected."""
+    forged = jwt.encode({"sub": "user1", "type": "access", "exp": clock.now + 60}, "guess", algorithm="HS256")
+    with pytest.raises(InvalidTokenException):
+        issuer.verify(forged)
+    with pytest.raises(InvalidTokenException):
+        issuer.verify("not a token")
+
+def test_revoke(issuer: TokenIssuer, clock: FakeClock):
+    """Tests that a revoked user's tokens are rejected and the revocation lapses with the access token lifetime."""
+    tokens = issuer.issue("user1")
+    issuer.revoke("user1")
+    with pytest.raises(InvalidTokenException):
+        issuer.verify(tokens.access_token)
+    assert issuer.verify(issuer.issue("user2").access_token) == "user2"
+    clock.now += 60
+    issuer.revoke("user2")
+    assert issuer._revoked.keys() == {"user2"}
+
+def test_token_key():
+    """Tests that a request's bearer token resolves to its subject, and a bad token to a 401."""
+    assert token_key(None) is None
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token_issuer.issue("user1").access_token)
+    assert token_key(credentials) == "user1"
+    with pytest.raises(HTTPException) as e:
+        token_key(HTTPAuthorizationCredentials(scheme="Bearer", credentials="not a token"))
+    assert e.value.status_code == 401
+
+def test_owner_key():
+    """Tests that a token's subject is used, a key alone is still accepted and a mismatch is refused."""
+    assert owner_key(key=None, subject="user1") == "user1"
+    assert owner_key(key="user1", subject="user1") == "user1"
+    assert owner_key(key="user1", subject=None) == "user1"
+    with pytest.raises(HTTPException) as e:
+        owner_key(key="user2", subject="user1")
+    assert e.value.status_code == 403
+    with pytest.raises(HTTPException) as e:
+        owner_key(key=None, subject=None)
+    assert e.value.status_code == 401
+
+def test_claim_plants():
+    """Tests that plants without an owner are given the token's user and other owners are refused."""
+    plants = [Plant(common_name="a"), Plant(common_name="b", owner_key="user1")]
+    claim_plants("user1", plants)
+    assert [plant.owner_key for plant in plants] == ["user1", "user1"]
+    claim_plants(None, [Plant(owner_key="user2")])
+    with pytest.raises(HTTPException) as e:
+        claim_plants("user1", [Plant(owner_key="user2")])
+    assert e.value.status_code == 403
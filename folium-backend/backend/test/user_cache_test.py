@@ -0,0 +1,86 @@
+"""Tests for the user cache and its use by the user service"""
+
+import pytest
+from sqlalchemy.orm import Session
+
+from ..models.user import User
+from ..services.user import UserService
+from ..services.user_cache import UserCache, user_cache
+from ..services.exceptions import UserNotFoundException
+
+class FakeClock:
+    """Clock whose time only moves when the test advances it."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+@pytest.fixture()
+def cache(clock: FakeClock) -> UserCache:
+    """This PyTest fixture constructs a small cache driven by a fake clock."""
+    return UserCache(max_size=2, ttl=10, clock=clock)
+
+def test_get_hit_and_miss(cache: UserCache):
+    """Tests that cached users are returned and lookups are counted."""
+    cache.put(User(key="a", first_name="Ann"), 1)
+    user, version = cache.get("a")
+    assert (user.first_name, version) == ("Ann", 1)
+    assert cache.get("b") is None
+    status = cache.status()
+    assert (status.hits, status.misses, status.size) == (1, 1, 1)
+
+def test_least_recently_used_evicted(cache: UserCache):
+    """Tests that the least recently used user is evicted when the cache is full."""
+    cache.put(User(key="a"), 1)
+    cache.put(User(key="b"), 1)
+    cache.get("a")
+    cache.put(User(key="c"), 1)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.status().evictions == 1
+
+def test_entries_expire(cache: UserCache, clock: FakeClock):
+    """Tests that users are not served past their TTL."""
+    cache.put(User(key="a"), 1)
+    clock.now = 10
+    assert cache.get("a") is None
+    assert cache.status().expirations == 1
+
+def test_cached_users_are_copies(cache: UserCache):
+    """Tests that changing a returned user does not change the cached user."""
+    cache.put(User(key="a", first_name="Ann"), 1)
+    cache.get("a")[0].first_name = "Bob"
+    assert cache.get("a")[0].first_name == "Ann"
+
+def test_get_user_served_from_cache(session: Session, statements: list[str]):
+    """Tests that repeated lookups of a user only query the database once."""
+    user_service = UserService(session=session)
+    user = user_service.create_user(User(first_name="Jacob", last_name="Brown", email="jb@gmail.com", password="password"))
+    statements.clear()
+    user_service.get_user(user.key)
+    user_service.get_user(user.key)
+    assert len(statements) == 1
+
+def test_update_user_invalidates(session: Session):
+    """Tests that an updated user is not served stale from the cache."""
+    user_service = UserService(session=session)
+    user = user_service.create_user(User(first_name="Jacob", last_name="Brown", email="jb@gmail.com", password="password"))
+    user_service.get_user(user.key)
+    user_service.update_user(key=user.key, user=User(**user.model_dump(exclude={"first_name"}), first_name="Jimmy"))
+    assert user_service.get_user(user.key)[0].first_name == "Jimmy"
+
+def test_delete_user_invalidates(session: Session):
+    """Tests that a deleted user is not served from the cache."""
+    user_service = UserService(session=session)
+    user = user_service.create_user(User(first_name="Jacob", last_name="Brown", email="jb@gmail.com", password="password"))
+    user_service.get_user(user.key)
+    invalidations = user_cache.status().invalidations
+    user_service.delete_user(user.key)
+    with pytest.raises(UserNotFoundException):
+        user_service.get_user(user.key)
+    assert user_cache.status().invalidations == invalidations + 1
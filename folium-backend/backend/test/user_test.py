@@ -1,18 +1,30 @@
 """Tests for the user service"""
 
 import pytest
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
-from ..services.user import UserService
+from ..services.user import UserService, AsyncUserService
 from ..models.user import User
+from ..entities.user_entity import UserEntity
+from ..services.tokens import token_issuer
+from ..services.passwords import password_hasher
+from ..services.user_cache import user_cache
 from ..services.exceptions import (UserNotFoundException,
                                    DuplicateUserException,
-                                   InvalidCredentialsUserException)
+                                   InvalidCredentialsUserException,
+                                   InvalidTokenException)
+from .sync_adapter import SyncAdapter
 
-@pytest.fixture(autouse=True)
-def user_service(session: Session):
+@pytest.fixture(autouse=True, params=["sync", "async"])
+def user_service(request: pytest.FixtureRequest, session: Session):
     """This PyTest fixture is injected into each test parameter of the same name below.
-    It constructs a new, empty UserService object."""
+    It constructs a new, empty UserService object, once for the sync request path
+    and once for the async request path."""
+    if request.param == "async":
+        async_session = request.getfixturevalue("async_session")
+        async_loop = request.getfixturevalue("async_loop")
+        return SyncAdapter(AsyncUserService(session=async_session), async_loop)
     user_service = UserService(session=session)
     return user_service
 
@@ -25,6 +37,18 @@ def test_create_user(user_service: UserService):
     key = user_service.create_user(user=user)
     assert key
 
+def test_create_user_created_at(user_service: UserService, session: Session):
+    """Tests that the creation time is stored only in the typed column and returned in the API's format"""
+    user = User(first_name="Jacob",
+                last_name="Brown",
+                email="jacobbrown2002@gmail.com",
+                password="password")
+    key = user_service.create_user(user=user).key
+    created_at, created_at_text = session.execute(
+        select(UserEntity.created_at, UserEntity.created_at_text).where(UserEntity.key == key)).one()
+    assert created_at_text is None
+    assert user_service.get_user(key=key)[0].created_at == created_at.strftime("%Y-%m-%d %H:%M:%S")
+
 def test_create_multiple_users(user_service: UserService):
     """Tests that multiple users can be created with unique keys"""
     user = User(first_name="Jacob",
@@ -63,6 +87,25 @@ def test_create_duplicate_users(user_service: UserService):
     except DuplicateUserException:
         assert True
 
+def test_create_concurrent_duplicate_users(user_service: UserService, session: Session, monkeypatch: pytest.MonkeyPatch):
+    """Tests that a sign up whose email is taken while its password is hashed is reported as a duplicate."""
+    def hash_after_other_sign_up(password: str) -> str:
+        session.add(UserEntity.from_model(User(first_name="Other", last_name="User", email="jacobbrown2002@gmail.com",
+                                               password="password", key="other")))
+        session.commit()
+        return password
+
+    async def hash_async_after_other_sign_up(password: str) -> str:
+        return hash_after_other_sign_up(password)
+
+    monkeypatch.setattr(password_hasher, "hash", hash_after_other_sign_up)
+    monkeypatch.setattr(password_hasher, "hash_async", hash_async_after_other_sign_up)
+    with pytest.raises(DuplicateUserException):
+        user_service.create_user(user=User(first_name="Jacob",
+                                           last_name="Brown",
+                                           email="jacobbrown2002@gmail.com",
+                                           password="password"))
+
 def test_sign_in(user_service: UserService):
     """Test sign in basic usage"""
     user = User(first_name="Jacob",
@@ -70,9 +113,81 @@ def test_sign_in(user_service: UserService):
                 email="jacobbrown2002@gmail.com",
                 password="password")
     user = user_service.create_user(user)
-    user2 = user_service.sign_in(email=user.email, password=user.password)
+    user2 = user_service.sign_in(email=user.email, password="password")
     assert user2.key == user.key
 
+def test_sign_in_wrong_password(user_service: UserService):
+    """Tests that sign in checks the password, not only the email"""
+    user = user_service.create_user(User(first_name="Jacob",
+                                         last_name="Brown",
+                                         email="jacobbrown2002@gmail.com",
+                                         password="password"))
+    with pytest.raises(UserNotFoundException):
+        user_service.sign_in(email=user.email, password="guess")
+
+def test_password_stored_hashed(user_service: UserService, session: Session):
+    """Tests that passwords are stored as scrypt hashes, and kept by updates without a password"""
+    user = user_service.create_user(User(first_name="Jacob",
+                                         last_name="Brown",
+                                         email="jacobbrown2002@gmail.com",
+                                         password="password"))
+    stored = session.scalar(select(UserEntity.password).where(UserEntity.key == user.key))
+    assert stored.startswith("scrypt$")
+    user = User(**user.model_dump())
+    user.first_name = "Jimmy"
+    user_service.update_user(key=user.key, user=user)
+    user_service.sign_in(email=user.email, password="password")
+    user.password = "new-password"
+    user_service.update_user(key=user.key, user=user)
+    user_service.sign_in(email=user.email, password="new-password")
+
+def test_sign_in_upgrades_plaintext_password(user_service: UserService, session: Session):
+    """Tests that a password stored before hashing still signs in and is hashed on the way"""
+    user = user_service.create_user(User(first_name="Jacob",
+                                         last_name="Brown",
+                                         email="jacobbrown2002@gmail.com",
+                                         password="password"))
+    session.execute(update(UserEntity).where(UserEntity.key == user.key).values(password="password"))
+    session.commit()
+    user_service.sign_in(email=user.email, password="password")
+    session.expire_all()
+    assert session.scalar(select(UserEntity.password).where(UserEntity.key == user.key)).startswith("scrypt$")
+
+def test_sign_in_issues_tokens(user_service: UserService):
+    """Tests that signing up and signing in issue tokens whose subject is the user's key"""
+    user = user_service.create_user(User(first_name="Jacob",
+                                         last_name="Brown",
+                                         email="jacobbrown2002@gmail.com",
+                                         password="password"))
+    assert token_issuer.verify(user.tokens.access_token) == user.key
+    signed_in = user_service.sign_in(email=user.email, password="password")
+    assert token_issuer.verify(signed_in.tokens.access_token) == user.key
+
+def test_refresh_tokens(user_service: UserService):
+    """Tests that a refresh token is exchanged for a new pair, but an access token is not"""
+    user = user_service.create_user(User(first_name="Jacob",
+                                         last_name="Brown",
+                                         email="jacobbrown2002@gmail.com",
+                                         password="password"))
+    tokens = user_service.refresh_tokens(refresh_token=user.tokens.refresh_token)
+    assert token_issuer.verify(tokens.access_token) == user.key
+    with pytest.raises(InvalidTokenException):
+        user_service.refresh_tokens(refresh_token=user.tokens.access_token)
+
+def test_delete_user_revokes_tokens(user_service: UserService):
+    """Tests that a deleted user's tokens are neither accepted nor refreshed"""
+    user = user_service.create_user(User(first_name="Jacob",
+                                         last_name="Brown",
+                                         email="jacobbrown2002@gmail.com",
+                                         password="password"))
+    user_service.delete_user(key=user.key)
+    with pytest.raises(InvalidTokenException):
+        token_issuer.verify(user.tokens.access_token)
+    # Once the revocation lapses, refreshing still fails on the missing user.
+    token_issuer.clear()
+    with pytest.raises(UserNotFoundException):
+        user_service.refresh_tokens(refresh_token=user.tokens.refresh_token)
+
 def test_sign_in_not_found(user_service: UserService):
     user = User(first_name="Jacob",
                 last_name="Brown",
@@ -91,7 +206,7 @@ def test_get_user(user_service: UserService):
                 email="jacobbrown2002@gmail.com",
                 password="password")
     new_user: User = user_service.create_user(user = user)
-    user2: User = user_service.get_user(key=new_user.key)
+    user2, _ = user_service.get_user(key=new_user.key)
     assert user2.key == new_user.key
 
 def test_get_user_does_not_exist(user_service: UserService):
@@ -108,11 +223,62 @@ def test_update_user(user_service: UserService):
                 last_name="Brown",
                 email="jacobbrown2002@gmail.com",
                 password="password")
-    user = user_service.create_user(user=user)
+    user = User(**user_service.create_user(user=user).model_dump())
     user.first_name = "Jimmy"
     user2 = user_service.update_user(key=user.key, user=user)
     assert user2.first_name == user.first_name
 
+def test_users_returned_without_password(user_service: UserService):
+    """Tests that no user the service returns carries the password or its hash."""
+    user = user_service.create_user(user=User(first_name="Jacob",
+                                              last_name="Brown",
+                                              email="jacobbrown2002@gmail.com",
+                                              password="password"))
+    returned = [user,
+                user_service.sign_in(email=user.email, password="password"),
+                user_service.get_user(key=user.key)[0],
+                user_service.update_user(key=user.key, user=User(**user.model_dump())),
+                user_service.delete_user(key=user.key)]
+    assert all("password" not in returned_user.model_dump() for returned_user in returned)
+
+def test_update_user_duplicate_email(user_service: UserService):
+    """Tests that a user cannot take the email of another user, and is left unchanged."""
+    user = user_service.create_user(user=User(first_name="Jacob",
+                                              last_name="Brown",
+                                              email="jacobbrown2002@gmail.com",
+                                              password="password"))
+    user_service.create_user(user=User(first_name="Jackson",
+                                       last_name="Brown",
+                                       email="test@gmail.com",
+                                       password="password2"))
+    with pytest.raises(DuplicateUserException):
+        user_service.update_user(key=user.key, user=User(**user.model_dump(exclude={"email"}), email="test@gmail.com"))
+    assert user_service.get_user(key=user.key)[0].email == "jacobbrown2002@gmail.com"
+
+def test_update_user_changes_version(user_service: UserService):
+    """Tests that updating a user changes their version."""
+    user = user_service.create_user(user=User(first_name="Jacob",
+                                              last_name="Brown",
+                                              email="jacobbrown2002@gmail.com",
+                                              password="password"))
+    _, version = user_service.get_user(key=user.key)
+    user_service.update_user(key=user.key, user=User(**user.model_dump()))
+    assert user_service.get_user(key=user.key)[1] != version
+
+def test_get_user_cached_with_version(user_service: UserService, session: Session):
+    """Tests that a cached user is served with the version it was read at, even after another worker updated them."""
+    user = user_service.create_user(user=User(first_name="Jacob",
+                                              last_name="Brown",
+                                              email="jacobbrown2002@gmail.com",
+                                              password="password"))
+    cached_user, version = user_service.get_user(key=user.key)
+    session.execute(update(UserEntity).where(UserEntity.key == user.key)
+                    .values(first_name="Jimmy", version=UserEntity.version + 1))
+    session.commit()
+    assert user_service.get_user(key=user.key) == (cached_user, version)
+    user_cache.clear()
+    assert user_service.get_user(key=user.key) == (cached_user.model_copy(update={"first_name": "Jimmy"}), version + 1)
+
 def test_update_user_not_found(user_service: UserService):
     """Tests that an exception is raised when a user is updated that is not in the database"""
     user = User(id=0, first_name="Jim", last_name="John", email="raa", created_at="ur mom", key="0")
@@ -0,0 +1,92 @@
+"""Tests for the watering schedule and the global due plants query"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from .plant_test_data import insert_test_data
+from ..watering import parse_watering_time, parse_watering_interval, next_watering_time
+from ..services.plant import PlantService
+from ..services.exceptions import InvalidCursorException
+from ..models.plant import Plant
+from ..api import internal
+from ..database import db_session
+
+def test_parse_watering_time_formats():
+    """Tests that ISO dates, the API's date format and Unix timestamps all parse as UTC when naive."""
+    expected = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert parse_watering_time("2024-01-02T03:04:05Z") == expected
+    assert parse_watering_time("2024-01-02 03:04:05") == expected
+    assert parse_watering_time(str(expected.timestamp())) == expected
+    assert parse_watering_time("2024-01-02") == datetime(2024, 1, 2, tzinfo=timezone.utc)
+    assert parse_watering_time("2024-01-02T05:04:05+02:00") == expected
+
+def test_parse_watering_time_invalid():
+    """Tests that unparseable times are None rather than errors."""
+    assert parse_watering_time("") is None
+    assert parse_watering_time("yesterday") is None
+    assert parse_watering_time("9" * 30) is None
+
+def test_parse_watering_interval():
+    """Tests that ranges use their lower bound and units may be singular, plural or capitalized."""
+    assert parse_watering_interval("7-10", "days") == timedelta(days=7)
+    assert parse_watering_interval('"2"', "Week") == timedelta(weeks=2)
+    assert parse_watering_interval("12", "hours") == timedelta(hours=12)
+    assert parse_watering_interval("0", "days") is None
+    assert parse_watering_interval("7", "fortnights") is None
+    assert parse_watering_interval("", "days") is None
+
+def test_next_watering_time():
+    """Tests that the next watering is the last watering plus the interval."""
+    assert next_watering_time("2024-01-01", "7-10", "days") == datetime(2024, 1, 8, tzinfo=timezone.utc)
+    assert next_watering_time("fake", "7", "days") is None
+
+@pytest.fixture()
+def plant_service(session: Session) -> PlantService:
+    """This PyTest fixture constructs a PlantService over the test data plus plants due on each of four days."""
+    insert_test_data(session)
+    session.commit()
+    plant_service = PlantService(session=session)
+    for day in range(4):
+        plant_service.create_plant(Plant(common_name=f"day{day}", owner_key=f"user{day % 2 + 1}",
+                                         last_watering=f"2024-01-0{day + 1}",
+                                         watering_benchmark_value="1", watering_benchmark_unit="days"))
+    return plant_service
+
+def test_get_all_due_plants(plant_service: PlantService):
+    """Tests that due plants of every owner are returned soonest first, a page at a time."""
+    before = datetime(2024, 1, 4, tzinfo=timezone.utc)
+    page = plant_service.get_all_due_plants(limit=2, before=before)
+    assert [plant.common_name for plant in page.plants] == ["day0", "day1"]
+    page = plant_service.get_all_due_plants(limit=2, before=before, cursor=page.next_cursor)
+    assert [plant.common_name for plant in page.plants] == ["day2"]
+    assert page.next_cursor is None
+
+def test_get_all_due_plants_invalid_cursor(plant_service: PlantService):
+    """Tests that an exception is raised for a cursor that was not issued by the query."""
+    with pytest.raises(InvalidCursorException):
+        plant_service.get_all_due_plants(limit=2, cursor="not a cursor")
+
+def test_get_all_due_plants_leaves_out_owner(plant_service: PlantService):
+    """Tests that plants listed across owners do not carry the owner keys that act as their owners."""
+    page = plant_service.get_all_due_plants(limit=10, before=datetime(2024, 1, 4, tzinfo=timezone.utc))
+    assert all("owner_key" not in plant.model_fields_set for plant in page.plants)
+
+def test_due_plants_route_requires_worker_token(plant_service: PlantService, session: Session):
+    """Tests that only the worker may list every user's due plants, and gets them without owner keys."""
+    app = FastAPI()
+    app.include_router(internal.api)
+    app.dependency_overrides[db_session] = lambda: session
+    client = TestClient(app)
+    params = {"before": "2024-01-04T00:00:00Z"}
+    assert client.get("/internal/due_plants", params=params).status_code == 401
+    assert client.get("/internal/due_plants", params=params,
+                      headers={"Authorization": "Bearer guess"}).status_code == 401
+    response = client.get("/internal/due_plants", params=params,
+                          headers={"Authorization": f"Bearer {internal._WORKER_TOKEN}"})
+    assert response.status_code == 200
+    assert [plant["common_name"] for plant in response.json()["plants"]] == ["day0", "day1", "day2"]
+    assert all("owner_key" not in plant for plant in response.json()["plants"])
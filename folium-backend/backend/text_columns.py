@@ -0,0 +1,73 @@
+"""Conversion between the API's free-form text fields and their typed columns.
+
+Timestamps and numbers arrive through the API as strings, but are stored in typed
+columns so Postgres can sort, range-scan and index them. Text is only a lossless fit
+for a typed column when the typed value renders back to exactly the same string, so
+each typed column is paired with a text column that keeps the original input whenever
+it does not. Reading a field prefers that text and falls back to rendering the value.
+"""
+
+import re
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from .watering import parse_watering_time
+
+# Format that typed timestamps are rendered in, in UTC. It is the format the API writes.
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Digits are capped well within NUMERIC limits; longer numbers survive only in the kept text.
+_NUMBER = re.compile(r"\d{1,30}(?:\.\d{1,30})?")
+
+
+def render_timestamp(value: datetime | None) -> str:
+    """Render a typed timestamp the way it is returned by the API, or "" for NULL."""
+    if value is None:
+        return ""
+    return value.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def split_timestamp(text: str) -> tuple[datetime | None, str | None]:
+    """
+    Split a timestamp field into its typed value and the text to keep alongside it.
+
+    Returns:
+        tuple[datetime | None, str | None]: The parsed time, or None if the text is not
+            a time, and the original text, or None if the time renders back to it.
+    """
+    value = parse_watering_time(text)
+    return value, (None if render_timestamp(value) == text else text)
+
+
+def join_timestamp(value: datetime | None, text: str | None) -> str:
+    """Rebuild a timestamp field from its typed value and kept text."""
+    return text if text is not None else render_timestamp(value)
+
+
+def render_number(value: Decimal | None) -> str:
+    """Render a typed number the way it is returned by the API, or "" for NULL."""
+    if value is None:
+        return ""
+    return format(value, "f")
+
+
+def split_number(text: str) -> tuple[Decimal | None, str | None]:
+    """
+    Split a numeric field into its typed value and the text to keep alongside it.
+
+    The first number in the text is stored, so a range such as `7-10` is stored as its
+    lower bound, with the range kept as text.
+
+    Returns:
+        tuple[Decimal | None, str | None]: The number, or None if the text has none, and
+            the original text, or None if the number renders back to it.
+    """
+    match = _NUMBER.search(text)
+    value = Decimal(match.group()) if match is not None else None
+    return value, (None if render_number(value) == text else text)
+
+
+def join_number(value: Decimal | None, text: str | None) -> str:
+    """Rebuild a numeric field from its typed value and kept text."""
+    return text if text is not None else render_number(value)
+
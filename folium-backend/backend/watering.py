@@ -0,0 +1,90 @@
+"""Parsing of a plant's free-form watering fields into the time it next needs water."""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+# Length of one unit of the watering benchmark, keyed by the singular unit name.
+_UNITS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+}
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_watering_time(text: str) -> datetime | None:
+    """
+    Parse the time a plant was last watered.
+
+    Accepts ISO 8601 dates and date-times (as well as the `YYYY-MM-DD HH:MM:SS` format the
+    API writes) and Unix timestamps in seconds. Times without a time zone are taken as UTC.
+
+    Args:
+        text: The plant's `last_watering`.
+
+    Returns:
+        datetime | None: The time as an aware datetime, or None if it cannot be parsed.
+    """
+
+    text = text.strip()
+    try:
+        if _NUMBER.fullmatch(text) is not None:
+            return datetime.fromtimestamp(float(text), tz=timezone.utc)
+        parsed = datetime.fromisoformat(text)
+    except (ValueError, OverflowError, OSError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def parse_watering_interval(value: str, unit: str) -> timedelta | None:
+    """
+    Parse the time that should pass between waterings.
+
+    Benchmarks are often ranges such as `"7-10"` days; the lower bound is used so that
+    reminders err on the side of watering early.
+
+    Args:
+        value: The plant's `watering_benchmark_value`, e.g. `7`, `7-10` or `"7-10"`.
+        unit: The plant's `watering_benchmark_unit`, e.g. `days` or `week`.
+
+    Returns:
+        timedelta | None: The interval, or None if either field cannot be parsed.
+    """
+
+    numbers = _NUMBER.findall(value)
+    unit_length = _UNITS.get(unit.strip().lower().removesuffix("s"))
+    if len(numbers) == 0 or unit_length is None:
+        return None
+    try:
+        interval = float(numbers[0]) * unit_length
+    except OverflowError:
+        return None
+    return interval if interval > timedelta(0) else None
+
+
+def next_watering_time(last_watering: str, benchmark_value: str, benchmark_unit: str) -> datetime | None:
+    """
+    Compute when a plant next needs water.
+
+    Args:
+        last_watering: The plant's `last_watering`.
+        benchmark_value: The plant's `watering_benchmark_value`.
+        benchmark_unit: The plant's `watering_benchmark_unit`.
+
+    Returns:
+        datetime | None: The time the plant is due, or None if the fields do not say.
+    """
+
+    watered_at = parse_watering_time(last_watering)
+    interval = parse_watering_interval(benchmark_value, benchmark_unit)
+    if watered_at is None or interval is None:
+        return None
+    try:
+        return watered_at + interval
+    except OverflowError:
+        return None